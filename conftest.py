@@ -8,6 +8,7 @@ from botocore.client import BaseClient
 from moto import mock_aws
 
 from helixcore.register import register
+from helixcore.utilities.aws.config import SsmConfigCache
 
 
 @pytest.fixture(scope="function")
@@ -24,8 +25,10 @@ def aws_credentials() -> None:
 def ssm_mock(
     aws_credentials: FixtureFunctionMarker,
 ) -> Generator[BaseClient, None, None]:
+    SsmConfigCache.clear()
     with mock_aws():
         yield boto3.client("ssm", region_name="us-east-1")
+    SsmConfigCache.clear()
 
 
 @pytest.fixture(scope="function")
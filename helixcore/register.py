@@ -1,22 +1,68 @@
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Dict, Type, cast
+
 from helixtelemetry.telemetry.factory.telemetry_factory import TelemetryFactory
-from helixtelemetry.telemetry.providers.console_telemetry import ConsoleTelemetry
-from helixtelemetry.telemetry.providers.null_telemetry import NullTelemetry
-from helixtelemetry.telemetry.providers.open_telemetry import OpenTelemetry
+from helixtelemetry.telemetry.providers.telemetry import Telemetry
+
+# provider name -> "module:class" of the telemetry classes.  The classes are only imported the first time
+# TelemetryFactory.create() selects them so e.g. the OpenTelemetry SDK and OTLP exporters are not imported
+# when the run uses NullTelemetry
+TELEMETRY_CLASSES: Dict[str, str] = {
+    "NullTelemetry": "helixtelemetry.telemetry.providers.null_telemetry:NullTelemetry",
+    "ConsoleTelemetry": "helixtelemetry.telemetry.providers.console_telemetry:ConsoleTelemetry",
+    "OpenTelemetry": "helixtelemetry.telemetry.providers.open_telemetry:OpenTelemetry",
+}
 
 
 def register() -> None:
     """
     Register the telemetry classes with the telemetry factory
     """
+    for name, class_path in TELEMETRY_CLASSES.items():
+        register_telemetry_class_by_name(name=name, class_path=class_path)
 
-    TelemetryFactory.register_telemetry_class(
-        name=NullTelemetry.telemetry_provider, telemetry_class=NullTelemetry
-    )
-    TelemetryFactory.register_telemetry_class(
-        name=ConsoleTelemetry.telemetry_provider, telemetry_class=ConsoleTelemetry
-    )
+
+def register_telemetry_class_by_name(*, name: str, class_path: str) -> None:
+    """
+    Registers a telemetry class with the telemetry factory without importing it.  A placeholder class
+    is registered that imports the real class when the factory first creates an instance and then
+    replaces itself in the registry with the real class.
+
+    :param name: name of the telemetry provider
+    :param class_path: "module:class" of the telemetry class
+    """
+
+    def __new__(cls: Type[Telemetry], *args: Any, **kwargs: Any) -> Telemetry:
+        telemetry_class: Type[Telemetry] = load_telemetry_class(class_path)
+        TelemetryFactory.register_telemetry_class(
+            name=name, telemetry_class=telemetry_class
+        )
+        return telemetry_class(*args, **kwargs)
 
     TelemetryFactory.register_telemetry_class(
-        name=OpenTelemetry.telemetry_provider,
-        telemetry_class=OpenTelemetry,
+        name=name,
+        telemetry_class=cast(
+            Type[Telemetry],
+            type(
+                f"Lazy{class_path.rsplit(':', 1)[-1]}",
+                (Telemetry,),
+                {"__new__": __new__, "__module__": __name__, "class_path": class_path},
+            ),
+        ),
     )
+
+
+@lru_cache(maxsize=None)
+def load_telemetry_class(class_path: str) -> Type[Telemetry]:
+    """
+    Imports the telemetry class
+
+    :param class_path: "module:class" of the telemetry class
+    """
+    module_name, class_name = class_path.split(":")
+    telemetry_class: Type[Telemetry] = getattr(import_module(module_name), class_name)
+    assert issubclass(
+        telemetry_class, Telemetry
+    ), f"{class_path} is not a subclass of Telemetry"
+    return telemetry_class
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+
+from helixcore.structures.helix_personmatching.logics.compact_match_score_without_threshold import (
+    CompactMatchScoreWithoutThreshold,
+)
+from helixcore.structures.helix_personmatching.logics.compact_rule_score import (
+    CompactRuleScore,
+)
+from helixcore.structures.helix_personmatching.logics.compact_scoring_input import (
+    CompactScoringInput,
+)
+from helixcore.structures.helix_personmatching.logics.match_score import MatchScore
+
+
+@dataclass(slots=True)
+class CompactMatchScore(CompactMatchScoreWithoutThreshold):
+    matched: bool
+    threshold: float
+
+    @classmethod
+    def from_match_score(cls, match_score: MatchScore) -> "CompactMatchScore":
+        return cls(
+            id_source=match_score.id_source,
+            id_target=match_score.id_target,
+            source=CompactScoringInput.from_scoring_input(match_score.source),
+            target=CompactScoringInput.from_scoring_input(match_score.target),
+            rule_scores=[
+                CompactRuleScore.from_rule_score(rule_score)
+                for rule_score in match_score.rule_scores
+            ],
+            total_score=match_score.total_score,
+            total_score_unscaled=match_score.total_score_unscaled,
+            average_score=match_score.average_score,
+            average_boost=match_score.average_boost,
+            diagnostics=None,
+            matched=match_score.matched,
+            threshold=match_score.threshold,
+        )
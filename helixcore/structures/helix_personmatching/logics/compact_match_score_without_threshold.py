@@ -0,0 +1,83 @@
+import json
+from dataclasses import dataclass, fields
+from typing import List, Optional, OrderedDict, Any, Dict
+
+from helixcore.structures.helix_personmatching.logics.compact_rule_score import (
+    CompactRuleScore,
+)
+from helixcore.structures.helix_personmatching.logics.compact_scoring_input import (
+    CompactScoringInput,
+)
+from helixcore.structures.helix_personmatching.logics.match_score_without_threshold import (
+    MatchScoreWithoutThreshold,
+)
+from helixcore.utilities.json_serializer.json_serializer import EnhancedJSONEncoder
+from helixcore.utilities.score_diagnostics_generator.score_diagnostics_generator import (
+    ScoreDiagnosticsGenerator,
+)
+
+
+@dataclass(slots=True)
+class CompactMatchScoreWithoutThreshold:
+    """
+    Slotted counterpart of MatchScoreWithoutThreshold.  Serializes to the same json.
+    """
+
+    id_source: Optional[str]
+    id_target: Optional[str]
+    source: CompactScoringInput
+    target: CompactScoringInput
+    rule_scores: List[CompactRuleScore]
+    total_score: float
+    total_score_unscaled: float
+    average_score: float
+    average_boost: Optional[float]
+    diagnostics: List[OrderedDict[str, Any]] | None
+
+    def __post_init__(self) -> None:
+        self.diagnostics = self._generate_diagnostics()
+
+    @classmethod
+    def from_match_score_without_threshold(
+        cls, match_score: MatchScoreWithoutThreshold
+    ) -> "CompactMatchScoreWithoutThreshold":
+        return cls(
+            id_source=match_score.id_source,
+            id_target=match_score.id_target,
+            source=CompactScoringInput.from_scoring_input(match_score.source),
+            target=CompactScoringInput.from_scoring_input(match_score.target),
+            rule_scores=[
+                CompactRuleScore.from_rule_score(rule_score)
+                for rule_score in match_score.rule_scores
+            ],
+            total_score=match_score.total_score,
+            total_score_unscaled=match_score.total_score_unscaled,
+            average_score=match_score.average_score,
+            average_boost=match_score.average_boost,
+            diagnostics=None,
+        )
+
+    def to_json(
+        self, include_diagnostics: bool = False, include_rule_scores: bool = False
+    ) -> str:
+        # slotted classes have no __dict__ so build the same shallow dict from the fields
+        dict_: Dict[str, Any] = {
+            field.name: getattr(self, field.name) for field in fields(self)
+        }
+
+        if not include_diagnostics:
+            # don't include diagnostics in the json by default
+            dict_.pop("diagnostics")
+        if not include_rule_scores:
+            # don't include rule scores in the json by default
+            dict_.pop("rule_scores")
+        return json.dumps(dict_, cls=EnhancedJSONEncoder)
+
+    def _generate_diagnostics(self) -> List[OrderedDict[str, Any]]:
+        return ScoreDiagnosticsGenerator.generate_diagnostics(self.rule_scores)
+
+    def get_diagnostics_as_csv(self) -> Optional[str]:
+        return ScoreDiagnosticsGenerator.convert_to_csv(self.diagnostics)
+
+    def get_diagnostics_as_json(self) -> Optional[str]:
+        return json.dumps(self.diagnostics, cls=EnhancedJSONEncoder)
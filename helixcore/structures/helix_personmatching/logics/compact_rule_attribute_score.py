@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from helixcore.structures.helix_personmatching.logics.rule_attribute_score import (
+    RuleAttributeScore,
+)
+from helixcore.structures.helix_personmatching.models.compact_attribute_entry import (
+    CompactAttributeEntry,
+)
+from helixcore.structures.helix_personmatching.models.string_match_type import (
+    StringMatchType,
+)
+
+
+@dataclass(slots=True)
+class CompactRuleAttributeScore:
+    """
+    Slotted counterpart of RuleAttributeScore.  The attribute is an interned
+    CompactAttributeEntry shared by every score for that attribute.
+    """
+
+    attribute: CompactAttributeEntry
+    score: float
+    present: bool
+    source: Optional[str]
+    target: Optional[str]
+    string_match_type: Optional[StringMatchType] = None
+
+    @classmethod
+    def from_rule_attribute_score(
+        cls, attribute_score: RuleAttributeScore
+    ) -> "CompactRuleAttributeScore":
+        return cls(
+            attribute=CompactAttributeEntry.from_attribute_entry(
+                attribute_score.attribute
+            ),
+            score=attribute_score.score,
+            present=attribute_score.present,
+            source=attribute_score.source,
+            target=attribute_score.target,
+            string_match_type=attribute_score.string_match_type,
+        )
+
+    def to_rule_attribute_score(self) -> RuleAttributeScore:
+        return RuleAttributeScore(
+            attribute=self.attribute.to_attribute_entry(),
+            score=self.score,
+            present=self.present,
+            source=self.source,
+            target=self.target,
+            string_match_type=self.string_match_type,
+        )
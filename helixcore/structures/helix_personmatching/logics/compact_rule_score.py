@@ -0,0 +1,69 @@
+import json
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+from helixcore.structures.helix_personmatching.logics.compact_rule_attribute_score import (
+    CompactRuleAttributeScore,
+)
+from helixcore.structures.helix_personmatching.logics.rule_score import RuleScore
+from helixcore.structures.helix_personmatching.models.rules.RuleWeight import RuleWeight
+from helixcore.utilities.json_serializer.json_serializer import EnhancedJSONEncoder
+
+
+@dataclass(slots=True)
+class CompactRuleScore:
+    """
+    Slotted counterpart of RuleScore.  Rule names and descriptions are interned since
+    every match result repeats the same small set of rules.
+    """
+
+    id_source: str
+    id_target: str
+    rule_name: str
+    rule_description: str
+    rule_score: float
+    attribute_scores: List[CompactRuleAttributeScore]
+    rule_unweighted_score: float
+    rule_weight: RuleWeight
+    rule_boost: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        self.rule_name = sys.intern(self.rule_name)
+        self.rule_description = sys.intern(self.rule_description)
+
+    @classmethod
+    def from_rule_score(cls, rule_score: RuleScore) -> "CompactRuleScore":
+        return cls(
+            id_source=rule_score.id_source,
+            id_target=rule_score.id_target,
+            rule_name=rule_score.rule_name,
+            rule_description=rule_score.rule_description,
+            rule_score=rule_score.rule_score,
+            attribute_scores=[
+                CompactRuleAttributeScore.from_rule_attribute_score(attribute_score)
+                for attribute_score in rule_score.attribute_scores
+            ],
+            rule_unweighted_score=rule_score.rule_unweighted_score,
+            rule_weight=rule_score.rule_weight,
+            rule_boost=rule_score.rule_boost,
+        )
+
+    def to_rule_score(self) -> RuleScore:
+        return RuleScore(
+            id_source=self.id_source,
+            id_target=self.id_target,
+            rule_name=self.rule_name,
+            rule_description=self.rule_description,
+            rule_score=self.rule_score,
+            attribute_scores=[
+                attribute_score.to_rule_attribute_score()
+                for attribute_score in self.attribute_scores
+            ],
+            rule_unweighted_score=self.rule_unweighted_score,
+            rule_weight=self.rule_weight,
+            rule_boost=self.rule_boost,
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(self, cls=EnhancedJSONEncoder)
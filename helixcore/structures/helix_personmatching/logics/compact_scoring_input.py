@@ -0,0 +1,49 @@
+import json
+from dataclasses import dataclass, fields
+from typing import Optional
+
+from helixcore.structures.helix_personmatching.logics.scoring_input import ScoringInput
+from helixcore.utilities.json_serializer.json_serializer import EnhancedJSONEncoder
+
+
+@dataclass(slots=True)
+class CompactScoringInput:
+    """
+    Slotted counterpart of ScoringInput with the same fields in the same order so it
+    serializes to exactly the same json.
+    """
+
+    id_: Optional[str]
+    name_given: Optional[str]
+    name_middle: Optional[str]
+    name_middle_initial: Optional[str]
+    name_family: Optional[str]
+    gender: Optional[str]
+    birth_date: Optional[str]
+    address_postal_code: Optional[str]
+    address_postal_code_first_five: Optional[str]
+    address_line_1: Optional[str]
+    address_line_1_st_num: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    birth_date_year: Optional[str]
+    birth_date_month: Optional[str]
+    birth_date_day: Optional[str]
+    phone_area: Optional[str]
+    phone_local: Optional[str]
+    phone_line: Optional[str]
+    email_username: Optional[str]
+    is_adult_today: Optional[bool]
+    ssn: Optional[str]
+    ssn_last4: Optional[str]
+    meta_security_client_slug: Optional[str]
+
+    @classmethod
+    def from_scoring_input(cls, scoring_input: ScoringInput) -> "CompactScoringInput":
+        return cls(*(getattr(scoring_input, field.name) for field in fields(cls)))
+
+    def to_scoring_input(self) -> ScoringInput:
+        return ScoringInput(*(getattr(self, field.name) for field in fields(self)))
+
+    def to_json(self) -> str:
+        return json.dumps(self, cls=EnhancedJSONEncoder)
@@ -0,0 +1,85 @@
+from typing import List
+
+from helixcore.structures.helix_personmatching.logics.match_score import MatchScore
+from helixcore.structures.helix_personmatching.logics.rule_attribute_score import (
+    RuleAttributeScore,
+)
+from helixcore.structures.helix_personmatching.logics.rule_score import RuleScore
+from helixcore.structures.helix_personmatching.logics.scoring_input import ScoringInput
+from helixcore.structures.helix_personmatching.models.attribute_entry import (
+    AttributeEntry,
+)
+from helixcore.structures.helix_personmatching.models.rules.RuleWeight import RuleWeight
+from helixcore.structures.helix_personmatching.models.string_match_type import (
+    StringMatchType,
+)
+
+
+def create_scoring_input(id_: str) -> ScoringInput:
+    return ScoringInput(
+        id_=id_,
+        name_given="JAMES",
+        name_middle="A",
+        name_middle_initial="A",
+        name_family="SMITH",
+        gender="male",
+        birth_date="1980-01-02",
+        address_postal_code="12345-6789",
+        address_postal_code_first_five="12345",
+        address_line_1="123 Main St",
+        address_line_1_st_num="123",
+        email="james@example.com",
+        phone="5551234567",
+        birth_date_year="1980",
+        birth_date_month="01",
+        birth_date_day="02",
+        phone_area="555",
+        phone_local="123",
+        phone_line="4567",
+        email_username="james",
+        is_adult_today=True,
+        ssn=None,
+        ssn_last4=None,
+        meta_security_client_slug="bwell",
+    )
+
+
+def create_match_score(id_source: str, id_target: str) -> MatchScore:
+    rule_weight = RuleWeight.get_standard_weight()
+    rule_scores: List[RuleScore] = [
+        RuleScore(
+            id_source=id_source,
+            id_target=id_target,
+            rule_name=f"Rule-{rule_index:03d}",
+            rule_description="given name, family name, birth date",
+            rule_score=0.9,
+            attribute_scores=[
+                RuleAttributeScore(
+                    attribute=AttributeEntry(name=attribute_name, exact_only=True),
+                    score=1.0,
+                    present=True,
+                    source="JAMES",
+                    target="JAMES",
+                    string_match_type=StringMatchType.Exact,
+                )
+                for attribute_name in ["name_given", "name_family", "birth_date"]
+            ],
+            rule_unweighted_score=1.0,
+            rule_weight=rule_weight,
+        )
+        for rule_index in range(5)
+    ]
+    return MatchScore(
+        id_source=id_source,
+        id_target=id_target,
+        source=create_scoring_input(id_source),
+        target=create_scoring_input(id_target),
+        rule_scores=rule_scores,
+        total_score=0.9,
+        total_score_unscaled=0.9,
+        average_score=0.9,
+        average_boost=None,
+        diagnostics=None,
+        matched=True,
+        threshold=0.8,
+    )
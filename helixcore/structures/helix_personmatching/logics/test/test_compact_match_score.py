@@ -0,0 +1,71 @@
+import logging
+import tracemalloc
+from typing import Any
+
+from helixcore.structures.helix_personmatching.logics.compact_match_score import (
+    CompactMatchScore,
+)
+from helixcore.structures.helix_personmatching.logics.test.match_score_factory import (
+    create_match_score,
+)
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def test_compact_match_score_serializes_same_as_match_score() -> None:
+    match_score = create_match_score("source-1", "target-1")
+    compact_match_score = CompactMatchScore.from_match_score(match_score)
+
+    assert compact_match_score.to_json() == match_score.to_json()
+    assert compact_match_score.to_json(
+        include_diagnostics=True, include_rule_scores=True
+    ) == match_score.to_json(include_diagnostics=True, include_rule_scores=True)
+    assert compact_match_score.source.to_json() == match_score.source.to_json()
+    assert (
+        compact_match_score.rule_scores[0].to_json()
+        == match_score.rule_scores[0].to_json()
+    )
+    assert (
+        compact_match_score.get_diagnostics_as_csv()
+        == match_score.get_diagnostics_as_csv()
+    )
+    assert compact_match_score.source.to_scoring_input() == match_score.source
+    assert (
+        compact_match_score.rule_scores[0].to_rule_score() == match_score.rule_scores[0]
+    )
+
+
+def test_compact_match_score_interns_attributes() -> None:
+    first = CompactMatchScore.from_match_score(create_match_score("s1", "t1"))
+    second = CompactMatchScore.from_match_score(create_match_score("s2", "t2"))
+
+    assert (
+        first.rule_scores[0].attribute_scores[0].attribute
+        is second.rule_scores[0].attribute_scores[0].attribute
+    )
+    assert first.rule_scores[1].rule_name is second.rule_scores[1].rule_name
+
+
+def test_compact_match_score_uses_less_memory() -> None:
+    count: int = 200
+
+    def measure(build: Any) -> int:
+        tracemalloc.start()
+        results = [build(i) for i in range(count)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(results) == count
+        return size
+
+    # both build from the same inputs.  The MatchScore the compact one is converted from is freed so only
+    # the memory that is kept is measured
+    regular_size = measure(lambda i: create_match_score(f"s{i}", f"t{i}"))
+    compact_size = measure(
+        lambda i: CompactMatchScore.from_match_score(
+            create_match_score(f"s{i}", f"t{i}")
+        )
+    )
+    logger.info(
+        f"bytes per match result: regular={regular_size // count}, compact={compact_size // count}"
+    )
+    assert compact_size < regular_size
@@ -0,0 +1,67 @@
+import sys
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Optional, Tuple
+
+from helixcore.structures.helix_personmatching.models.attribute_entry import (
+    AttributeEntry,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CompactAttributeEntry:
+    """
+    Immutable, slotted counterpart of AttributeEntry.
+
+    Every rule attribute score points at one of a handful of attributes so instances are
+    interned: use CompactAttributeEntry.intern() to get the shared instance.
+    """
+
+    name: str
+    exact_only: Optional[bool] = None
+    nick_name_match: Optional[bool] = None
+
+    _interned: ClassVar[
+        Dict[Tuple[str, Optional[bool], Optional[bool]], "CompactAttributeEntry"]
+    ] = {}
+
+    @classmethod
+    def intern(
+        cls,
+        name: str,
+        exact_only: Optional[bool] = None,
+        nick_name_match: Optional[bool] = None,
+    ) -> "CompactAttributeEntry":
+        """
+        Returns the shared instance for this attribute, creating it on first use
+
+
+        :param name: name of the attribute
+        :param exact_only: whether only exact matches count
+        :param nick_name_match: whether nick names are matched
+        :return: the shared CompactAttributeEntry
+        """
+        key = (name, exact_only, nick_name_match)
+        entry = cls._interned.get(key)
+        if entry is None:
+            entry = cls(
+                name=sys.intern(name),
+                exact_only=exact_only,
+                nick_name_match=nick_name_match,
+            )
+            cls._interned[key] = entry
+        return entry
+
+    @classmethod
+    def from_attribute_entry(cls, entry: AttributeEntry) -> "CompactAttributeEntry":
+        return cls.intern(
+            name=entry.name,
+            exact_only=entry.exact_only,
+            nick_name_match=entry.nick_name_match,
+        )
+
+    def to_attribute_entry(self) -> AttributeEntry:
+        return AttributeEntry(
+            name=self.name,
+            exact_only=self.exact_only,
+            nick_name_match=self.nick_name_match,
+        )
@@ -14,6 +14,9 @@ from helixcore.structures.patient_access_transformer.v5.helpers.structures.patie
 from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_row_context import (
     PatientAccessRowContext,
 )
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_row_context_snapshot import (
+    PatientAccessRowContextSnapshot,
+)
 from helixcore.structures.patient_access_transformer.v5.helpers.structures.person_match_result_or_error import (
     PersonMatchResultOrError,
 )
@@ -57,25 +60,14 @@ class DemographicsMismatchEntry(DataClassJsonMixin, BaseMetric):
 
     def __post_init__(self) -> None:
         assert self.row_context, "row_context should not be None"
-        self.run_id: Optional[str] = self.row_context.run_context.run_id
-        self.run_date_time: Optional[datetime] = (
-            self.row_context.run_context.run_date_time
-        )
-        self.connection_type: Optional[str] = (
-            self.row_context.run_context.connection_type
-        )
-        self.fhir_version: Optional[str] = (
-            self.row_context.connection_entry.fhir_version
-        )
-        self.pipeline_category: Optional[str] = (
-            self.row_context.run_context.pipeline_category
-        )
-        self.pipeline_version: Optional[str] = (
-            self.row_context.run_context.pipeline_version
-        )
-        self.new_tokens_only: Optional[bool] = (
-            self.row_context.run_context.new_tokens_only
-        )
+        snapshot: PatientAccessRowContextSnapshot = self.row_context.snapshot
+        self.run_id = snapshot.run_id
+        self.run_date_time = snapshot.run_date_time
+        self.connection_type = snapshot.connection_type
+        self.fhir_version = snapshot.fhir_version
+        self.pipeline_category = snapshot.pipeline_category
+        self.pipeline_version = snapshot.pipeline_version
+        self.new_tokens_only = snapshot.new_tokens_only
 
         self.error: Optional[str] = MySqlTextHelper.truncate(
             text=self.match_result.get_error_text() if self.match_result else None,
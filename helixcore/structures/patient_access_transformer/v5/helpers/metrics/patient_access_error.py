@@ -6,7 +6,6 @@ from typing import List, Optional, ClassVar, Dict, override
 
 from dataclasses_json import DataClassJsonMixin, config, LetterCase
 from dataclasses_json.core import Json
-from helix_fhir_client_sdk.utilities.fhir_scope_parser import FhirScopeParser
 
 from helixcore.utilities.metrics.base_metrics import BaseMetric
 from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_issue_severity import (
@@ -15,6 +14,9 @@ from helixcore.structures.patient_access_transformer.v5.helpers.structures.patie
 from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_row_context import (
     PatientAccessRowContext,
 )
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_row_context_snapshot import (
+    PatientAccessRowContextSnapshot,
+)
 from helixcore.utilities.fhir.fhir_resource_helpers.v2.fhir_resource_helpers import (
     FhirResourceHelpers,
 )
@@ -111,38 +113,8 @@ class PatientAccessError(DataClassJsonMixin, BaseMetric):
         """
         assert row_context, "row_context must be provided"
         assert row_context.run_context, "run_context must be provided"
-        # read values from the run context
-        client_person_id: Optional[str] = (
-            row_context.connection_entry.client_fhir_person_id
-        )
-        client_source_url: Optional[str] = row_context.connection_entry.url
-        slug: Optional[str] = row_context.connection_entry.service_slug
-        master_person_id: Optional[str] = (
-            row_context.connection_entry.bwell_fhir_person_id
-        )
-        connection_type: str = row_context.run_context.connection_type
-        fhir_version: Optional[str] = row_context.connection_entry.fhir_version
-        run_id: str = row_context.run_context.run_id
-        run_date_time: datetime = row_context.run_context.run_date_time
-        pipeline_category: Optional[str] = row_context.run_context.pipeline_category
-        new_tokens_only: Optional[bool] = row_context.run_context.new_tokens_only
-        pipeline_version: Optional[str] = row_context.run_context.pipeline_version
-        token: Optional[str] = row_context.connection_entry.token
-        patient_id: Optional[str] = row_context.connection_entry.patient_id
-        last_updated: Optional[datetime] = (
-            row_context.connection_entry.get_last_updated()
-        )
-        created_date: Optional[datetime] = (
-            row_context.connection_entry.get_created_date()
-        )
-        expiry: Optional[datetime] = row_context.connection_entry.get_expiry()
-        scope: Optional[str] = MySqlTextHelper.truncate(
-            row_context.connection_entry.scope,
-            maximum_length=MYSQL_MEDIUMTEXT_MAX_CHARACTERS,
-        )
-        source_system_type: Optional[str] = (
-            row_context.connection_entry.source_system_type
-        )
+        # values from the run context and connection entry are computed once per row
+        snapshot: PatientAccessRowContextSnapshot = row_context.snapshot
 
         url = MySqlTextHelper.truncate(url, maximum_length=MYSQL_TEXT_MAX_CHARACTERS)
         if exception is not None:
@@ -177,24 +149,24 @@ class PatientAccessError(DataClassJsonMixin, BaseMetric):
             severity=severity,
             error_code=error_code,
             raw_resource_json=raw_resource_json,
-            client_person_id=client_person_id,
-            client_source_url=client_source_url,
-            slug=slug,
-            master_person_id=master_person_id,
-            connection_type=connection_type,
-            fhir_version=fhir_version,
-            run_id=run_id,
-            run_date_time=run_date_time,
-            pipeline_category=pipeline_category,
-            new_tokens_only=new_tokens_only,
-            pipeline_version=pipeline_version,
-            token=token,
-            patient_id=patient_id,
-            last_updated=last_updated,
-            created_date=created_date,
-            expiry=expiry,
-            scope=scope,
-            source_system_type=source_system_type,
+            client_person_id=snapshot.client_person_id,
+            client_source_url=snapshot.client_source_url,
+            slug=snapshot.slug,
+            master_person_id=snapshot.master_person_id,
+            connection_type=snapshot.connection_type,
+            fhir_version=snapshot.fhir_version,
+            run_id=snapshot.run_id,
+            run_date_time=snapshot.run_date_time,
+            pipeline_category=snapshot.pipeline_category,
+            new_tokens_only=snapshot.new_tokens_only,
+            pipeline_version=snapshot.pipeline_version,
+            token=snapshot.token,
+            patient_id=snapshot.patient_id,
+            last_updated=snapshot.last_updated,
+            created_date=snapshot.created_date,
+            expiry=snapshot.expiry,
+            scope=snapshot.scope,
+            source_system_type=snapshot.source_system_type,
         )
 
     def to_dict(self, encode_json: bool = False) -> Dict[str, Json]:
@@ -228,6 +200,9 @@ class PatientAccessError(DataClassJsonMixin, BaseMetric):
         url: Optional[str],
         severity: str,
     ) -> str:
+        # helix_fhir_client_sdk is slow to import and only needed for client side errors
+        from helix_fhir_client_sdk.utilities.fhir_scope_parser import FhirScopeParser
+
         scope_parser: FhirScopeParser = FhirScopeParser(
             scope.split(" ") if isinstance(scope, str) else None
         )
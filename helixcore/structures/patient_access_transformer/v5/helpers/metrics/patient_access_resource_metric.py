@@ -9,12 +9,14 @@ from helixcore.utilities.metrics.base_metrics import BaseMetric
 from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_row_context import (
     PatientAccessRowContext,
 )
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_row_context_snapshot import (
+    PatientAccessRowContextSnapshot,
+)
 from helixcore.structures.patient_access_transformer.v5.helpers.structures.resource_received_info import (
     ResourceReceivedInfo,
 )
 from helixcore.utilities.mysql.my_sql_text_helper.my_sql_text_helper import (
     MySqlTextHelper,
-    MYSQL_MEDIUMTEXT_MAX_CHARACTERS,
     MYSQL_LONGTEXT_MAX_CHARACTERS,
     MYSQL_TEXT_MAX_CHARACTERS,
 )
@@ -58,23 +60,21 @@ class PatientAccessResourceMetric(DataClassJsonMixin, BaseMetric):
 
     def __post_init__(self) -> None:
         assert self.row_context, "row_context should not be None"
-        self.slug = self.row_context.connection_entry.service_slug
-        self.patient_id = self.row_context.connection_entry.patient_id
-        self.client_person_id = self.row_context.connection_entry.client_fhir_person_id
-        self.master_person_id = self.row_context.connection_entry.bwell_fhir_person_id
-        self.run_id = self.row_context.run_context.run_id
-        self.run_date_time = self.row_context.run_context.run_date_time
-        self.pipeline_category = self.row_context.run_context.pipeline_category
-        self.new_tokens_only = self.row_context.run_context.new_tokens_only
-        self.connection_type = self.row_context.run_context.connection_type
-        self.pipeline_version = self.row_context.run_context.pipeline_version
-        self.fhir_version = self.row_context.connection_entry.fhir_version
-        self.scope = MySqlTextHelper.truncate(
-            self.row_context.connection_entry.scope,
-            maximum_length=MYSQL_MEDIUMTEXT_MAX_CHARACTERS,
-        )
-        self.source_system_type = self.row_context.connection_entry.source_system_type
-        self.status = self.row_context.connection_entry.status
+        snapshot: PatientAccessRowContextSnapshot = self.row_context.snapshot
+        self.slug = snapshot.slug
+        self.patient_id = snapshot.patient_id
+        self.client_person_id = snapshot.client_person_id
+        self.master_person_id = snapshot.master_person_id
+        self.run_id = snapshot.run_id
+        self.run_date_time = snapshot.run_date_time
+        self.pipeline_category = snapshot.pipeline_category
+        self.new_tokens_only = snapshot.new_tokens_only
+        self.connection_type = snapshot.connection_type
+        self.pipeline_version = snapshot.pipeline_version
+        self.fhir_version = snapshot.fhir_version
+        self.scope = snapshot.scope
+        self.source_system_type = snapshot.source_system_type
+        self.status = snapshot.status
         self.resource_count = len(self.resources_received)
         bundle = (
             Bundle.construct(
@@ -1,4 +1,5 @@
 import dataclasses
+from functools import cached_property
 from contextlib import asynccontextmanager
 from typing import Any, Dict, Optional, AsyncGenerator
 
@@ -17,6 +18,9 @@ from helixtelemetry.telemetry.spans.telemetry_span_wrapper import (
 from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_run_context import (
     PatientAccessRunContext,
 )
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_row_context_snapshot import (
+    PatientAccessRowContextSnapshot,
+)
 from helixcore.structures.token_service_receiver.v3.connection_entry import (
     ConnectionEntry,
 )
@@ -35,6 +39,16 @@ class PatientAccessRowContext(DataClassJsonMixin):
     connection_entry: ConnectionEntry
     """ The connection entry for the row """
 
+    @cached_property
+    def snapshot(self) -> PatientAccessRowContextSnapshot:
+        """
+        The run context and connection entry values written with every metric of this row.  Computed
+        the first time it is used so the connection entry should not be changed after metrics are created.
+        """
+        return PatientAccessRowContextSnapshot.create(
+            run_context=self.run_context, connection_entry=self.connection_entry
+        )
+
     @asynccontextmanager
     async def create_telemetry_span_async(
         self,
@@ -0,0 +1,87 @@
+import dataclasses
+from datetime import datetime
+from typing import Optional
+
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_run_context import (
+    PatientAccessRunContext,
+)
+from helixcore.structures.token_service_receiver.v3.connection_entry import (
+    ConnectionEntry,
+)
+from helixcore.utilities.mysql.my_sql_text_helper.my_sql_text_helper import (
+    MySqlTextHelper,
+    MYSQL_MEDIUMTEXT_MAX_CHARACTERS,
+    MYSQL_TEXT_MAX_CHARACTERS,
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class PatientAccessRowContextSnapshot:
+    """
+    The values of the run context and connection entry that are written with every metric for a row.
+    Computed once per row (dates parsed and text truncated) and shared by all the metrics of the row.
+    """
+
+    run_id: str
+    run_date_time: datetime
+    connection_type: str
+    pipeline_category: Optional[str]
+    pipeline_version: Optional[str]
+    new_tokens_only: Optional[bool]
+    slug: Optional[str]
+    url: Optional[str]
+    """ url of the source system truncated to fit in a TEXT column """
+    client_source_url: Optional[str]
+    """ url of the source system """
+    patient_id: Optional[str]
+    client_person_id: Optional[str]
+    master_person_id: Optional[str]
+    fhir_version: Optional[str]
+    token: Optional[str]
+    last_updated: Optional[datetime]
+    created_date: Optional[datetime]
+    expiry: Optional[datetime]
+    scope: Optional[str]
+    """ scope truncated to fit in a MEDIUMTEXT column """
+    source_system_type: Optional[str]
+    status: Optional[str]
+
+    @classmethod
+    def create(
+        cls,
+        *,
+        run_context: PatientAccessRunContext,
+        connection_entry: ConnectionEntry,
+    ) -> "PatientAccessRowContextSnapshot":
+        """
+        Creates the snapshot
+
+        :param run_context: context of the run
+        :param connection_entry: connection entry of the row
+        """
+        return cls(
+            run_id=run_context.run_id,
+            run_date_time=run_context.run_date_time,
+            connection_type=run_context.connection_type,
+            pipeline_category=run_context.pipeline_category,
+            pipeline_version=run_context.pipeline_version,
+            new_tokens_only=run_context.new_tokens_only,
+            slug=connection_entry.service_slug,
+            url=MySqlTextHelper.truncate(
+                connection_entry.url, maximum_length=MYSQL_TEXT_MAX_CHARACTERS
+            ),
+            client_source_url=connection_entry.url,
+            patient_id=connection_entry.patient_id,
+            client_person_id=connection_entry.client_fhir_person_id,
+            master_person_id=connection_entry.bwell_fhir_person_id,
+            fhir_version=connection_entry.fhir_version,
+            token=connection_entry.token,
+            last_updated=connection_entry.get_last_updated(),
+            created_date=connection_entry.get_created_date(),
+            expiry=connection_entry.get_expiry(),
+            scope=MySqlTextHelper.truncate(
+                connection_entry.scope, maximum_length=MYSQL_MEDIUMTEXT_MAX_CHARACTERS
+            ),
+            source_system_type=connection_entry.source_system_type,
+            status=connection_entry.status,
+        )
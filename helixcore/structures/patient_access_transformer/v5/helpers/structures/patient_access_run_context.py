@@ -1,7 +1,10 @@
 import dataclasses
 import datetime
+import os
+import threading
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import Optional, Any, Dict, AsyncGenerator, List
+from typing import Optional, Any, Dict, AsyncGenerator, List, Tuple, Mapping, cast
 
 from dataclasses_json import DataClassJsonMixin
 from helixtelemetry.telemetry.providers.telemetry import Telemetry
@@ -37,6 +40,74 @@ from helixcore.utilities.async_pandas_udf.v1.async_pandas_udf_parameters import
 from helixcore.utilities.metrics.writer.base_metrics_writer_parameters import (
     BaseMetricsWriterParameters,
 )
+from helixcore.utilities.telemetry.sampled_telemetry_span_creator import (
+    SampledTelemetrySpanCreator,
+)
+from helixcore.utilities.telemetry.telemetry_sampling_config import (
+    TelemetrySamplingConfig,
+)
+
+# maximum number of counters/histograms cached per run.  Instruments whose attributes include row level values
+# would otherwise grow the cache without bound
+TELEMETRY_INSTRUMENT_CACHE_SIZE: int = 1024
+# maximum number of runs whose telemetry is cached per process.  Long-lived executors run many runs and the
+# telemetry of old runs (with its exporters) would otherwise be kept forever
+RUN_TELEMETRY_CACHE_SIZE: int = 8
+
+TelemetryInstrumentKey = Tuple[str, str, str, str, Tuple[Any, ...], Tuple[Any, ...]]
+
+
+@dataclasses.dataclass
+class PatientAccessRunTelemetry:
+    """
+    The telemetry objects for a run in this process.  Shared by every copy of the run context
+    (e.g., each partition unpickles its own copy) so they are only created once per process.
+    """
+
+    telemetry: Telemetry
+    telemetry_span_creator: TelemetrySpanCreator
+    instruments: "OrderedDict[TelemetryInstrumentKey, Any]" = dataclasses.field(
+        default_factory=OrderedDict
+    )
+    lock: threading.Lock = dataclasses.field(default_factory=threading.Lock)
+
+
+RunTelemetryKey = Tuple[int, str, str, Optional[str], Optional[str]]
+
+# (process id, run id, telemetry context, log level, sampling config) -> telemetry for the run.  Least
+# recently used runs are evicted first
+_run_telemetry_cache: "OrderedDict[RunTelemetryKey, PatientAccessRunTelemetry]" = (
+    OrderedDict()
+)
+_run_telemetry_cache_lock: threading.Lock = threading.Lock()
+
+
+def _freeze_value(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return tuple(
+            sorted(((str(k), _freeze_value(v)) for k, v in value.items()), key=repr)
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_freeze_value(v) for v in value), key=repr))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _freeze_attributes(attributes: Optional[Mapping[str, Any]]) -> Tuple[Any, ...]:
+    if not attributes:
+        return ()
+    # values can be unhashable (e.g. dicts) so they are frozen recursively
+    return tuple(
+        sorted(
+            ((key, _freeze_value(value)) for key, value in attributes.items()),
+            key=lambda item: item[0],
+        )
+    )
 
 
 @dataclasses.dataclass
@@ -120,6 +191,9 @@ class PatientAccessRunContext(DataClassJsonMixin):
     master_persons: Optional[List[str]] = None
     client_persons: Optional[List[str]] = None
 
+    telemetry_sampling_config: Optional[TelemetrySamplingConfig] = None
+    """ Sampling of the telemetry spans for the run.  If None, all spans are created """
+
     def is_human_api_pipeline(self) -> bool:
         return self.connection_type == "humanapi"
 
@@ -147,13 +221,70 @@ class PatientAccessRunContext(DataClassJsonMixin):
         _telemetry: Telemetry = _telemetry_factory.create(log_level=self.log_level)
         return _telemetry
 
+    def _get_run_telemetry(self) -> PatientAccessRunTelemetry:
+        """
+        Returns the telemetry objects for this run, creating them the first time they are used in this process
+        """
+        run_telemetry: Optional[PatientAccessRunTelemetry] = self.__dict__.get(
+            "_run_telemetry"
+        )
+        pid: int = os.getpid()
+        if run_telemetry is not None and self.__dict__.get("_run_telemetry_pid") == pid:
+            return run_telemetry
+
+        telemetry_parent: TelemetryParent = (
+            self.telemetry_parent or TelemetryParent.get_null_parent()
+        )
+        cache_key: RunTelemetryKey = (
+            pid,
+            self.run_id,
+            telemetry_parent.telemetry_context.to_json(sort_keys=True),
+            self.log_level,
+            (
+                self.telemetry_sampling_config.to_json(sort_keys=True)
+                if self.telemetry_sampling_config
+                else None
+            ),
+        )
+        with _run_telemetry_cache_lock:
+            run_telemetry = _run_telemetry_cache.get(cache_key)
+            if run_telemetry is not None:
+                _run_telemetry_cache.move_to_end(cache_key)
+            else:
+                _telemetry: Telemetry = self._create_telemetry()
+                run_telemetry = PatientAccessRunTelemetry(
+                    telemetry=_telemetry,
+                    telemetry_span_creator=(
+                        SampledTelemetrySpanCreator(
+                            telemetry=_telemetry,
+                            sampling_config=self.telemetry_sampling_config,
+                            run_id=self.run_id,
+                        )
+                        if self.telemetry_sampling_config
+                        else TelemetrySpanCreator(telemetry=_telemetry)
+                    ),
+                )
+                _run_telemetry_cache[cache_key] = run_telemetry
+                if len(_run_telemetry_cache) > RUN_TELEMETRY_CACHE_SIZE:
+                    _run_telemetry_cache.popitem(last=False)
+        # cached on the instance but not a dataclass field so it is not serialized or compared
+        self.__dict__["_run_telemetry"] = run_telemetry
+        self.__dict__["_run_telemetry_pid"] = pid
+        return run_telemetry
+
     @property
     def telemetry_span_creator(self) -> TelemetrySpanCreator:
-        _telemetry: Telemetry = self._create_telemetry()
-        return TelemetrySpanCreator(telemetry=_telemetry)
+        return self._get_run_telemetry().telemetry_span_creator
 
     async def flush_telemetry_async(self) -> None:
-        pass
+        # emit the rollup spans of the rows processed so far
+        if (
+            self.telemetry_sampling_config
+            and self.telemetry_sampling_config.rollup_span_names
+        ):
+            telemetry_span_creator: TelemetrySpanCreator = self.telemetry_span_creator
+            if isinstance(telemetry_span_creator, SampledTelemetrySpanCreator):
+                await telemetry_span_creator.emit_rollups_async()
         # if self._telemetry:
         #     await self._telemetry.flush_async()
 
@@ -162,9 +293,76 @@ class PatientAccessRunContext(DataClassJsonMixin):
         return {
             k: v
             for k, v in self.__dict__.items()
-            if k not in ["_telemetry_factory", "_telemetry"]
+            if k
+            not in [
+                "_telemetry_factory",
+                "_telemetry",
+                "_run_telemetry",
+                "_run_telemetry_pid",
+            ]
         }
 
+    def _get_telemetry_instrument(
+        self,
+        *,
+        kind: str,
+        name: str,
+        unit: str,
+        description: str,
+        telemetry_parent: Optional[TelemetryParent],
+        attributes: Optional[Dict[str, Any]],
+    ) -> Any:
+        """
+        Returns the cached counter/histogram/up down counter or creates it.  The instrument records the
+        attributes of the telemetry parent so those are part of the key too.
+        """
+        run_telemetry: PatientAccessRunTelemetry = self._get_run_telemetry()
+        key: TelemetryInstrumentKey = (
+            kind,
+            name,
+            unit,
+            description,
+            _freeze_attributes(attributes),
+            _freeze_attributes(
+                telemetry_parent.attributes if telemetry_parent else None
+            ),
+        )
+        with run_telemetry.lock:
+            instrument: Any = run_telemetry.instruments.get(key)
+            if instrument is not None:
+                run_telemetry.instruments.move_to_end(key)
+                return instrument
+        _telemetry: Telemetry = run_telemetry.telemetry
+        if kind == "counter":
+            instrument = _telemetry.get_counter(
+                name=name,
+                unit=unit,
+                description=description,
+                attributes=attributes,
+                telemetry_parent=telemetry_parent,
+            )
+        elif kind == "histogram":
+            instrument = _telemetry.get_histogram(
+                name=name,
+                unit=unit,
+                description=description,
+                attributes=attributes,
+                telemetry_parent=telemetry_parent,
+            )
+        else:
+            instrument = _telemetry.get_up_down_counter(
+                name=name,
+                unit=unit,
+                description=description,
+                attributes=attributes,
+                telemetry_parent=telemetry_parent,
+            )
+        with run_telemetry.lock:
+            run_telemetry.instruments[key] = instrument
+            if len(run_telemetry.instruments) > TELEMETRY_INSTRUMENT_CACHE_SIZE:
+                run_telemetry.instruments.popitem(last=False)
+        return instrument
+
     def get_telemetry_counter(
         self,
         *,
@@ -174,13 +372,16 @@ class PatientAccessRunContext(DataClassJsonMixin):
         telemetry_parent: Optional[TelemetryParent],
         attributes: Optional[Dict[str, Any]] = None,
     ) -> TelemetryCounter:
-        _telemetry: Telemetry = self._create_telemetry()
-        return _telemetry.get_counter(
-            name=name,
-            unit=unit,
-            description=description,
-            attributes=attributes,
-            telemetry_parent=telemetry_parent,
+        return cast(
+            TelemetryCounter,
+            self._get_telemetry_instrument(
+                kind="counter",
+                name=name,
+                unit=unit,
+                description=description,
+                telemetry_parent=telemetry_parent,
+                attributes=attributes,
+            ),
         )
 
     def get_telemetry_histogram(
@@ -192,13 +393,16 @@ class PatientAccessRunContext(DataClassJsonMixin):
         telemetry_parent: Optional[TelemetryParent],
         attributes: Optional[Dict[str, Any]] = None,
     ) -> TelemetryHistogram:
-        _telemetry: Telemetry = self._create_telemetry()
-        return _telemetry.get_histogram(
-            name=name,
-            unit=unit,
-            description=description,
-            attributes=attributes,
-            telemetry_parent=telemetry_parent,
+        return cast(
+            TelemetryHistogram,
+            self._get_telemetry_instrument(
+                kind="histogram",
+                name=name,
+                unit=unit,
+                description=description,
+                telemetry_parent=telemetry_parent,
+                attributes=attributes,
+            ),
         )
 
     def get_telemetry_up_down_counter(
@@ -210,11 +414,14 @@ class PatientAccessRunContext(DataClassJsonMixin):
         telemetry_parent: Optional[TelemetryParent],
         attributes: Optional[Dict[str, Any]] = None,
     ) -> TelemetryUpDownCounter:
-        _telemetry: Telemetry = self._create_telemetry()
-        return _telemetry.get_up_down_counter(
-            name=name,
-            unit=unit,
-            description=description,
-            attributes=attributes,
-            telemetry_parent=telemetry_parent,
+        return cast(
+            TelemetryUpDownCounter,
+            self._get_telemetry_instrument(
+                kind="up_down_counter",
+                name=name,
+                unit=unit,
+                description=description,
+                telemetry_parent=telemetry_parent,
+                attributes=attributes,
+            ),
         )
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from helixtelemetry.telemetry.structures.telemetry_parent import TelemetryParent
+
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_run_context import (
+    PatientAccessRunContext,
+)
+from helixcore.utilities.async_pandas_udf.v1.async_pandas_udf_parameters import (
+    AsyncPandasUdfParameters,
+)
+
+
+def create_run_context(run_id: str = "run1") -> PatientAccessRunContext:
+    current_date_time = datetime(2024, 1, 1)
+    return PatientAccessRunContext(
+        connection_type="proa",
+        run_id=run_id,
+        run_date_time=current_date_time,
+        pipeline_category=None,
+        new_tokens_only=None,
+        pipeline_version=None,
+        metrics_writer_parameters=None,
+        pandas_udf_parameters=AsyncPandasUdfParameters(maximum_concurrent_tasks=1),
+        current_date_time=current_date_time,
+        flow_name="zebra",
+        page_size_for_person_clinical_data_pipeline=1000,
+        telemetry_parent=TelemetryParent.get_null_parent(),
+        log_level="INFO",
+    )
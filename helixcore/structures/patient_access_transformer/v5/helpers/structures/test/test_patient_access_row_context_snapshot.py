@@ -0,0 +1,76 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from helixcore.structures.patient_access_transformer.v5.helpers.metrics.patient_access_error import (
+    PatientAccessError,
+)
+from helixcore.structures.patient_access_transformer.v5.helpers.metrics.patient_access_metrics import (
+    PatientAccessMetrics,
+)
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_row_context import (
+    PatientAccessRowContext,
+)
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.test.run_context_factory import (
+    create_run_context,
+)
+from helixcore.structures.token_service_receiver.v3.connection_entry import (
+    ConnectionEntry,
+)
+from helixcore.utilities.mysql.my_sql_text_helper.my_sql_text_helper import (
+    MYSQL_TEXT_MAX_CHARACTERS,
+)
+
+
+def test_snapshot_is_computed_once_per_row() -> None:
+    row_context = PatientAccessRowContext(
+        run_context=create_run_context(),
+        connection_entry=ConnectionEntry(
+            id="1",
+            service_slug="slug1",
+            url="https://fhir.example.com/" + "a" * MYSQL_TEXT_MAX_CHARACTERS,
+            scope="patient/*.read",
+            expiry="2024-01-02T03:04:05Z",
+            last_updated="2024-01-01T00:00:00Z",
+        ),
+    )
+    with patch.object(
+        ConnectionEntry, "get_expiry", wraps=row_context.connection_entry.get_expiry
+    ) as get_expiry:
+        errors = [
+            PatientAccessError.construct(
+                row_context=row_context,
+                request_id=None,
+                resource_id=str(i),
+                resource_type="Observation",
+                url=None,
+                error_text="error",
+                status_code=500,
+                step="test",
+                resource_json=None,
+                severity="error",
+                exception=None,
+            )
+            for i in range(10)
+        ]
+        metrics = PatientAccessMetrics(
+            partition_index=0,
+            chunk_index=0,
+            row_context=row_context,
+            number_of_resources=0,
+            time_to_get_resources_from_source=None,
+            time_send_resources_to_fhir=None,
+            time_to_match_person=None,
+            matched=None,
+            warning_count=0,
+            error_count=len(errors),
+            start_time=datetime(2024, 1, 1),
+            end_time=datetime(2024, 1, 1),
+        )
+        assert get_expiry.call_count == 1
+
+    assert row_context.snapshot is row_context.snapshot
+    assert errors[0].expiry == metrics.expiry == row_context.snapshot.expiry
+    assert errors[0].slug == metrics.slug == "slug1"
+    assert errors[0].client_source_url == row_context.connection_entry.url
+    assert metrics.url is not None and len(metrics.url) <= MYSQL_TEXT_MAX_CHARACTERS
+    assert "snapshot" not in row_context.to_dict()
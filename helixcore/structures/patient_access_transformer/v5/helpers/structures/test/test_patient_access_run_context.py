@@ -0,0 +1,131 @@
+import pickle
+from typing import Any, Dict
+
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_run_context import (
+    RUN_TELEMETRY_CACHE_SIZE,
+    PatientAccessRunContext,
+    _run_telemetry_cache,
+)
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.test.run_context_factory import (
+    create_run_context,
+)
+from helixcore.utilities.telemetry.sampled_telemetry_span_creator import (
+    SampledTelemetrySpanCreator,
+)
+from helixcore.utilities.telemetry.telemetry_sampling_config import (
+    TelemetrySamplingConfig,
+)
+
+
+def test_telemetry_is_cached() -> None:
+    run_context: PatientAccessRunContext = create_run_context()
+    span_creator = run_context.telemetry_span_creator
+    assert run_context.telemetry_span_creator is span_creator
+
+    counter = run_context.get_telemetry_counter(
+        name="rows", unit="rows", description="rows", telemetry_parent=None
+    )
+    assert (
+        run_context.get_telemetry_counter(
+            name="rows", unit="rows", description="rows", telemetry_parent=None
+        )
+        is counter
+    )
+    assert (
+        run_context.get_telemetry_counter(
+            name="rows",
+            unit="rows",
+            description="rows",
+            telemetry_parent=None,
+            attributes={"status": "error"},
+        )
+        is not counter
+    )
+    histogram = run_context.get_telemetry_histogram(
+        name="rows", unit="rows", description="rows", telemetry_parent=None
+    )
+    assert (
+        run_context.get_telemetry_histogram(
+            name="rows", unit="rows", description="rows", telemetry_parent=None
+        )
+        is histogram
+    )
+
+    # a different run gets its own telemetry
+    assert create_run_context("run2").telemetry_span_creator is not span_creator
+
+
+def test_telemetry_instrument_with_unhashable_attributes() -> None:
+    run_context: PatientAccessRunContext = create_run_context()
+    attributes: Dict[str, Any] = {"filter": {"slug": "epic", "codes": ["a", "b"]}}
+    counter = run_context.get_telemetry_counter(
+        name="rows",
+        unit="rows",
+        description="rows",
+        telemetry_parent=None,
+        attributes=attributes,
+    )
+    assert (
+        run_context.get_telemetry_counter(
+            name="rows",
+            unit="rows",
+            description="rows",
+            telemetry_parent=None,
+            attributes={"filter": {"codes": ["a", "b"], "slug": "epic"}},
+        )
+        is counter
+    )
+
+
+def test_run_telemetry_cache_is_bounded() -> None:
+    span_creator = create_run_context("evicted_run").telemetry_span_creator
+    # the same run is still cached
+    assert create_run_context("evicted_run").telemetry_span_creator is span_creator
+    for i in range(RUN_TELEMETRY_CACHE_SIZE):
+        create_run_context(f"other_run{i}").telemetry_span_creator
+    assert len(_run_telemetry_cache) <= RUN_TELEMETRY_CACHE_SIZE
+    # the least recently used run was evicted so a new context creates new telemetry
+    assert create_run_context("evicted_run").telemetry_span_creator is not span_creator
+
+
+def test_pickled_run_context_shares_telemetry_in_process() -> None:
+    run_context: PatientAccessRunContext = create_run_context()
+    span_creator = run_context.telemetry_span_creator
+
+    state = run_context.__getstate__()
+    assert "_run_telemetry" not in state
+
+    unpickled: PatientAccessRunContext = pickle.loads(pickle.dumps(run_context))
+    assert unpickled == run_context
+    assert "_run_telemetry" not in unpickled.__dict__
+    # same run in the same process so the telemetry is reused
+    assert unpickled.telemetry_span_creator is span_creator
+    assert unpickled.to_dict() == run_context.to_dict()
+
+
+def test_telemetry_sampling_config() -> None:
+    run_context: PatientAccessRunContext = create_run_context()
+    run_context.telemetry_sampling_config = TelemetrySamplingConfig(
+        default_span_sample_rate=0.1
+    )
+    span_creator = run_context.telemetry_span_creator
+    assert isinstance(span_creator, SampledTelemetrySpanCreator)
+    assert span_creator is not create_run_context().telemetry_span_creator
+    assert run_context.telemetry_span_creator is span_creator
+
+
+async def test_flush_telemetry_emits_rollups() -> None:
+    run_context: PatientAccessRunContext = create_run_context("run_rollup")
+    run_context.telemetry_sampling_config = TelemetrySamplingConfig(
+        rollup_span_names=["row"]
+    )
+    span_creator = run_context.telemetry_span_creator
+    assert isinstance(span_creator, SampledTelemetrySpanCreator)
+    for _ in range(3):
+        async with run_context.create_telemetry_span_async(
+            name="row", attributes=None, telemetry_parent=run_context.telemetry_parent
+        ):
+            pass
+    assert len(span_creator.rollups) == 1
+    await run_context.flush_telemetry_async()
+    assert not span_creator.rollups
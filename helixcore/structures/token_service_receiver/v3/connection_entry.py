@@ -1,11 +1,15 @@
 import dataclasses
 import json
 from datetime import datetime
+from functools import lru_cache
 from dateutil import parser
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List
 
 from helixcore.utilities.json_serializer.json_serializer import EnhancedJSONEncoder
 
+# number of parsed date strings to cache.  Tokens refreshed in the same batch share their timestamps
+PARSE_DATE_CACHE_SIZE: int = 4 * 1024
+
 
 @dataclasses.dataclass
 class ConnectionEntry:
@@ -81,6 +85,21 @@ class ConnectionEntry:
         my_dict = ConnectionEntry.parse_dict(token_result)
         return ConnectionEntry(**my_dict)
 
+    @staticmethod
+    def from_page(page: List[Dict[str, Any]] | bytes | str) -> List["ConnectionEntry"]:
+        """
+        Decodes a page of results from the token service.  Faster than calling from_dict() for each
+        token since dates shared by tokens in the page are only parsed once.
+
+        :param page: list of token dicts or the raw JSON of the list
+        :return: connection entries
+        """
+        from helixcore.structures.token_service_receiver.v3.connection_entry_batch import (
+            ConnectionEntryBatch,
+        )
+
+        return ConnectionEntryBatch.from_page(page).to_entries()
+
     @staticmethod
     def parse_dict(token_result: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -139,8 +158,25 @@ class ConnectionEntry:
         assert isinstance(
             date_str, str
         ), f"Expected string but got {type(date_str)}: {date_str}"
+        return ConnectionEntry._parse_date_string(date_str)
+
+    @staticmethod
+    @lru_cache(maxsize=PARSE_DATE_CACHE_SIZE)
+    def _parse_date_string(date_str: str) -> Optional[datetime]:
+        """
+        Parses the date string.  Tries datetime.fromisoformat() first since the token service returns
+        ISO-8601 dates and only falls back to the much slower dateutil parser for other formats.
+        datetime is immutable so the cached values can be shared.
+
+        :param date_str: date string to parse
+        """
+        try:
+            return datetime.fromisoformat(date_str)
+        except ValueError:
+            pass
         try:
-            return parser.parse(date_str)
+            parsed: datetime = parser.parse(date_str)
+            return parsed
         except ValueError:
             return None
 
@@ -157,26 +193,49 @@ class ConnectionEntry:
         e.g., Epic, Cerner, Athena, etc.
 
         """
-        if self.token_payload is None:
+        return ConnectionEntry.get_source_system_type(
+            token_payload=self.token_payload, url=self.url
+        )
+
+    @staticmethod
+    def get_source_system_type(
+        *, token_payload: Optional[Dict[str, Any]], url: Optional[str]
+    ) -> Optional[str]:
+        """
+        Tries to detect what type of source system we're talking to based on the token payload
+        e.g., Epic, Cerner, Athena, etc.
+
+        :param token_payload: payload provided by the source system
+        :param url: base url of the fhir server
+        """
+        if token_payload is None:
             return None
         # check if this is Epic
-        if "epic.eci" in self.token_payload:
+        if "epic.eci" in token_payload:
             return "Epic"
         # check if this is Cerner
-        if "urn:cerner:authorization:claims:version:1" in self.token_payload:
+        if "urn:cerner:authorization:claims:version:1" in token_payload:
             return "Cerner"
         # check if this is Athena
-        if self.url and self.url.startswith("https://api.platform.athenahealth.com"):
+        if url and url.startswith("https://api.platform.athenahealth.com"):
             return "Athena"
-        if self.url and self.url.startswith("https://fhir.nextgen.com"):
+        if url and url.startswith("https://fhir.nextgen.com"):
             return "NextGen"
         return None
 
+    # the dates are parsed in __post_init__ so the getters only parse if a string was assigned later
+
     def get_expiry(self) -> Optional[datetime]:
+        if self.expiry is None or isinstance(self.expiry, datetime):
+            return self.expiry
         return self.parse_date(self.expiry)
 
     def get_last_updated(self) -> Optional[datetime]:
+        if self.last_updated is None or isinstance(self.last_updated, datetime):
+            return self.last_updated
         return self.parse_date(self.last_updated)
 
     def get_created_date(self) -> Optional[datetime]:
+        if self.created_date is None or isinstance(self.created_date, datetime):
+            return self.created_date
         return self.parse_date(self.created_date)
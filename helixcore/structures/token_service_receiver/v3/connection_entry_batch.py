@@ -0,0 +1,202 @@
+import dataclasses
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from helixcore.structures.token_service_receiver.v3.connection_entry import (
+    ConnectionEntry,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+# ConnectionEntry field -> (keys in the token service result to read it from, default).  When there are
+# multiple keys the first truthy value is used, same as ConnectionEntry.parse_dict()
+CONNECTION_ENTRY_FIELD_MAPPINGS: Tuple[Tuple[str, Tuple[str, ...], Any], ...] = (
+    ("id", ("patient_id", "id"), None),
+    ("bwell_fhir_person_id", ("bwell_fhir_person_id",), None),
+    ("client_fhir_person_id", ("client_fhir_person_id",), None),
+    ("display_name", ("display_name",), None),
+    ("created_date", ("created_date",), None),
+    ("expiry", ("expiry",), None),
+    ("url", ("fhir_url", "url", "client_source_url"), None),
+    ("fhir_version", ("fhir_version",), None),
+    ("last_updated", ("last_updated",), None),
+    ("member_id", ("member_id",), None),
+    ("patient_id", ("patient_id", "id"), None),
+    ("scope", ("scope",), None),
+    ("service_slug", ("service_slug",), None),
+    ("source_id_prefix", ("source_id_prefix",), None),
+    ("status", ("status",), None),
+    ("token", ("token",), None),
+    ("token_payload", ("token_payload",), None),
+    ("category", ("category",), None),
+    ("interop_type", ("interop_type",), None),
+    ("custom_api_parameters", ("custom_api_parameters",), None),
+    ("fhir_search_supported", ("fhir_search_supported",), False),
+    ("managing_organization", ("managing_organization",), None),
+    ("cursor_id", ("cursor_id",), None),
+)
+
+CONNECTION_ENTRY_DATE_FIELDS: Tuple[str, ...] = (
+    "created_date",
+    "expiry",
+    "last_updated",
+)
+
+# in the order of the dataclass fields so entries created from a batch serialize the same as ones from __init__
+CONNECTION_ENTRY_FIELD_NAMES: Tuple[str, ...] = tuple(
+    field.name for field in dataclasses.fields(ConnectionEntry)
+)
+
+
+@dataclasses.dataclass
+class ConnectionEntryBatch:
+    """
+    A page of connection entries stored by column.  Plain lists so the batch is cheap to pickle and
+    to split when partitioning tokens across executors.
+    """
+
+    columns: Dict[str, List[Any]]
+    """ ConnectionEntry field -> values.  Dates are already parsed """
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    @staticmethod
+    def from_page(page: List[Dict[str, Any]] | bytes | str) -> "ConnectionEntryBatch":
+        """
+        Decodes a page of results from the token service
+
+        :param page: list of token dicts or the raw JSON of the list
+        """
+        rows: List[Dict[str, Any]] = ConnectionEntryBatch.load_page(page)
+        columns: Dict[str, List[Any]] = {}
+        for field_name, keys, default in CONNECTION_ENTRY_FIELD_MAPPINGS:
+            if len(keys) == 1:
+                key: str = keys[0]
+                columns[field_name] = [row.get(key, default) for row in rows]
+            else:
+                columns[field_name] = [
+                    ConnectionEntryBatch._get_first_truthy(row, keys) for row in rows
+                ]
+        for field_name in CONNECTION_ENTRY_DATE_FIELDS:
+            columns[field_name] = ConnectionEntryBatch.parse_dates(columns[field_name])
+        columns["source_system_type"] = [
+            (
+                ConnectionEntry.get_source_system_type(
+                    token_payload=token_payload, url=url
+                )
+                if token_payload is not None
+                else None
+            )
+            for token_payload, url in zip(columns["token_payload"], columns["url"])
+        ]
+        return ConnectionEntryBatch(
+            columns={
+                field_name: columns[field_name]
+                for field_name in CONNECTION_ENTRY_FIELD_NAMES
+            }
+        )
+
+    @staticmethod
+    def from_entries(entries: List[ConnectionEntry]) -> "ConnectionEntryBatch":
+        """
+        Converts connection entries to a batch
+
+        :param entries: connection entries
+        """
+        return ConnectionEntryBatch(
+            columns={
+                field_name: [getattr(entry, field_name) for entry in entries]
+                for field_name in CONNECTION_ENTRY_FIELD_NAMES
+            }
+        )
+
+    @staticmethod
+    def load_page(page: List[Dict[str, Any]] | bytes | str) -> List[Dict[str, Any]]:
+        """
+        Returns the token dicts in the page.  Uses orjson for raw JSON if it is installed.
+
+        :param page: list of token dicts or the raw JSON of the list
+        """
+        if isinstance(page, list):
+            return page
+        rows: Any = orjson.loads(page) if orjson is not None else json.loads(page)
+        assert isinstance(rows, list), f"Expected a JSON list but got {type(rows)}"
+        return rows
+
+    @staticmethod
+    def parse_dates(values: List[Any]) -> List[Optional[datetime]]:
+        """
+        Parses a column of dates.  Each distinct value is parsed once since tokens in a page
+        often share timestamps.
+
+        :param values: date strings, timestamps or datetimes
+        """
+        parsed: Dict[Any, Optional[datetime]] = {}
+        result: List[Optional[datetime]] = []
+        for value in values:
+            try:
+                result.append(parsed[value])
+            except KeyError:
+                parsed[value] = ConnectionEntry.parse_date(value)
+                result.append(parsed[value])
+        return result
+
+    @staticmethod
+    def _get_first_truthy(row: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+        value: Any = None
+        for key in keys:
+            value = row.get(key)
+            if value:
+                return value
+        return value
+
+    def to_entries(self) -> List[ConnectionEntry]:
+        """
+        Returns the connection entries in the batch.  The values in the batch are already parsed so
+        the entries are created without running ConnectionEntry.__init__() and __post_init__().
+        """
+        entries: List[ConnectionEntry] = []
+        for values in zip(
+            *(self.columns[field_name] for field_name in CONNECTION_ENTRY_FIELD_NAMES)
+        ):
+            entry: ConnectionEntry = ConnectionEntry.__new__(ConnectionEntry)
+            entry.__dict__ = dict(zip(CONNECTION_ENTRY_FIELD_NAMES, values))
+            entries.append(entry)
+        return entries
+
+    def slice(self, start: int, stop: int) -> "ConnectionEntryBatch":
+        """
+        Returns the rows from start to stop
+
+        :param start: index of the first row
+        :param stop: index after the last row
+        """
+        return ConnectionEntryBatch(
+            columns={
+                field_name: values[start:stop]
+                for field_name, values in self.columns.items()
+            }
+        )
+
+    def split(self, number_of_partitions: int) -> List["ConnectionEntryBatch"]:
+        """
+        Splits the batch into contiguous partitions whose sizes differ by at most one row
+
+        :param number_of_partitions: number of partitions
+        """
+        assert (
+            number_of_partitions > 0
+        ), f"number_of_partitions should be > 0 but is {number_of_partitions}"
+        size, remainder = divmod(len(self), number_of_partitions)
+        partitions: List[ConnectionEntryBatch] = []
+        start: int = 0
+        for index in range(number_of_partitions):
+            stop: int = start + size + (1 if index < remainder else 0)
+            partitions.append(self.slice(start, stop))
+            start = stop
+        return partitions
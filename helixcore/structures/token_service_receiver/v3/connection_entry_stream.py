@@ -0,0 +1,222 @@
+import asyncio
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_token_request import (
+    PatientAccessTokenRequest,
+)
+from helixcore.structures.token_service_receiver.v3.connection_entry import (
+    ConnectionEntry,
+)
+from helixcore.utilities.async_helper.v1.async_helper import AsyncHelper
+
+T = TypeVar("T")
+
+TokenPage = List[ConnectionEntry] | List[Dict[str, Any]] | bytes | str
+""" a page from the token service: decoded entries, token dicts or raw JSON """
+
+FetchTokenPageFunction = Callable[[Optional[str], int], Awaitable[TokenPage]]
+""" (cursor id of the last entry of the previous page or None, limit) -> page """
+
+# number of pages to fetch ahead of the consumer
+TOKEN_STREAM_PREFETCH_PAGES: int = 2
+
+TokenStreamQueueItem = (
+    Tuple[List[ConnectionEntry], Optional[str]] | BaseException | None
+)
+""" (page, cursor id after the page), the exception raised by the fetch or None at the end """
+
+
+class ConnectionEntryStream:
+    def __init__(
+        self,
+        *,
+        fetch_page: FetchTokenPageFunction,
+        token_request: PatientAccessTokenRequest,
+        prefetch_pages: int = TOKEN_STREAM_PREFETCH_PAGES,
+        initial_cursor_id: Optional[str] = None,
+        current_date_time: Optional[datetime] = None,
+    ) -> None:
+        """
+        Streams connection entries from the token service.  Pages of limit_tokens_per_api_call tokens
+        are fetched by cursor in a background task up to prefetch_pages ahead of the consumer so fetching
+        overlaps with processing.  Entries are deduplicated by id and filtered by token_statuses and
+        check_expiry_date before they are yielded.
+
+        :param fetch_page: fetches a page of tokens after the cursor
+        :param token_request: token request parameters
+        :param prefetch_pages: maximum number of pages fetched but not yet consumed
+        :param initial_cursor_id: cursor to start from.  None starts from the beginning
+        :param current_date_time: time to check expiry against.  Defaults to now
+        """
+        assert (
+            token_request.limit_tokens_per_api_call > 0
+        ), f"limit_tokens_per_api_call should be > 0 but is {token_request.limit_tokens_per_api_call}"
+        assert (
+            prefetch_pages > 0
+        ), f"prefetch_pages should be > 0 but is {prefetch_pages}"
+        self.fetch_page: FetchTokenPageFunction = fetch_page
+        self.token_request: PatientAccessTokenRequest = token_request
+        self.prefetch_pages: int = prefetch_pages
+        self.initial_cursor_id: Optional[str] = initial_cursor_id
+        self.current_date_time: Optional[datetime] = current_date_time
+        self.last_cursor_id: Optional[str] = initial_cursor_id
+        """ cursor id after the last page whose entries have all been yielded by stream_async().  Can be used
+            as initial_cursor_id to resume the stream: no entry is skipped but the entries of a partly consumed
+            page are yielded again """
+
+    async def _produce_pages(
+        self, queue: "asyncio.Queue[TokenStreamQueueItem]"
+    ) -> None:
+        limit: int = self.token_request.limit_tokens_per_api_call
+        cursor_id: Optional[str] = self.initial_cursor_id
+        try:
+            while True:
+                page: List[ConnectionEntry] = self.decode_page(
+                    await self.fetch_page(cursor_id, limit)
+                )
+                next_cursor_id: Optional[str] = page[-1].cursor_id if page else None
+                # the consumer moves last_cursor_id once it has yielded the entries of the page
+                await queue.put((page, next_cursor_id or cursor_id))
+                # a short page or a page without a new cursor is the last page
+                if (
+                    len(page) < limit
+                    or next_cursor_id is None
+                    or next_cursor_id == cursor_id
+                ):
+                    break
+                cursor_id = next_cursor_id
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            await queue.put(e)
+            return
+        await queue.put(None)
+
+    @staticmethod
+    def decode_page(page: TokenPage) -> List[ConnectionEntry]:
+        """
+        Returns the connection entries in the page
+
+        :param page: decoded entries, token dicts or raw JSON
+        """
+        if isinstance(page, list) and (
+            not page or isinstance(page[0], ConnectionEntry)
+        ):
+            return page  # type: ignore[return-value]
+        return ConnectionEntry.from_page(page)
+
+    def is_token_valid(self, entry: ConnectionEntry, *, now: datetime) -> bool:
+        """
+        Returns whether the token passes the token_statuses and check_expiry_date filters
+
+        :param entry: connection entry
+        :param now: time to check the expiry against
+        """
+        token_statuses: Optional[List[str]] = self.token_request.token_statuses
+        if token_statuses and entry.status not in token_statuses:
+            return False
+        if self.token_request.check_expiry_date:
+            expiry: Optional[datetime] = entry.get_expiry()
+            if expiry is not None:
+                if expiry.tzinfo is None:
+                    expiry = expiry.replace(tzinfo=timezone.utc)
+                if expiry < now:
+                    return False
+        return True
+
+    async def stream_async(self) -> AsyncGenerator[ConnectionEntry, None]:
+        """
+        Yields the valid connection entries.  Pages are fetched ahead in a background task which is
+        cancelled if the consumer stops early.  last_cursor_id is moved after the entries of each page are yielded.
+        """
+        now: datetime = self.current_date_time or datetime.now(timezone.utc)
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        queue: asyncio.Queue[TokenStreamQueueItem] = asyncio.Queue(
+            maxsize=self.prefetch_pages
+        )
+        producer: asyncio.Task[None] = asyncio.create_task(self._produce_pages(queue))
+        seen_ids: Set[Optional[str]] = set()
+        try:
+            while True:
+                item: TokenStreamQueueItem = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                page, page_cursor_id = item
+                for entry in page:
+                    if entry.id in seen_ids:
+                        continue
+                    seen_ids.add(entry.id)
+                    if self.is_token_valid(entry, now=now):
+                        yield entry
+                self.last_cursor_id = page_cursor_id
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+
+    async def stream_batches_async(
+        self, *, max_wait: Optional[float] = None
+    ) -> AsyncGenerator[List[ConnectionEntry], None]:
+        """
+        Yields the valid connection entries in batches of max_tokens_per_batch
+
+        :param max_wait: yield a partial batch when max_wait seconds have passed since its first entry so
+                            a slow token service does not hold back entries
+        """
+        async for batch in AsyncHelper.collect_async_data(
+            async_gen=self.stream_async(),
+            chunk_size=self.token_request.max_tokens_per_batch,
+            max_wait=max_wait,
+        ):
+            yield batch
+
+    async def process_async(
+        self,
+        *,
+        fn: Callable[[ConnectionEntry], Awaitable[T]],
+        number_of_workers: int,
+        queue_size: Optional[int] = None,
+    ) -> AsyncGenerator[T, None]:
+        """
+        Processes up to number_of_workers connection entries at the same time (AsyncHelper.map_concurrent)
+        reading from a bounded read-ahead buffer (AsyncHelper.buffered) so token fetching overlaps with
+        processing.  Results are yielded in the order they complete.
+        If a worker fails, the other workers and the token fetching are cancelled and the exception is raised.
+
+        :param fn: function to process a connection entry
+        :param number_of_workers: number of entries processed concurrently
+        :param queue_size: maximum number of entries waiting for a worker.  Defaults to number_of_workers
+        """
+        assert (
+            number_of_workers > 0
+        ), f"number_of_workers should be > 0 but is {number_of_workers}"
+        async with aclosing(
+            AsyncHelper.map_concurrent(
+                fn=fn,
+                iterable=AsyncHelper.buffered(
+                    self.stream_async(), queue_size or number_of_workers
+                ),
+                limit=number_of_workers,
+            )
+        ) as results:
+            async for result in results:
+                yield result
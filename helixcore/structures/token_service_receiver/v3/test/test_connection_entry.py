@@ -0,0 +1,85 @@
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from dateutil import parser
+
+from helixcore.structures.token_service_receiver.v3.connection_entry import (
+    ConnectionEntry,
+)
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# set to 1000000 to benchmark a full token service load
+BENCHMARK_ROWS: int = int(os.environ.get("CONNECTION_ENTRY_BENCHMARK_ROWS", "20000"))
+
+
+def test_parse_date() -> None:
+    for date_str in [
+        "2024-01-02T03:04:05Z",
+        "2024-01-02T03:04:05.123456+05:30",
+        "2024-01-02 03:04:05",
+        "2024-01-02",
+        "Tue, 02 Jan 2024 03:04:05 GMT",
+        "January 2, 2024",
+    ]:
+        assert ConnectionEntry.parse_date(date_str) == parser.parse(date_str)
+    assert ConnectionEntry.parse_date("not a date") is None
+    assert ConnectionEntry.parse_date(None) is None
+
+    connection_entry = ConnectionEntry.from_dict(
+        {"id": "1", "expiry": "2024-01-02T03:04:05Z", "last_updated": "2024-01-01"}
+    )
+    assert connection_entry.expiry == datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert connection_entry.get_expiry() is connection_entry.expiry
+    assert connection_entry.get_last_updated() == datetime(2024, 1, 1)
+    assert connection_entry.get_created_date() is None
+
+    connection_entry.created_date = "2024-01-03T00:00:00"
+    assert connection_entry.get_created_date() == datetime(2024, 1, 3)
+
+
+def test_parse_date_benchmark() -> None:
+    start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    # tokens refreshed in the same batch share timestamps so only some of the dates are unique
+    rows: List[Dict[str, Any]] = [
+        {
+            "id": str(i),
+            "expiry": (start_date + timedelta(seconds=i % 5000)).isoformat(),
+            "last_updated": (start_date + timedelta(seconds=i)).isoformat(),
+            "created_date": (start_date + timedelta(days=i % 365)).isoformat(),
+        }
+        for i in range(BENCHMARK_ROWS)
+    ]
+    # noinspection PyProtectedMember
+    ConnectionEntry._parse_date_string.cache_clear()
+
+    start = time.perf_counter()
+    entries = [ConnectionEntry.from_dict(row) for row in rows]
+    for entry in entries:
+        entry.get_expiry()
+        entry.get_last_updated()
+        entry.get_created_date()
+    fast = time.perf_counter() - start
+
+    sample = rows[: max(BENCHMARK_ROWS // 10, 1)]
+    start = time.perf_counter()
+    dateutil_dates = [
+        (
+            parser.parse(row["expiry"]),
+            parser.parse(row["last_updated"]),
+            parser.parse(row["created_date"]),
+        )
+        for row in sample
+    ]
+    dateutil = (time.perf_counter() - start) * len(rows) / len(sample)
+
+    logger.info(
+        f"ConnectionEntry.from_dict for {len(rows)} rows: "
+        f"fromisoformat+cache={fast * 1000:.1f}ms dateutil (estimated)={dateutil * 1000:.1f}ms"
+    )
+    assert [
+        (e.expiry, e.last_updated, e.created_date) for e in entries[: len(sample)]
+    ] == dateutil_dates
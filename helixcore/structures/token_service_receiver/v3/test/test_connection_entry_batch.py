@@ -0,0 +1,85 @@
+import json
+import logging
+import pickle
+import time
+from typing import Any, Dict, List
+
+from helixcore.structures.token_service_receiver.v3.connection_entry import (
+    ConnectionEntry,
+)
+from helixcore.structures.token_service_receiver.v3.connection_entry_batch import (
+    ConnectionEntryBatch,
+)
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def get_page(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"token{i}",
+            "patient_id": f"patient{i}" if i % 2 else None,
+            "fhir_url": None if i % 3 else "https://fhir.example.com",
+            "client_source_url": "https://source.example.com",
+            "expiry": f"2024-01-{(i % 28) + 1:02}T00:00:00Z",
+            "last_updated": "2024-01-01T00:00:00Z",
+            "created_date": None if i % 5 else "Jan 1, 2024",
+            "service_slug": "slug",
+            "status": "Active",
+            "token_payload": {"epic.eci": "1"} if i % 4 == 0 else None,
+            **({"fhir_search_supported": None} if i % 7 == 0 else {}),
+        }
+        for i in range(count)
+    ]
+
+
+def test_from_page_matches_from_dict() -> None:
+    page: List[Dict[str, Any]] = get_page(100)
+    expected: List[ConnectionEntry] = [ConnectionEntry.from_dict(row) for row in page]
+
+    assert ConnectionEntry.from_page(page) == expected
+    assert ConnectionEntry.from_page(json.dumps(page).encode("utf-8")) == expected
+    assert ConnectionEntry.from_page(json.dumps(page)) == expected
+    assert expected[0].source_system_type == "Epic"
+
+    batch: ConnectionEntryBatch = ConnectionEntryBatch.from_page(page)
+    assert len(batch) == 100
+    assert ConnectionEntryBatch.from_entries(expected).to_entries() == expected
+    assert pickle.loads(pickle.dumps(batch)).to_entries() == expected
+
+
+def test_split() -> None:
+    batch: ConnectionEntryBatch = ConnectionEntryBatch.from_page(get_page(10))
+    partitions = batch.split(3)
+    assert [len(p) for p in partitions] == [4, 3, 3]
+    assert [e for p in partitions for e in p.to_entries()] == batch.to_entries()
+    assert [len(p) for p in ConnectionEntryBatch.from_page([]).split(2)] == [0, 0]
+
+
+def test_from_page_benchmark() -> None:
+    pages: List[bytes] = [json.dumps(get_page(1000)).encode("utf-8") for _ in range(20)]
+    # noinspection PyProtectedMember
+    ConnectionEntry._parse_date_string.cache_clear()
+    start = time.perf_counter()
+    one_at_a_time = [
+        ConnectionEntry.from_dict(row) for page in pages for row in json.loads(page)
+    ]
+    single = time.perf_counter() - start
+
+    # noinspection PyProtectedMember
+    ConnectionEntry._parse_date_string.cache_clear()
+    start = time.perf_counter()
+    batched = [entry for page in pages for entry in ConnectionEntry.from_page(page)]
+    bulk = time.perf_counter() - start
+
+    logger.info(
+        f"Decoding {len(batched)} tokens: from_dict={single * 1000:.1f}ms from_page={bulk * 1000:.1f}ms"
+    )
+    assert batched == one_at_a_time
+
+
+def test_to_entries_serializes_like_from_dict() -> None:
+    page: List[Dict[str, Any]] = get_page(10)
+    assert [e.to_json() for e in ConnectionEntry.from_page(page)] == [
+        ConnectionEntry.from_dict(row).to_json() for row in page
+    ]
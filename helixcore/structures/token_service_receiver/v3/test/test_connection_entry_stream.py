@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.patient_access_token_request import (
+    PatientAccessTokenRequest,
+)
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.token_service_authentication import (
+    TokenServiceAuthentication,
+)
+from helixcore.structures.patient_access_transformer.v5.helpers.structures.token_service_config import (
+    TokenServiceConfig,
+)
+from helixcore.structures.token_service_receiver.v3.connection_entry import (
+    ConnectionEntry,
+)
+from helixcore.structures.token_service_receiver.v3.connection_entry_stream import (
+    ConnectionEntryStream,
+    TokenPage,
+)
+
+
+def get_token_request(**kwargs: Any) -> PatientAccessTokenRequest:
+    return PatientAccessTokenRequest(
+        max_tokens_per_batch=kwargs.pop("max_tokens_per_batch", 4),
+        limit_tokens_per_api_call=kwargs.pop("limit_tokens_per_api_call", 3),
+        token_service_authentication=TokenServiceAuthentication(
+            config=TokenServiceConfig(
+                token_service_url="https://tokens.example.com",
+                identity_provider_url="https://idp.example.com",
+                client_id="client",
+                client_secret="secret",
+            )
+        ),
+        new_tokens_only=None,
+        **kwargs,
+    )
+
+
+class FakeTokenService:
+    def __init__(self, tokens: List[Dict[str, Any]]) -> None:
+        self.tokens: List[Dict[str, Any]] = tokens
+        self.calls: List[Optional[str]] = []
+
+    async def fetch_page(self, cursor_id: Optional[str], limit: int) -> TokenPage:
+        self.calls.append(cursor_id)
+        await asyncio.sleep(0)
+        start: int = int(cursor_id) + 1 if cursor_id is not None else 0
+        return [
+            {**token, "cursor_id": str(index)}
+            for index, token in list(enumerate(self.tokens))[start : start + limit]
+        ]
+
+
+def get_tokens() -> List[Dict[str, Any]]:
+    return [
+        {"id": "1", "status": "Active", "expiry": "2030-01-01T00:00:00Z"},
+        {"id": "2", "status": "Inactive"},
+        {"id": "3", "status": "Active", "expiry": "2020-01-01T00:00:00Z"},
+        {"id": "1", "status": "Active"},
+        {"id": "4", "status": "Active", "expiry": "2030-01-01T00:00:00"},
+        {"id": "5", "status": "Active"},
+        {"id": "6", "status": "Active"},
+    ]
+
+
+async def test_stream_dedupes_and_filters() -> None:
+    token_service = FakeTokenService(get_tokens())
+    stream = ConnectionEntryStream(
+        fetch_page=token_service.fetch_page,
+        token_request=get_token_request(token_statuses=["Active"]),
+        current_date_time=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+    entries: List[ConnectionEntry] = [e async for e in stream.stream_async()]
+    assert [e.id for e in entries] == ["1", "4", "5", "6"]
+    assert token_service.calls == [None, "2", "5"]
+    assert stream.last_cursor_id == "6"
+
+    batches = [
+        [e.id for e in batch]
+        async for batch in ConnectionEntryStream(
+            fetch_page=FakeTokenService(get_tokens()).fetch_page,
+            token_request=get_token_request(check_expiry_date=False),
+        ).stream_batches_async()
+    ]
+    assert batches == [["1", "2", "3", "4"], ["5", "6"]]
+
+
+async def test_process_overlaps_fetching_with_workers() -> None:
+    token_service = FakeTokenService([{"id": str(i)} for i in range(20)])
+    stream = ConnectionEntryStream(
+        fetch_page=token_service.fetch_page,
+        token_request=get_token_request(),
+        prefetch_pages=1,
+    )
+    running: int = 0
+    max_running: int = 0
+
+    async def process(entry: ConnectionEntry) -> Optional[str]:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return entry.id
+
+    results = [r async for r in stream.process_async(fn=process, number_of_workers=3)]
+    assert sorted(results, key=lambda r: int(r or 0)) == [str(i) for i in range(20)]
+    assert max_running == 3
+
+
+async def test_process_raises_worker_exception() -> None:
+    stream = ConnectionEntryStream(
+        fetch_page=FakeTokenService([{"id": str(i)} for i in range(20)]).fetch_page,
+        token_request=get_token_request(),
+    )
+
+    async def process(entry: ConnectionEntry) -> None:
+        if entry.id == "5":
+            raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        async for _ in stream.process_async(fn=process, number_of_workers=2):
+            pass
+
+
+async def test_stream_raises_fetch_exception() -> None:
+    async def fetch_page(cursor_id: Optional[str], limit: int) -> TokenPage:
+        if cursor_id is not None:
+            raise ConnectionError("token service is down")
+        return [{"id": str(i), "cursor_id": str(i)} for i in range(limit)]
+
+    stream = ConnectionEntryStream(
+        fetch_page=fetch_page, token_request=get_token_request()
+    )
+    ids: List[Optional[str]] = []
+    with pytest.raises(ConnectionError):
+        async for entry in stream.stream_async():
+            ids.append(entry.id)
+    assert ids == ["0", "1", "2"]
+
+
+async def test_last_cursor_id_moves_when_page_is_consumed() -> None:
+    tokens: List[Dict[str, Any]] = [{"id": str(i)} for i in range(10)]
+    token_service = FakeTokenService(tokens)
+    stream = ConnectionEntryStream(
+        fetch_page=token_service.fetch_page,
+        token_request=get_token_request(limit_tokens_per_api_call=2),
+        prefetch_pages=2,
+    )
+    entries = stream.stream_async()
+    assert (await anext(entries)).id == "0"
+    # let the producer fetch ahead
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert len(token_service.calls) > 1
+    # the first page was not fully consumed so resuming must start from the beginning
+    assert stream.last_cursor_id is None
+    assert (await anext(entries)).id == "1"
+    assert (await anext(entries)).id == "2"
+    assert stream.last_cursor_id == "1"
+    await entries.aclose()
+
+    resumed = ConnectionEntryStream(
+        fetch_page=FakeTokenService(tokens).fetch_page,
+        token_request=get_token_request(limit_tokens_per_api_call=2),
+        initial_cursor_id=stream.last_cursor_id,
+    )
+    assert [e.id async for e in resumed.stream_async()] == [
+        str(i) for i in range(2, 10)
+    ]
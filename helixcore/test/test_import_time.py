@@ -0,0 +1,67 @@
+import logging
+import subprocess
+import sys
+from typing import Dict, List
+
+import pytest
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# packages that take tens to hundreds of milliseconds to import.  Modules used by the Spark/pandas workers
+# should only import these when they are actually used.
+HEAVY_PACKAGES: List[str] = [
+    "boto3",
+    "fhir.resources",
+    "helix_fhir_client_sdk",
+    "helixtelemetry",
+    "opentelemetry",
+]
+
+
+def get_import_times(module: str) -> Dict[str, int]:
+    """
+    Imports the module in a new interpreter with -X importtime
+
+    :return: cumulative import time in microseconds by module name
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "helixcore.utilities.async_helper.v1.async_helper",
+        "helixcore.utilities.aws.s3",
+        "helixcore.utilities.fhir.fhir_resource_helpers.v2.fhir_resource_helpers",
+        "helixcore.utilities.json_helpers",
+        "helixcore.utilities.metrics.writer.v2.metrics_writer_factory",
+        "helixcore.utilities.mysql.my_sql_writer.v2.my_sql_writer",
+    ],
+)
+def test_module_does_not_import_heavy_packages(module: str) -> None:
+    import_times: Dict[str, int] = get_import_times(module)
+    heavy_imports: List[str] = [
+        name
+        for name in import_times
+        if any(
+            name == package or name.startswith(f"{package}.")
+            for package in HEAVY_PACKAGES
+        )
+    ]
+    logger.info(f"{module}: {import_times[module] / 1000:.1f} ms")
+    assert (
+        heavy_imports == []
+    ), f"{module} imports {heavy_imports} at import time. Import them where they are used instead."
@@ -0,0 +1,72 @@
+import dataclasses
+import json
+import logging
+import subprocess
+import sys
+from typing import Any, Dict
+
+from helixtelemetry.telemetry.factory.telemetry_factory import TelemetryFactory
+from helixtelemetry.telemetry.providers.console_telemetry import ConsoleTelemetry
+from helixtelemetry.telemetry.providers.null_telemetry import NullTelemetry
+from helixtelemetry.telemetry.providers.telemetry import Telemetry
+from helixtelemetry.telemetry.structures.telemetry_parent import TelemetryParent
+
+from helixcore.register import register, TELEMETRY_CLASSES
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def create_telemetry(provider: str) -> Telemetry:
+    telemetry_parent: TelemetryParent = TelemetryParent.get_null_parent()
+    telemetry_parent.telemetry_context = dataclasses.replace(
+        telemetry_parent.telemetry_context, provider=provider
+    )
+    return TelemetryFactory(telemetry_parent=telemetry_parent).create(log_level="INFO")
+
+
+def test_register_loads_telemetry_class_on_first_create() -> None:
+    register()
+    # noinspection PyProtectedMember
+    registry = TelemetryFactory._registry
+    assert set(TELEMETRY_CLASSES).issubset(registry)
+    assert registry["ConsoleTelemetry"] is not ConsoleTelemetry
+
+    telemetry: Telemetry = create_telemetry("ConsoleTelemetry")
+    assert type(telemetry) is ConsoleTelemetry
+    assert registry["ConsoleTelemetry"] is ConsoleTelemetry
+    assert type(create_telemetry("ConsoleTelemetry")) is ConsoleTelemetry
+
+    assert type(create_telemetry("NullTelemetry")) is NullTelemetry
+    # leave the registry as the rest of the tests expect it
+    register()
+
+
+def test_register_does_not_import_open_telemetry() -> None:
+    """
+    Benchmark of import + register() time in a fresh interpreter.  Creating NullTelemetry should not
+    import the OpenTelemetry provider (and its SDK and exporters).
+    """
+    code: str = """
+import json, sys, time
+start = time.perf_counter()
+from helixcore.register import register
+register()
+registered = time.perf_counter()
+from helixtelemetry.telemetry.factory.telemetry_factory import TelemetryFactory
+from helixtelemetry.telemetry.structures.telemetry_parent import TelemetryParent
+TelemetryFactory(telemetry_parent=TelemetryParent.get_null_parent()).create(log_level="INFO")
+created = time.perf_counter()
+print(json.dumps({
+    "register_ms": (registered - start) * 1000,
+    "create_ms": (created - registered) * 1000,
+    "open_telemetry_imported": any(m.startswith("helixtelemetry.telemetry.providers.open_telemetry") or m.startswith("opentelemetry.sdk") for m in sys.modules),
+}))
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    timings: Dict[str, Any] = json.loads(result.stdout.strip().splitlines()[-1])
+    logger.info(
+        f"import + register: {timings['register_ms']:.1f} ms, create NullTelemetry: {timings['create_ms']:.1f} ms"
+    )
+    assert timings["open_telemetry_imported"] is False
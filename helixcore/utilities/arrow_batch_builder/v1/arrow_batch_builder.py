@@ -0,0 +1,190 @@
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from helixcore.utilities.data_frame_types.data_frame_types import (
+    DataFrameType,
+    DataFrameStringType,
+    DataFrameIntegerType,
+    DataFrameTimestampType,
+    DataFrameBooleanType,
+    DataFrameFloatType,
+    DataFrameStructType,
+    DataFrameArrayType,
+)
+
+if TYPE_CHECKING:
+    import pyarrow
+
+
+def import_pyarrow() -> Any:
+    """
+    pyarrow is an optional dependency so it is only imported when arrow output is used
+    """
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is needed for arrow or parquet output.  Install it with `pip install pyarrow`"
+        ) from e
+    return pyarrow
+
+
+class ArrowBatchBuilder:
+    """
+    Accumulates rows (dicts) column by column and turns them into pyarrow RecordBatches of
+    batch_size rows so consumers (e.g., Spark pandas UDFs) get columnar data instead of one
+    Python dict per row.
+    """
+
+    def __init__(self, *, schema: DataFrameStructType, batch_size: int = 1000) -> None:
+        """
+        :param schema: schema of the rows
+        :param batch_size: number of rows in each RecordBatch
+        """
+        assert batch_size > 0, f"batch_size should be > 0 but is {batch_size}"
+        self.schema: DataFrameStructType = schema
+        self.batch_size: int = batch_size
+        self.arrow_schema: "pyarrow.Schema" = ArrowBatchBuilder.get_arrow_schema(schema)
+        self._column_names: List[str] = [field.name for field in schema.fields]
+        # values to use for missing values in non-nullable columns
+        self._defaults: Dict[str, Any] = {
+            field.name: ArrowBatchBuilder.get_default_value(field.data_type)
+            for field in schema.fields
+            if not field.nullable
+        }
+        self._columns: Dict[str, List[Any]] = {name: [] for name in self._column_names}
+        self._row_count: int = 0
+
+    @staticmethod
+    def get_arrow_type(data_type: DataFrameType) -> "pyarrow.DataType":
+        """
+        Converts a DataFrameType to the corresponding pyarrow type (using the same widths as Spark)
+
+
+        :param data_type: the data frame type
+        :return: the pyarrow type
+        """
+        pa = import_pyarrow()
+        if isinstance(data_type, DataFrameStringType):
+            return pa.string()
+        if isinstance(data_type, DataFrameIntegerType):
+            return pa.int32()
+        if isinstance(data_type, DataFrameTimestampType):
+            return pa.timestamp("us")
+        if isinstance(data_type, DataFrameBooleanType):
+            return pa.bool_()
+        if isinstance(data_type, DataFrameFloatType):
+            return pa.float32()
+        if isinstance(data_type, DataFrameArrayType):
+            return pa.list_(ArrowBatchBuilder.get_arrow_type(data_type.item_type))
+        if isinstance(data_type, DataFrameStructType):
+            return pa.struct(
+                [
+                    pa.field(
+                        field.name,
+                        ArrowBatchBuilder.get_arrow_type(field.data_type),
+                        nullable=field.nullable,
+                    )
+                    for field in data_type.fields
+                ]
+            )
+        raise NotImplementedError(f"Unsupported data type: {type(data_type)}")
+
+    @staticmethod
+    def get_arrow_schema(schema: DataFrameStructType) -> "pyarrow.Schema":
+        pa = import_pyarrow()
+        return pa.schema(
+            [
+                pa.field(
+                    field.name,
+                    ArrowBatchBuilder.get_arrow_type(field.data_type),
+                    nullable=field.nullable,
+                )
+                for field in schema.fields
+            ]
+        )
+
+    @staticmethod
+    def get_default_value(data_type: DataFrameType) -> Any:
+        if isinstance(data_type, DataFrameIntegerType):
+            return 0
+        if isinstance(data_type, DataFrameFloatType):
+            return 0.0
+        if isinstance(data_type, DataFrameBooleanType):
+            return False
+        if isinstance(data_type, DataFrameStringType):
+            return ""
+        if isinstance(data_type, DataFrameArrayType):
+            return []
+        return None
+
+    @property
+    def row_count(self) -> int:
+        """number of rows added since the last batch was returned"""
+        return self._row_count
+
+    def append(self, row: Dict[str, Any]) -> Optional["pyarrow.RecordBatch"]:
+        """
+        Adds a row
+
+
+        :param row: the row to add
+        :return: a RecordBatch if batch_size rows have been accumulated, otherwise None
+        """
+        defaults = self._defaults
+        for name, column in self._columns.items():
+            value = row.get(name)
+            if value is None and name in defaults:
+                value = defaults[name]
+            column.append(value)
+        self._row_count += 1
+        if self._row_count >= self.batch_size:
+            return self.flush()
+        return None
+
+    def extend(self, rows: Iterable[Dict[str, Any]]) -> List["pyarrow.RecordBatch"]:
+        """
+        Adds rows
+
+
+        :param rows: the rows to add
+        :return: the RecordBatches that were completed
+        """
+        batches: List["pyarrow.RecordBatch"] = []
+        for row in rows:
+            batch = self.append(row)
+            if batch is not None:
+                batches.append(batch)
+        return batches
+
+    def flush(self) -> Optional["pyarrow.RecordBatch"]:
+        """
+        Returns a RecordBatch with the rows accumulated so far
+
+
+        :return: the RecordBatch or None if there are no rows
+        """
+        if self._row_count == 0:
+            return None
+        pa = import_pyarrow()
+        batch = pa.RecordBatch.from_pydict(self._columns, schema=self.arrow_schema)
+        self._columns = {name: [] for name in self._column_names}
+        self._row_count = 0
+        return batch
+
+    async def build_batches_async(
+        self, rows: AsyncGenerator[Dict[str, Any], None]
+    ) -> AsyncGenerator["pyarrow.RecordBatch", None]:
+        """
+        Turns an async generator of rows into an async generator of RecordBatches
+
+
+        :param rows: the rows
+        :return: RecordBatches of batch_size rows (the last one may be smaller)
+        """
+        async for row in rows:
+            batch = self.append(row)
+            if batch is not None:
+                yield batch
+        last_batch = self.flush()
+        if last_batch is not None:
+            yield last_batch
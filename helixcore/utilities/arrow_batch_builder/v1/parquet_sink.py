@@ -0,0 +1,85 @@
+from pathlib import Path
+from types import TracebackType
+from typing import Any, AsyncGenerator, Dict, Optional, Type
+
+from helixcore.utilities.arrow_batch_builder.v1.arrow_batch_builder import (
+    ArrowBatchBuilder,
+    import_pyarrow,
+)
+from helixcore.utilities.data_frame_types.data_frame_types import DataFrameStructType
+
+
+class ParquetSink:
+    """
+    Writes rows to a local parquet file, one row group per batch_size rows.  Useful for local runs
+    where there is no Spark to collect the output.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: str | Path,
+        schema: DataFrameStructType,
+        batch_size: int = 1000,
+        compression: str = "snappy",
+    ) -> None:
+        """
+        :param path: the parquet file to write
+        :param schema: schema of the rows
+        :param batch_size: number of rows per row group
+        :param compression: parquet compression codec
+        """
+        import_pyarrow()
+        import pyarrow.parquet
+
+        self.path: str = str(path)
+        self.builder: ArrowBatchBuilder = ArrowBatchBuilder(
+            schema=schema, batch_size=batch_size
+        )
+        self._writer: Optional[Any] = pyarrow.parquet.ParquetWriter(
+            self.path, self.builder.arrow_schema, compression=compression
+        )
+        self.rows_written: int = 0
+
+    def write(self, row: Dict[str, Any]) -> None:
+        batch = self.builder.append(row)
+        if batch is not None:
+            self._write_batch(batch)
+
+    async def write_all_async(self, rows: AsyncGenerator[Dict[str, Any], None]) -> int:
+        """
+        Writes all the rows from the async generator.  A partial last batch is kept until more rows
+        are written or the sink is closed.
+
+
+        :param rows: the rows
+        :return: number of rows written to the file so far
+        """
+        async for row in rows:
+            self.write(row)
+        return self.rows_written
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        batch = self.builder.flush()
+        if batch is not None:
+            self._write_batch(batch)
+        self._writer.close()
+        self._writer = None
+
+    def _write_batch(self, batch: Any) -> None:
+        assert self._writer is not None, "ParquetSink is closed"
+        self._writer.write_batch(batch)
+        self.rows_written += batch.num_rows
+
+    def __enter__(self) -> "ParquetSink":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
@@ -0,0 +1,92 @@
+from pathlib import Path
+from typing import AsyncGenerator, Dict, Any, List
+
+import pytest
+
+from helixcore.utilities.arrow_batch_builder.v1.arrow_batch_builder import (
+    ArrowBatchBuilder,
+)
+from helixcore.utilities.arrow_batch_builder.v1.parquet_sink import ParquetSink
+from helixcore.utilities.fhir_helpers.fhir_get_response_item import (
+    FhirGetResponseItem,
+)
+from helixcore.utilities.fhir_helpers.fhir_get_response_schema import (
+    FhirGetResponseSchema,
+)
+
+pyarrow = pytest.importorskip("pyarrow")
+
+
+def create_rows(count: int) -> List[Dict[str, Any]]:
+    return [
+        FhirGetResponseItem(
+            dict(
+                partition_index=1,
+                sent=1,
+                received=1,
+                responses=[f'{{"resourceType": "Patient", "id": "{i}"}}'],
+                url=f"https://fhir.example.com/Patient/{i}",
+                status_code=200,
+                request_id=f"request-{i}",
+            )
+        ).to_dict()
+        for i in range(count)
+    ]
+
+
+def test_arrow_batch_builder() -> None:
+    builder = ArrowBatchBuilder(
+        schema=FhirGetResponseSchema.get_schema(), batch_size=10
+    )
+    rows = create_rows(25)
+    # a row missing non-nullable values gets the defaults
+    rows.append({"url": "https://fhir.example.com"})
+
+    batches = builder.extend(rows)
+    assert [batch.num_rows for batch in batches] == [10, 10]
+    assert builder.row_count == 6
+    last_batch = builder.flush()
+    assert last_batch is not None and last_batch.num_rows == 6
+    assert builder.flush() is None
+
+    table = pyarrow.Table.from_batches(batches + [last_batch])
+    assert table.schema.field("status_code").type == pyarrow.int32()
+    assert table.schema.field("responses").type == pyarrow.list_(pyarrow.string())
+    assert table.column("request_id").to_pylist()[:2] == ["request-0", "request-1"]
+    assert table.to_pylist()[-1] == {
+        "partition_index": 0,
+        "sent": 0,
+        "received": 0,
+        "responses": [],
+        "first": None,
+        "last": None,
+        "error_text": None,
+        "url": "https://fhir.example.com",
+        "status_code": None,
+        "request_id": None,
+        "access_token": None,
+        "extra_context_to_return": None,
+    }
+
+
+async def test_parquet_sink(tmp_path: Path) -> None:
+    import pyarrow.parquet
+
+    async def get_rows() -> AsyncGenerator[Dict[str, Any], None]:
+        for row in create_rows(25):
+            yield row
+
+    path = tmp_path / "responses.parquet"
+    with ParquetSink(
+        path=path, schema=FhirGetResponseSchema.get_schema(), batch_size=10
+    ) as sink:
+        await sink.write_all_async(get_rows())
+        sink.write(create_rows(1)[0])
+    assert sink.rows_written == 26
+
+    parquet_file = pyarrow.parquet.ParquetFile(path)
+    assert parquet_file.metadata.num_rows == 26
+    assert parquet_file.metadata.num_row_groups == 3
+    assert parquet_file.read().column("url").to_pylist()[24] == (
+        "https://fhir.example.com/Patient/24"
+    )
@@ -1,12 +1,63 @@
 import asyncio
+import concurrent.futures
+import os
 import threading
-import time
-from typing import AsyncGenerator, List, TypeVar, Optional, Coroutine, Any
+import weakref
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    TypeVar,
+    Optional,
+    Coroutine,
+    Any,
+    Tuple,
+)
 
-from concurrent.futures import ThreadPoolExecutor
+T = TypeVar("T")
+R = TypeVar("R")
 
+# event loops running in background threads that sync callers submit coroutines to.  Each calling thread
+# gets its own loop so calls from different threads still run in parallel and a blocked or hung coroutine
+# only stalls the thread that is waiting for it
+_thread_local: threading.local = threading.local()
 
-T = TypeVar("T")
+
+class _BackgroundLoop:
+    def __init__(self) -> None:
+        """
+        Starts an event loop in a daemon thread.  The thread does not survive a fork so the pid is kept.
+        """
+        self.pid: int = os.getpid()
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        started: threading.Event = threading.Event()
+
+        def run_loop() -> None:
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(started.set)
+            self.loop.run_forever()
+
+        self.thread: threading.Thread = threading.Thread(
+            target=run_loop, name="AsyncHelperEventLoop", daemon=True
+        )
+        self.thread.start()
+        started.wait()
+
+    def is_usable(self) -> bool:
+        return self.pid == os.getpid() and not self.loop.is_closed()
+
+    def stop(self) -> None:
+        if not self.is_usable() or not self.thread.is_alive():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+            self.loop.close()
 
 
 class AsyncHelper:
@@ -25,21 +76,61 @@ class AsyncHelper:
 
     @staticmethod
     async def collect_async_data(
-        *, async_gen: AsyncGenerator[T, None], chunk_size: int
+        *,
+        async_gen: AsyncGenerator[T, None],
+        chunk_size: int,
+        max_wait: Optional[float] = None,
+        max_chunk_bytes: Optional[int] = None,
+        get_item_size: Optional[Callable[[T], int]] = None,
     ) -> AsyncGenerator[List[T], None]:
         """
-        Collects data from an async generator in chunks of size `chunk_size`
+        Collects data from an async generator in chunks of size `chunk_size`.
+        If max_wait is set, a partial chunk is also yielded when max_wait seconds have passed since its first
+        item so a slow generator does not hold items back from downstream writers.
+        If max_chunk_bytes is set, a chunk is yielded before it would grow past max_chunk_bytes as measured by
+        get_item_size.  An item larger than max_chunk_bytes is yielded in a chunk by itself.
 
         :param async_gen: AsyncGenerator
         :param chunk_size: int
+        :param max_wait: maximum seconds between the first item of a chunk and yielding it
+        :param max_chunk_bytes: maximum size of a chunk
+        :param get_item_size: returns the size of an item e.g., the length of its json.  Required with
+                                max_chunk_bytes
         :return: AsyncGenerator
         """
-        chunk1 = []
+        assert (
+            max_chunk_bytes is None or get_item_size is not None
+        ), "get_item_size is required when max_chunk_bytes is set"
+        if max_wait is not None:
+            async for chunk in AsyncHelper.batch_by_time_or_size(
+                async_gen,
+                max_items=chunk_size,
+                max_wait=max_wait,
+                max_bytes=max_chunk_bytes,
+                get_item_size=get_item_size,
+            ):
+                yield chunk
+            return
+        chunk1: List[T] = []
+        chunk1_bytes: int = 0
         async for item in async_gen:
+            item_bytes: int = get_item_size(item) if get_item_size else 0
+            if (
+                chunk1
+                and max_chunk_bytes is not None
+                and chunk1_bytes + item_bytes > max_chunk_bytes
+            ):
+                yield chunk1
+                chunk1 = []
+                chunk1_bytes = 0
             chunk1.append(item)
-            if len(chunk1) >= chunk_size:
+            chunk1_bytes += item_bytes
+            if len(chunk1) >= chunk_size or (
+                max_chunk_bytes is not None and chunk1_bytes >= max_chunk_bytes
+            ):
                 yield chunk1
                 chunk1 = []
+                chunk1_bytes = 0
         # if there are any chunks left yield them
         if chunk1:
             yield chunk1
@@ -47,55 +138,73 @@ class AsyncHelper:
     @staticmethod
     def run(fn: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
         """
-        Runs an async function but returns the result synchronously
-        Similar to asyncio.run() but does not create a new event loop if one already exists
+        Runs an async function but returns the result synchronously.
+        The coroutine runs on a persistent event loop in a background thread (one per calling thread) so no
+        event loop or thread is created per call and it works whether or not the caller is already inside a
+        running event loop.
 
         :param fn: Coroutine
-        :param timeout: Optional timeout in seconds to wait for loop to finish running
+        :param timeout: Optional timeout in seconds to wait for the coroutine.  The coroutine is cancelled
+                        and TimeoutError is raised if it does not finish in time
         :return: T
         """
-        try:
-            # print(f"Getting running loop")
-            loop = asyncio.get_running_loop()
-            # print(f"Got running loop")
-        except RuntimeError:
-            # print(f"Creating new event loop")
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        return AsyncHelper.run_in_background_loop(coro=fn, timeout=timeout)
+
+    @staticmethod
+    def get_background_loop() -> asyncio.AbstractEventLoop:
+        """
+        Returns the event loop running in the background for the calling thread, starting it the first time.
+        The loop is stopped when the calling thread is garbage collected or at exit.
+        """
+        background_loop: Optional[_BackgroundLoop] = getattr(
+            _thread_local, "background_loop", None
+        )
+        if background_loop is None or not background_loop.is_usable():
+            background_loop = _BackgroundLoop()
+            _thread_local.background_loop = background_loop
+            weakref.finalize(threading.current_thread(), background_loop.stop)
+        return background_loop.loop
+
+    @staticmethod
+    def stop_background_loop() -> None:
+        """
+        Stops the background event loop of the calling thread.  It is started again by the next call that
+        needs it.
+        """
+        background_loop: Optional[_BackgroundLoop] = getattr(
+            _thread_local, "background_loop", None
+        )
+        if background_loop is not None:
+            _thread_local.background_loop = None
+            background_loop.stop()
 
+    @staticmethod
+    def run_in_background_loop(
+        *, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None
+    ) -> T:
+        """
+        Submits the coroutine to the background event loop of the calling thread and waits for the result.
+        A call made from a background loop gets its own loop so it does not wait on itself.
+
+        :param coro: Coroutine
+        :param timeout: Optional timeout in seconds.  The coroutine is cancelled and TimeoutError is raised
+                        if it does not finish in time
+        :return: T
+        """
+        future: concurrent.futures.Future[T] = asyncio.run_coroutine_threadsafe(
+            coro, AsyncHelper.get_background_loop()
+        )
         try:
-            if loop.is_running() and timeout is not None:
-                # print(f"Loop is running so waiting for it to end")
-                start_time = time.time()
-                while loop.is_running():
-                    current_time = time.time()
-                    elapsed_time = current_time - start_time
-
-                    if elapsed_time > timeout:
-                        # print(f"Timeout {timeout} reached. Exiting loop.")
-                        break
-
-                    # print(f"Waiting for loop to end: {elapsed_time}")
-                    time.sleep(1)
-            # print(f"Running loop")
-            result = loop.run_until_complete(fn)
-            # print(f"Ran loop")
-        except RuntimeError as e:
-            if "This event loop is already running" in str(e):
-                try:
-                    return AsyncHelper.run_in_thread_pool_and_wait(coro=fn)
-                except RuntimeError as e2:
-                    raise RuntimeError(
-                        f"While calling {fn.__name__} there is already an event loop running."
-                        "\nThis usually happens because you are calling this function"
-                        " from an asynchronous context so you can't just wrap it in AsyncRunner.run()."
-                        f"\nEither use `await {fn.__name__}` or"
-                        " use nest_asyncio (https://github.com/erdewit/nest_asyncio)."
-                        f"\nException: {e}"
-                    )
-            else:
-                raise e
-        return result
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(
+                f"{getattr(coro, '__name__', coro)} did not finish in {timeout} seconds"
+            )
+        except BaseException:
+            # e.g. KeyboardInterrupt while waiting.  Don't leave the coroutine running in the background
+            future.cancel()
+            raise
 
     @staticmethod
     def run_in_new_thread_and_wait(coro: Coroutine[Any, Any, T]) -> T:
@@ -128,27 +237,260 @@ class AsyncHelper:
     @staticmethod
     def run_in_thread_pool_and_wait(coro: Coroutine[Any, Any, T]) -> T:
         """
-        Runs the coroutine in a thread pool and waits for it to finish
+        Runs the coroutine in the background event loop thread of the calling thread and waits for it to finish
 
         :param coro: Coroutine
         :return: T
         """
-        result: Optional[T] = None
-        exception: Optional[Exception] = None
+        return AsyncHelper.run_in_background_loop(coro=coro)
 
-        def target() -> None:
-            nonlocal result, exception
+    @staticmethod
+    async def map_concurrent(
+        *,
+        fn: Callable[[T], Awaitable[R]],
+        iterable: Iterable[T] | AsyncIterable[T],
+        limit: int,
+        preserve_order: bool = False,
+    ) -> AsyncGenerator[R, None]:
+        """
+        Runs fn on each item with at most `limit` calls running at the same time and yields the results.
+        Items are only read when there is a free slot.  If fn raises or the caller stops early, the running
+        calls are cancelled.
+
+        :param fn: async function to run on each item
+        :param iterable: items (sync or async)
+        :param limit: maximum calls running at the same time
+        :param preserve_order: yield results in the order of the items.  Otherwise, in the order they complete
+        :return: AsyncGenerator
+        """
+        assert limit > 0, f"limit should be > 0 but is {limit}"
+        items: AsyncIterator[T] = AsyncHelper._aiter(iterable)
+        running: Dict["asyncio.Future[R]", int] = {}
+        # results waiting for an earlier item when preserving order.  They count against the limit
+        completed: Dict[int, R] = {}
+        # the read of the next item is awaited together with the running calls so results are yielded
+        # (and failures raised) as soon as they are ready even when the items are slow to produce
+        next_item: Optional["asyncio.Future[T]"] = None
+        next_index: int = 0
+        next_index_to_yield: int = 0
+        exhausted: bool = False
+        try:
+            while True:
+                if (
+                    next_item is None
+                    and not exhausted
+                    and len(running) + len(completed) < limit
+                ):
+                    next_item = asyncio.ensure_future(anext(items))
+                waiting: List["asyncio.Future[Any]"] = list(running.keys())
+                if next_item is not None:
+                    waiting.append(next_item)
+                if not waiting:
+                    break
+                done, _ = await asyncio.wait(
+                    waiting, return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_item is not None and next_item in done:
+                    try:
+                        item: T = next_item.result()
+                    except StopAsyncIteration:
+                        exhausted = True
+                    else:
+                        running[asyncio.ensure_future(fn(item))] = next_index
+                        next_index += 1
+                    finally:
+                        next_item = None
+                for task in sorted(
+                    (t for t in done if t in running), key=lambda t: running[t]
+                ):
+                    index: int = running.pop(task)
+                    if preserve_order:
+                        completed[index] = task.result()
+                    else:
+                        yield task.result()
+                while next_index_to_yield in completed:
+                    yield completed.pop(next_index_to_yield)
+                    next_index_to_yield += 1
+        finally:
+            if next_item is not None:
+                await AsyncHelper._cancel_all([next_item])
+            await AsyncHelper._cancel_all(running.keys())
+            await AsyncHelper._aclose(items)
+
+    @staticmethod
+    async def merge(*async_gens: AsyncIterable[T]) -> AsyncGenerator[T, None]:
+        """
+        Interleaves the items of several async generators in the order they are produced.  Each generator is
+        read one item ahead.  If one raises or the caller stops early, the others are cancelled and closed.
+
+        :param async_gens: async generators to merge
+        :return: AsyncGenerator
+        """
+        iterators: List[AsyncIterator[T]] = [
+            AsyncHelper._aiter(async_gen) for async_gen in async_gens
+        ]
+        pending: Dict["asyncio.Future[T]", AsyncIterator[T]] = {
+            asyncio.ensure_future(anext(iterator)): iterator for iterator in iterators
+        }
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    iterator: AsyncIterator[T] = pending.pop(task)
+                    try:
+                        item: T = task.result()
+                    except StopAsyncIteration:
+                        continue
+                    pending[asyncio.ensure_future(anext(iterator))] = iterator
+                    yield item
+        finally:
+            await AsyncHelper._cancel_all(pending.keys())
+            for iterator in iterators:
+                await AsyncHelper._aclose(iterator)
+
+    @staticmethod
+    async def buffered(
+        async_gen: AsyncIterable[T], size: int
+    ) -> AsyncGenerator[T, None]:
+        """
+        Reads up to `size` items ahead of the caller in a background task so producing the next items
+        overlaps with processing the current one.  The background task is cancelled if the caller stops early.
+
+        :param async_gen: async generator to read from
+        :param size: maximum number of items read ahead
+        :return: AsyncGenerator
+        """
+        assert size > 0, f"size should be > 0 but is {size}"
+        queue: asyncio.Queue[Tuple[bool, Any]] = asyncio.Queue(maxsize=size)
+
+        async def produce() -> None:
+            # (True, item) for items, (False, exception or None) at the end
             try:
-                result = asyncio.run(coro)
+                async for item in async_gen:
+                    await queue.put((True, item))
             except Exception as e:
-                exception = e
+                await queue.put((False, e))
+                return
+            await queue.put((False, None))
 
-        with ThreadPoolExecutor() as executor:
-            future = executor.submit(target)
-            future.result()  # This will block until the thread completes
+        producer: asyncio.Task[None] = asyncio.create_task(produce())
+        try:
+            while True:
+                is_item, value = await queue.get()
+                if is_item:
+                    yield value
+                elif value is not None:
+                    raise value
+                else:
+                    break
+        finally:
+            await AsyncHelper._cancel_all([producer])
+            await AsyncHelper._aclose(async_gen)
 
-        if exception:
-            raise exception
+    @staticmethod
+    async def batch_by_time_or_size(
+        async_gen: AsyncIterable[T],
+        *,
+        max_items: int,
+        max_wait: float,
+        max_bytes: Optional[int] = None,
+        get_item_size: Optional[Callable[[T], int]] = None,
+    ) -> AsyncGenerator[List[T], None]:
+        """
+        Groups the items into batches.  A batch is yielded when it has `max_items` items or when `max_wait`
+        seconds have passed since its first item, whichever comes first, so slow producers do not hold items
+        back indefinitely.  If max_bytes is set, a batch is also yielded before it would grow past max_bytes
+        as measured by get_item_size.
 
-        # Allow returning None without checking since T may be an Optional type already
-        return result  # type: ignore[return-value]
+        :param async_gen: async generator to read from
+        :param max_items: maximum items in a batch
+        :param max_wait: maximum seconds between the first item of a batch and yielding it
+        :param max_bytes: maximum size of a batch
+        :param get_item_size: returns the size of an item.  Required with max_bytes
+        :return: AsyncGenerator
+        """
+        assert max_items > 0, f"max_items should be > 0 but is {max_items}"
+        assert (
+            max_bytes is None or get_item_size is not None
+        ), "get_item_size is required when max_bytes is set"
+        iterator: AsyncIterator[T] = AsyncHelper._aiter(async_gen)
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        # the read of the next item stays pending across batches; cancelling it would break the generator
+        next_item: Optional["asyncio.Future[T]"] = None
+        batch: List[T] = []
+        batch_bytes: int = 0
+        deadline: float = 0
+        try:
+            while True:
+                if next_item is None:
+                    next_item = asyncio.ensure_future(anext(iterator))
+                if batch:
+                    done, _ = await asyncio.wait(
+                        [next_item], timeout=max(deadline - loop.time(), 0)
+                    )
+                    if not done:
+                        yield batch
+                        batch = []
+                        batch_bytes = 0
+                        continue
+                else:
+                    await asyncio.wait([next_item])
+                try:
+                    item: T = next_item.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    next_item = None
+                item_bytes: int = get_item_size(item) if get_item_size else 0
+                if (
+                    batch
+                    and max_bytes is not None
+                    and batch_bytes + item_bytes > max_bytes
+                ):
+                    yield batch
+                    batch = []
+                    batch_bytes = 0
+                if not batch:
+                    deadline = loop.time() + max_wait
+                batch.append(item)
+                batch_bytes += item_bytes
+                if len(batch) >= max_items or (
+                    max_bytes is not None and batch_bytes >= max_bytes
+                ):
+                    yield batch
+                    batch = []
+                    batch_bytes = 0
+            if batch:
+                yield batch
+        finally:
+            if next_item is not None:
+                await AsyncHelper._cancel_all([next_item])
+            await AsyncHelper._aclose(iterator)
+
+    @staticmethod
+    def _aiter(iterable: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+        if isinstance(iterable, AsyncIterable):
+            return aiter(iterable)
+
+        async def iterate() -> AsyncGenerator[T, None]:
+            for item in iterable:
+                yield item
+
+        return iterate()
+
+    @staticmethod
+    async def _cancel_all(tasks: Iterable["asyncio.Future[Any]"]) -> None:
+        tasks = list(tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _aclose(iterator: Any) -> None:
+        aclose: Optional[Callable[[], Awaitable[None]]] = getattr(
+            iterator, "aclose", None
+        )
+        if aclose is not None:
+            await aclose()
@@ -1,6 +1,10 @@
 import pytest
 import asyncio
-from typing import AsyncGenerator, Dict
+import logging
+import threading
+import time
+from contextlib import aclosing
+from typing import AsyncGenerator, Dict, List
 from helixcore.utilities.async_helper.v1.async_helper import AsyncHelper
 from helixcore.utilities.data_frame_types.data_frame_types import (
     DataFrameStructType,
@@ -8,6 +12,8 @@ from helixcore.utilities.data_frame_types.data_frame_types import (
     DataFrameStringType,
 )
 
+logger: logging.Logger = logging.getLogger(__name__)
+
 
 # Sample async generator for testing
 async def sample_async_generator() -> AsyncGenerator[int, None]:
@@ -46,6 +52,53 @@ async def test_collect_async_data() -> None:
     assert result == [[0, 1], [2, 3], [4]]
 
 
+async def test_collect_async_data_max_wait() -> None:
+    async def slow_generator() -> AsyncGenerator[int, None]:
+        for i in range(3):
+            yield i
+        await asyncio.sleep(0.1)
+        yield 3
+
+    start: float = time.perf_counter()
+    times: List[float] = []
+    chunks: List[List[int]] = []
+    async for chunk in AsyncHelper.collect_async_data(
+        async_gen=slow_generator(), chunk_size=10, max_wait=0.02
+    ):
+        times.append(time.perf_counter() - start)
+        chunks.append(chunk)
+    # the partial chunk is flushed at the deadline instead of waiting for the slow item
+    assert chunks == [[0, 1, 2], [3]]
+    assert times[0] < 0.08
+
+
+async def test_collect_async_data_max_chunk_bytes() -> None:
+    async def strings() -> AsyncGenerator[str, None]:
+        for value in ["aaa", "bb", "cccc", "dddddddddd", "e"]:
+            yield value
+
+    result = [
+        chunk
+        async for chunk in AsyncHelper.collect_async_data(
+            async_gen=strings(), chunk_size=10, max_chunk_bytes=6, get_item_size=len
+        )
+    ]
+    # an item larger than max_chunk_bytes is yielded by itself
+    assert result == [["aaa", "bb"], ["cccc"], ["dddddddddd"], ["e"]]
+
+    result = [
+        chunk
+        async for chunk in AsyncHelper.collect_async_data(
+            async_gen=strings(),
+            chunk_size=10,
+            max_wait=1,
+            max_chunk_bytes=6,
+            get_item_size=len,
+        )
+    ]
+    assert result == [["aaa", "bb"], ["cccc"], ["dddddddddd"], ["e"]]
+
+
 def test_run() -> None:
     async def sample_coroutine() -> int:
         await asyncio.sleep(0.1)
@@ -71,3 +124,261 @@ def test_run_in_thread_pool_and_wait() -> None:
 
     result = AsyncHelper.run_in_thread_pool_and_wait(sample_coroutine())
     assert result == 42
+
+
+def test_run_reuses_background_loop() -> None:
+    async def get_loop() -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    loop = AsyncHelper.run(get_loop())
+    assert AsyncHelper.run(get_loop()) is loop
+    assert AsyncHelper.run_in_thread_pool_and_wait(get_loop()) is loop
+
+    start = time.perf_counter()
+    for _ in range(100):
+        AsyncHelper.run(get_loop())
+    background = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(100):
+        AsyncHelper.run_in_new_thread_and_wait(get_loop())
+    new_thread = time.perf_counter() - start
+    logger.info(
+        f"100 calls: background loop={background * 1000:.1f}ms new thread={new_thread * 1000:.1f}ms"
+    )
+
+
+def test_run_uses_a_loop_per_calling_thread() -> None:
+    async def get_loop() -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    release = threading.Event()
+    blocked = threading.Event()
+
+    async def blocking_coroutine() -> asyncio.AbstractEventLoop:
+        blocked.set()
+        # blocks the event loop of the calling thread
+        release.wait(timeout=5)
+        return asyncio.get_running_loop()
+
+    loops: List[asyncio.AbstractEventLoop] = []
+    thread = threading.Thread(
+        target=lambda: loops.append(AsyncHelper.run(blocking_coroutine()))
+    )
+    thread.start()
+    try:
+        assert blocked.wait(timeout=5)
+        # the other thread's loop is blocked but this thread's loop is not
+        loop = AsyncHelper.run(get_loop(), timeout=1)
+        assert not release.is_set()
+    finally:
+        release.set()
+        thread.join()
+    assert loops[0] is not loop
+
+
+async def test_run_inside_running_loop() -> None:
+    async def sample_coroutine() -> int:
+        # calling run from a coroutine on the background loop must not deadlock
+        return AsyncHelper.run(asyncio.sleep(0, result=42)) + 1
+
+    assert AsyncHelper.run(sample_coroutine()) == 43
+
+
+def test_run_timeout() -> None:
+    cancelled = threading.Event()
+
+    async def slow_coroutine() -> int:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return 42
+
+    with pytest.raises(TimeoutError):
+        AsyncHelper.run(slow_coroutine(), timeout=0.05)
+    assert cancelled.wait(timeout=1)
+
+    async def failing_coroutine() -> int:
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        AsyncHelper.run(failing_coroutine())
+
+
+def test_stop_background_loop() -> None:
+    async def get_loop() -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    loop = AsyncHelper.run(get_loop())
+    AsyncHelper.stop_background_loop()
+    assert loop.is_closed()
+    assert AsyncHelper.run(get_loop()) is not loop
+
+
+async def test_map_concurrent() -> None:
+    running: List[int] = [0, 0]
+
+    async def fn(item: int) -> int:
+        running[0] += 1
+        running[1] = max(running[1], running[0])
+        await asyncio.sleep(0.001 * (10 - item))
+        running[0] -= 1
+        return item * 2
+
+    ordered = [
+        r
+        async for r in AsyncHelper.map_concurrent(
+            fn=fn, iterable=range(10), limit=3, preserve_order=True
+        )
+    ]
+    assert ordered == [i * 2 for i in range(10)]
+    assert running[1] == 3
+
+    unordered = [
+        r
+        async for r in AsyncHelper.map_concurrent(
+            fn=fn, iterable=sample_async_generator(), limit=5
+        )
+    ]
+    assert sorted(unordered) == [0, 2, 4, 6, 8]
+    assert unordered != [0, 2, 4, 6, 8]
+
+
+async def test_map_concurrent_cancels_on_early_exit() -> None:
+    cancelled: List[int] = []
+
+    async def fn(item: int) -> int:
+        try:
+            await asyncio.sleep(0.01 if item == 0 else 1)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    async with aclosing(
+        AsyncHelper.map_concurrent(fn=fn, iterable=range(100), limit=4)
+    ) as results:
+        async for result in results:
+            assert result == 0
+            break
+    assert sorted(cancelled) == [1, 2, 3]
+
+
+async def test_map_concurrent_does_not_wait_for_slow_items() -> None:
+    released = asyncio.Event()
+
+    async def items() -> AsyncGenerator[int, None]:
+        yield 0
+        # the next item is only produced after the result of the first one was yielded
+        await released.wait()
+        yield 1
+
+    async def double(item: int) -> int:
+        return item * 2
+
+    async def collect() -> List[int]:
+        results: List[int] = []
+        async for result in AsyncHelper.map_concurrent(
+            fn=double, iterable=items(), limit=2
+        ):
+            results.append(result)
+            released.set()
+        return results
+
+    assert await asyncio.wait_for(collect(), timeout=5) == [0, 2]
+
+    async def fail(item: int) -> int:
+        raise ValueError(f"failed {item}")
+
+    never = asyncio.Event()
+
+    async def stalled_items() -> AsyncGenerator[int, None]:
+        yield 0
+        await never.wait()
+        yield 1
+
+    # the failure is raised while the source is still waiting for its next item
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(
+            AsyncHelper.collect_items(
+                AsyncHelper.map_concurrent(fn=fail, iterable=stalled_items(), limit=2)
+            ),
+            timeout=5,
+        )
+
+
+async def test_merge() -> None:
+    async def numbers(prefix: str, delay: float) -> AsyncGenerator[str, None]:
+        for i in range(3):
+            await asyncio.sleep(delay)
+            yield f"{prefix}{i}"
+
+    b_started = asyncio.Event()
+
+    async def first() -> AsyncGenerator[str, None]:
+        yield "a0"
+        yield "a1"
+        b_started.set()
+        yield "a2"
+
+    async def second() -> AsyncGenerator[str, None]:
+        # only starts producing once the first generator has produced two items
+        await b_started.wait()
+        for i in range(3):
+            yield f"b{i}"
+
+    merged = [item async for item in AsyncHelper.merge(first(), second())]
+    assert sorted(merged) == ["a0", "a1", "a2", "b0", "b1", "b2"]
+    assert merged[:2] == ["a0", "a1"]
+
+    async def failing() -> AsyncGenerator[str, None]:
+        yield "x"
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        async for _ in AsyncHelper.merge(numbers("a", 0.01), failing()):
+            pass
+
+
+async def test_buffered() -> None:
+    produced: List[int] = []
+
+    async def numbers() -> AsyncGenerator[int, None]:
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    consumed: List[int] = []
+    async for item in AsyncHelper.buffered(numbers(), 3):
+        await asyncio.sleep(0)
+        consumed.append(item)
+        # read ahead is bounded by the buffer size (+1 item waiting to be put)
+        assert len(produced) - len(consumed) <= 4
+    assert consumed == list(range(10))
+
+    async def failing() -> AsyncGenerator[int, None]:
+        yield 1
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        async for _ in AsyncHelper.buffered(failing(), 2):
+            pass
+
+
+async def test_batch_by_time_or_size() -> None:
+    async def bursts() -> AsyncGenerator[int, None]:
+        for i in range(5):
+            yield i
+        await asyncio.sleep(0.1)
+        for i in range(5, 7):
+            yield i
+
+    batches = [
+        batch
+        async for batch in AsyncHelper.batch_by_time_or_size(
+            bursts(), max_items=3, max_wait=0.02
+        )
+    ]
+    # size limit, then the time limit flushes [3, 4] while the producer is idle
+    assert batches == [[0, 1, 2], [3, 4], [5, 6]]
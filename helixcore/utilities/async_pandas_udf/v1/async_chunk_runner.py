@@ -0,0 +1,163 @@
+import asyncio
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from helixcore.utilities.async_helper.v1.async_helper import AsyncHelper
+from helixcore.utilities.async_pandas_udf.v1.async_pandas_udf_parameters import (
+    AsyncPandasUdfParameters,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class AsyncChunkResult(Generic[R]):
+    """
+    The result of running a chunk with its timing
+    """
+
+    chunk_index: int
+    """ index of the chunk in the input """
+
+    row_count: int
+    """ number of rows in the chunk """
+
+    result: R
+    """ value returned for the chunk """
+
+    start_time: datetime
+    """ when the chunk started running """
+
+    duration_seconds: float
+    """ how long the chunk took """
+
+    wait_seconds: float
+    """ how long the chunk waited for a free slot after it was read """
+
+
+class AsyncChunkRunner(Generic[T, R]):
+    def __init__(
+        self,
+        *,
+        fn: Callable[[List[T], int], Awaitable[R]],
+        parameters: AsyncPandasUdfParameters,
+        chunk_timeout: Optional[float] = None,
+        preserve_order: bool = True,
+    ) -> None:
+        """
+        Splits rows into chunks of max_chunk_size and runs fn on the chunks.  If process_chunks_in_parallel is set
+        up to maximum_concurrent_tasks chunks run at the same time, else the chunks run one at a time.  Rows are
+        only read when there is a free slot so the input can be a large (async) iterator.
+
+        :param fn: function called with (chunk, chunk index)
+        :param parameters: chunk size and concurrency
+        :param chunk_timeout: seconds a chunk may run before it is cancelled and TimeoutError is raised
+        :param preserve_order: yield results in the order of the chunks.  Otherwise, in the order they complete
+        """
+        assert (
+            parameters.max_chunk_size > 0
+        ), f"max_chunk_size should be > 0 but is {parameters.max_chunk_size}"
+        self.fn: Callable[[List[T], int], Awaitable[R]] = fn
+        self.parameters: AsyncPandasUdfParameters = parameters
+        self.chunk_timeout: Optional[float] = chunk_timeout
+        self.preserve_order: bool = preserve_order
+
+    @property
+    def maximum_concurrent_chunks(self) -> int:
+        if not self.parameters.process_chunks_in_parallel:
+            return 1
+        return max(self.parameters.maximum_concurrent_tasks, 1)
+
+    async def _get_chunks(
+        self, rows: Iterable[T] | AsyncIterable[T]
+    ) -> AsyncGenerator[List[T], None]:
+        chunk: List[T] = []
+        if isinstance(rows, AsyncIterable):
+            async for row in rows:
+                chunk.append(row)
+                if len(chunk) >= self.parameters.max_chunk_size:
+                    yield chunk
+                    chunk = []
+        else:
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= self.parameters.max_chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    async def _run_chunk(
+        self, chunk: List[T], chunk_index: int, read_time: float
+    ) -> AsyncChunkResult[R]:
+        start: float = time.perf_counter()
+        start_time: datetime = datetime.now(timezone.utc)
+        try:
+            result: R = await asyncio.wait_for(
+                self.fn(chunk, chunk_index), timeout=self.chunk_timeout
+            )
+        except asyncio.TimeoutError as e:
+            raise TimeoutError(
+                f"Chunk {chunk_index} with {len(chunk)} rows did not finish in {self.chunk_timeout} seconds"
+            ) from e
+        return AsyncChunkResult(
+            chunk_index=chunk_index,
+            row_count=len(chunk),
+            result=result,
+            start_time=start_time,
+            duration_seconds=time.perf_counter() - start,
+            wait_seconds=start - read_time,
+        )
+
+    async def _get_indexed_chunks(
+        self, rows: Iterable[T] | AsyncIterable[T]
+    ) -> AsyncGenerator[Tuple[List[T], int, float], None]:
+        chunk_index: int = 0
+        async for chunk in self._get_chunks(rows):
+            yield chunk, chunk_index, time.perf_counter()
+            chunk_index += 1
+
+    async def run_async(
+        self, rows: Iterable[T] | AsyncIterable[T]
+    ) -> AsyncGenerator[AsyncChunkResult[R], None]:
+        """
+        Runs fn on the chunks of the rows and yields the results.  If a chunk fails or times out, the running
+        chunks are cancelled and the exception is raised.  Closing the generator early cancels the running chunks.
+
+        :param rows: rows to process
+        """
+        async with aclosing(
+            AsyncHelper.map_concurrent(
+                fn=lambda indexed_chunk: self._run_chunk(*indexed_chunk),
+                iterable=self._get_indexed_chunks(rows),
+                limit=self.maximum_concurrent_chunks,
+                preserve_order=self.preserve_order,
+            )
+        ) as chunk_results:
+            async for chunk_result in chunk_results:
+                yield chunk_result
+
+    async def run_and_collect_async(
+        self, rows: Iterable[T] | AsyncIterable[T]
+    ) -> List[R]:
+        """
+        Runs fn on the chunks of the rows and returns the results
+
+        :param rows: rows to process
+        """
+        return [chunk_result.result async for chunk_result in self.run_async(rows)]
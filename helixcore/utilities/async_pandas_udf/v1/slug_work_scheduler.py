@@ -0,0 +1,180 @@
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from typing import (
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from helixcore.utilities.async_helper.v1.async_helper import AsyncHelper
+from helixcore.utilities.async_pandas_udf.v1.async_pandas_udf_parameters import (
+    AsyncPandasUdfParameters,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# default maximum concurrent tasks for one slug as a fraction of maximum_concurrent_tasks so a slow
+# source system can not take all the slots while other slugs have rows waiting
+DEFAULT_SLUG_CONCURRENCY_FRACTION: float = 0.5
+
+
+class SlugWorkScheduler(Generic[T, R]):
+    def __init__(
+        self,
+        *,
+        fn: Callable[[T], Awaitable[R]],
+        get_slug: Callable[[T], Optional[str]],
+        maximum_concurrent_tasks: int,
+        max_concurrent_tasks_per_slug: Optional[int] = None,
+        slug_concurrency_limits: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """
+        Runs fn on the rows of a partition with rows pulled from per slug queues instead of fixed chunks.
+        Whenever a task finishes, the free slot is given to the next slug (round robin) that is under its
+        concurrency limit, so rows for fast source systems keep running while a slow source system is capped
+        at its limit instead of stalling a whole chunk.
+
+        The default per slug limit is only applied while other slugs are under their limit: if every slug
+        with rows waiting is at the default limit, free slots are still used so a partition with one slug runs
+        at full concurrency.  Limits that are passed (max_concurrent_tasks_per_slug or slug_concurrency_limits)
+        are never exceeded e.g., for rate limited source systems.
+
+        :param fn: function to run on each row
+        :param get_slug: returns the slug of a row
+        :param maximum_concurrent_tasks: maximum rows processed at the same time
+        :param max_concurrent_tasks_per_slug: maximum rows of one slug processed at the same time.
+                                                Defaults to half of maximum_concurrent_tasks while other slugs
+                                                have rows waiting
+        :param slug_concurrency_limits: limits for specific slugs.  Override max_concurrent_tasks_per_slug
+        """
+        assert (
+            maximum_concurrent_tasks > 0
+        ), f"maximum_concurrent_tasks should be > 0 but is {maximum_concurrent_tasks}"
+        self.fn: Callable[[T], Awaitable[R]] = fn
+        self.get_slug: Callable[[T], Optional[str]] = get_slug
+        self.maximum_concurrent_tasks: int = maximum_concurrent_tasks
+        self.max_concurrent_tasks_per_slug: int = max(
+            max_concurrent_tasks_per_slug
+            or int(maximum_concurrent_tasks * DEFAULT_SLUG_CONCURRENCY_FRACTION),
+            1,
+        )
+        self.slug_concurrency_limits: Dict[str, int] = slug_concurrency_limits or {}
+        self.is_default_slug_limit: bool = max_concurrent_tasks_per_slug is None
+
+    @classmethod
+    def from_parameters(
+        cls,
+        *,
+        fn: Callable[[T], Awaitable[R]],
+        get_slug: Callable[[T], Optional[str]],
+        pandas_udf_parameters: AsyncPandasUdfParameters,
+        max_concurrent_tasks_per_slug: Optional[int] = None,
+    ) -> "SlugWorkScheduler[T, R]":
+        """
+        Creates a scheduler with the concurrency of the pandas udf
+
+        :param fn: function to run on each row
+        :param get_slug: returns the slug of a row
+        :param pandas_udf_parameters: parameters of the pandas udf
+        :param max_concurrent_tasks_per_slug: maximum rows of one slug processed at the same time
+        """
+        return cls(
+            fn=fn,
+            get_slug=get_slug,
+            maximum_concurrent_tasks=pandas_udf_parameters.maximum_concurrent_tasks,
+            max_concurrent_tasks_per_slug=max_concurrent_tasks_per_slug,
+        )
+
+    def has_hard_limit(self, slug: Optional[str]) -> bool:
+        """
+        Returns whether the limit of the slug was passed and so is never exceeded
+
+        :param slug: slug
+        """
+        return not self.is_default_slug_limit or (
+            slug is not None and slug in self.slug_concurrency_limits
+        )
+
+    def get_slug_limit(self, slug: Optional[str]) -> int:
+        """
+        Returns the maximum rows of the slug processed at the same time
+
+        :param slug: slug
+        """
+        if slug is not None and slug in self.slug_concurrency_limits:
+            return max(self.slug_concurrency_limits[slug], 1)
+        return self.max_concurrent_tasks_per_slug
+
+    async def run_async(self, rows: Iterable[T]) -> AsyncGenerator[R, None]:
+        """
+        Runs fn on the rows and yields the results in the order they complete.  If fn raises, the running
+        tasks are cancelled and the exception is raised.  Use AsyncHelper.collect_async_data() to group the
+        results into chunks of max_chunk_size.
+
+        :param rows: rows to process
+        """
+        queues: Dict[Optional[str], Deque[T]] = {}
+        for row in rows:
+            queues.setdefault(self.get_slug(row), deque()).append(row)
+        # slugs with rows waiting, in round robin order
+        waiting_slugs: Deque[Optional[str]] = deque(queues.keys())
+        running_per_slug: Dict[Optional[str], int] = {slug: 0 for slug in queues}
+        slot_freed: asyncio.Event = asyncio.Event()
+
+        def get_next_slug() -> Optional[str]:
+            # the next slug (round robin) that is under its limit
+            for _ in range(len(waiting_slugs)):
+                slug: Optional[str] = waiting_slugs[0]
+                waiting_slugs.rotate(-1)
+                if running_per_slug[slug] < self.get_slug_limit(slug):
+                    return slug
+            # every waiting slug is at its limit so the free slot would sit idle: give it to the next slug
+            # that only has the default limit
+            for _ in range(len(waiting_slugs)):
+                slug = waiting_slugs[0]
+                waiting_slugs.rotate(-1)
+                if not self.has_hard_limit(slug):
+                    return slug
+            return None
+
+        async def get_rows() -> AsyncGenerator[Tuple[Optional[str], T], None]:
+            # only read by map_concurrent when a slot is free so each free slot goes to the next slug
+            while waiting_slugs:
+                slug: Optional[str] = get_next_slug()
+                if slug is None:
+                    # every waiting slug is at a limit that was passed: wait for one of its rows to finish
+                    slot_freed.clear()
+                    await slot_freed.wait()
+                    continue
+                queue: Deque[T] = queues[slug]
+                row: T = queue.popleft()
+                if not queue:
+                    # the slug was rotated to the end so it is the last one
+                    waiting_slugs.pop()
+                running_per_slug[slug] += 1
+                yield slug, row
+
+        async def run_row(slug_row: Tuple[Optional[str], T]) -> R:
+            slug, row = slug_row
+            try:
+                return await self.fn(row)
+            finally:
+                running_per_slug[slug] -= 1
+                slot_freed.set()
+
+        async with aclosing(
+            AsyncHelper.map_concurrent(
+                fn=run_row, iterable=get_rows(), limit=self.maximum_concurrent_tasks
+            )
+        ) as results:
+            async for result in results:
+                yield result
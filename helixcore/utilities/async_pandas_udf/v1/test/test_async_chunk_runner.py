@@ -0,0 +1,89 @@
+import asyncio
+from typing import AsyncGenerator, List
+
+import pytest
+
+from helixcore.utilities.async_pandas_udf.v1.async_chunk_runner import (
+    AsyncChunkRunner,
+)
+from helixcore.utilities.async_pandas_udf.v1.async_pandas_udf_parameters import (
+    AsyncPandasUdfParameters,
+)
+
+
+async def test_chunks_run_in_parallel_and_keep_order() -> None:
+    running: List[int] = [0, 0]
+
+    async def fn(chunk: List[int], chunk_index: int) -> int:
+        running[0] += 1
+        running[1] = max(running[1], running[0])
+        # later chunks finish first
+        await asyncio.sleep(0.01 * (5 - chunk_index))
+        running[0] -= 1
+        return sum(chunk)
+
+    runner: AsyncChunkRunner[int, int] = AsyncChunkRunner(
+        fn=fn,
+        parameters=AsyncPandasUdfParameters(
+            max_chunk_size=2,
+            process_chunks_in_parallel=True,
+            maximum_concurrent_tasks=3,
+        ),
+    )
+    results = [r async for r in runner.run_async(range(9))]
+    assert [r.chunk_index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.row_count for r in results] == [2, 2, 2, 2, 1]
+    assert [r.result for r in results] == [1, 5, 9, 13, 8]
+    assert all(r.duration_seconds > 0 for r in results)
+    assert running[1] == 3
+
+    runner.preserve_order = False
+    unordered = [r.chunk_index async for r in runner.run_async(range(9))]
+    assert unordered != [0, 1, 2, 3, 4]
+    assert sorted(unordered) == [0, 1, 2, 3, 4]
+
+
+async def test_chunks_run_sequentially_by_default() -> None:
+    running: List[int] = [0, 0]
+
+    async def fn(chunk: List[int], chunk_index: int) -> List[int]:
+        running[0] += 1
+        running[1] = max(running[1], running[0])
+        await asyncio.sleep(0)
+        running[0] -= 1
+        return chunk
+
+    async def rows() -> AsyncGenerator[int, None]:
+        for i in range(5):
+            yield i
+
+    runner: AsyncChunkRunner[int, List[int]] = AsyncChunkRunner(
+        fn=fn, parameters=AsyncPandasUdfParameters(max_chunk_size=2)
+    )
+    assert await runner.run_and_collect_async(rows()) == [[0, 1], [2, 3], [4]]
+    assert running[1] == 1
+
+
+async def test_chunk_timeout_cancels_running_chunks() -> None:
+    cancelled: List[int] = []
+
+    async def fn(chunk: List[int], chunk_index: int) -> int:
+        try:
+            await asyncio.sleep(1 if chunk_index == 1 else 0.5)
+        except asyncio.CancelledError:
+            cancelled.append(chunk_index)
+            raise
+        return chunk_index
+
+    runner: AsyncChunkRunner[int, int] = AsyncChunkRunner(
+        fn=fn,
+        parameters=AsyncPandasUdfParameters(
+            max_chunk_size=1,
+            process_chunks_in_parallel=True,
+            maximum_concurrent_tasks=3,
+        ),
+        chunk_timeout=0.05,
+    )
+    with pytest.raises(TimeoutError, match="Chunk 0"):
+        await runner.run_and_collect_async(range(10))
+    assert sorted(cancelled) == [0, 1, 2]
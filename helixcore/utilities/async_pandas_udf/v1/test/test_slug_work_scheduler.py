@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import pytest
+
+from helixcore.utilities.async_helper.v1.async_helper import AsyncHelper
+from helixcore.utilities.async_pandas_udf.v1.async_pandas_udf_parameters import (
+    AsyncPandasUdfParameters,
+)
+from helixcore.utilities.async_pandas_udf.v1.slug_work_scheduler import (
+    SlugWorkScheduler,
+)
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# slug -> (number of rows, mean latency in seconds) of the simulated source systems
+SIMULATED_SLUGS: Dict[str, Tuple[int, float]] = {
+    "slow_ehr": (20, 0.05),
+    "epic": (120, 0.002),
+    "cerner": (60, 0.003),
+}
+
+
+def get_rows() -> List[Tuple[str, float]]:
+    rng = random.Random(42)
+    rows: List[Tuple[str, float]] = [
+        (slug, rng.expovariate(1 / latency))
+        for slug, (count, latency) in SIMULATED_SLUGS.items()
+        for _ in range(count)
+    ]
+    rng.shuffle(rows)
+    return rows
+
+
+async def test_slug_limits() -> None:
+    running: Dict[str, int] = defaultdict(int)
+    max_running: Dict[str, int] = defaultdict(int)
+    total_running: List[int] = [0, 0]
+
+    async def fn(row: Tuple[str, float]) -> str:
+        slug, latency = row
+        running[slug] += 1
+        total_running[0] += 1
+        max_running[slug] = max(max_running[slug], running[slug])
+        total_running[1] = max(total_running[1], total_running[0])
+        await asyncio.sleep(latency / 10)
+        running[slug] -= 1
+        total_running[0] -= 1
+        return slug
+
+    rows = get_rows()
+    scheduler: SlugWorkScheduler[Tuple[str, float], str] = SlugWorkScheduler(
+        fn=fn,
+        get_slug=lambda row: row[0],
+        maximum_concurrent_tasks=8,
+        max_concurrent_tasks_per_slug=4,
+        slug_concurrency_limits={"slow_ehr": 2},
+    )
+    results = [r async for r in scheduler.run_async(rows)]
+    assert sorted(results) == sorted(slug for slug, _ in rows)
+    assert total_running[1] == 8
+    assert max_running["slow_ehr"] == 2
+    assert max_running["epic"] == 4
+
+
+async def test_exception_cancels_running_tasks() -> None:
+    cancelled: List[int] = []
+
+    async def fn(row: int) -> int:
+        if row == 3:
+            raise ValueError("failed")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(row)
+            raise
+        return row
+
+    scheduler: SlugWorkScheduler[int, int] = SlugWorkScheduler.from_parameters(
+        fn=fn,
+        get_slug=lambda row: str(row % 2),
+        pandas_udf_parameters=AsyncPandasUdfParameters(maximum_concurrent_tasks=4),
+    )
+    with pytest.raises(ValueError):
+        async for _ in scheduler.run_async(range(10)):
+            pass
+    assert len(cancelled) == 3
+
+
+async def test_single_slug_uses_all_slots() -> None:
+    running: List[int] = [0, 0]
+
+    async def fn(row: int) -> int:
+        running[0] += 1
+        running[1] = max(running[1], running[0])
+        await asyncio.sleep(0.001)
+        running[0] -= 1
+        return row
+
+    scheduler: SlugWorkScheduler[int, int] = SlugWorkScheduler(
+        fn=fn, get_slug=lambda row: "epic", maximum_concurrent_tasks=8
+    )
+    assert sorted([r async for r in scheduler.run_async(range(40))]) == list(range(40))
+    # the default per slug limit does not apply when no other slug has rows waiting
+    assert running[1] == 8
+
+
+async def test_slow_slug_does_not_block_fast_slugs() -> None:
+    """
+    With fixed size chunks every chunk waits for its slowest row.  Here the slow slug's rows do not finish
+    until every fast row has finished, which only works if the fast rows keep getting the free slots.
+    """
+    rows: List[Tuple[str, int]] = [("slow_ehr", i) for i in range(6)] + [
+        ("epic", i) for i in range(20)
+    ]
+    random.Random(42).shuffle(rows)
+    release_slow_rows = asyncio.Event()
+    slow_running: List[int] = [0]
+    # slow rows running at the same time while fast rows were still waiting to start
+    slow_running_while_fast_waiting: List[int] = [0]
+    fast_started: List[int] = [0]
+
+    async def fn(row: Tuple[str, int]) -> str:
+        slug, _ = row
+        if slug == "epic":
+            fast_started[0] += 1
+            await asyncio.sleep(0)
+            return slug
+        slow_running[0] += 1
+        if fast_started[0] < 20:
+            slow_running_while_fast_waiting[0] = max(
+                slow_running_while_fast_waiting[0], slow_running[0]
+            )
+        await release_slow_rows.wait()
+        slow_running[0] -= 1
+        return slug
+
+    scheduler: SlugWorkScheduler[Tuple[str, int], str] = SlugWorkScheduler(
+        fn=fn, get_slug=lambda row: row[0], maximum_concurrent_tasks=4
+    )
+
+    async def run() -> List[str]:
+        results: List[str] = []
+        async for result in scheduler.run_async(rows):
+            results.append(result)
+            if results.count("epic") == 20:
+                release_slow_rows.set()
+        return results
+
+    results: List[str] = await asyncio.wait_for(run(), timeout=5)
+    assert results[:20] == ["epic"] * 20
+    assert sorted(results) == sorted(slug for slug, _ in rows)
+    # the slow slug was held at the default limit while fast rows were waiting
+    assert slow_running_while_fast_waiting[0] <= 2
+
+
+async def test_simulation_benchmark() -> None:
+    """
+    Compares fixed size chunks (each chunk waits for its slowest row) with the slug scheduler
+    on synthetic per slug latencies.  The timings are logged, not asserted
+    """
+    rows = get_rows()
+    maximum_concurrent_tasks: int = 10
+
+    async def fn(row: Tuple[str, float]) -> str:
+        await asyncio.sleep(row[1])
+        return row[0]
+
+    start = time.perf_counter()
+    fixed_chunk_results: List[str] = []
+    for i in range(0, len(rows), maximum_concurrent_tasks):
+        fixed_chunk_results.extend(
+            await asyncio.gather(
+                *[fn(row) for row in rows[i : i + maximum_concurrent_tasks]]
+            )
+        )
+    fixed_chunks = time.perf_counter() - start
+
+    scheduler: SlugWorkScheduler[Tuple[str, float], str] = SlugWorkScheduler(
+        fn=fn,
+        get_slug=lambda row: row[0],
+        maximum_concurrent_tasks=maximum_concurrent_tasks,
+    )
+    start = time.perf_counter()
+    chunks: List[List[str]] = [
+        chunk
+        async for chunk in AsyncHelper.collect_async_data(
+            async_gen=scheduler.run_async(rows), chunk_size=maximum_concurrent_tasks
+        )
+    ]
+    scheduled = time.perf_counter() - start
+
+    logger.info(
+        f"{len(rows)} rows: fixed chunks={fixed_chunks * 1000:.0f}ms slug scheduler={scheduled * 1000:.0f}ms"
+    )
+    assert sorted(r for chunk in chunks for r in chunk) == sorted(fixed_chunk_results)
@@ -1,40 +1,242 @@
-import boto3
-from typing import Dict, Any
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from typing import Dict, Any, Optional, Tuple
+
+# how long the parameters read from SSM are cached
+SSM_CONFIG_CACHE_TTL_SECONDS: float = float(
+    os.environ.get("SSM_CONFIG_CACHE_TTL_SECONDS", "300")
+)
+
+
+@dataclass
+class SsmConfigCacheEntry:
+    parameters: Dict[str, Any]
+    """ parameter name to value """
+    loaded_at: float
+    """ time.monotonic() when the parameters were read from SSM """
+
+
+class SsmConfigCache:
+    """
+    Process wide cache of the parameters read from SSM keyed by (region, path, with decryption).
+    Only one thread reads a given path from SSM at a time; the other threads wait for it and
+    use its result.
+    """
+
+    _entries: Dict[Tuple[str, str, bool], SsmConfigCacheEntry] = {}
+    _key_locks: Dict[Tuple[str, str, bool], threading.Lock] = {}
+    _clients: Dict[Tuple[int, str], Any] = {}
+    _lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def get_client(region: str) -> Any:
+        """
+        Returns a cached SSM client for the region.  Clients are not shared across processes.
+
+        :param region: AWS region
+        """
+        cache_key: Tuple[int, str] = (os.getpid(), region)
+        client = SsmConfigCache._clients.get(cache_key)
+        if client is None:
+            with SsmConfigCache._lock:
+                client = SsmConfigCache._clients.get(cache_key)
+                if client is None:
+                    # boto3 takes a long time to import so only import it when a client is needed
+                    import boto3
+
+                    client = boto3.client("ssm", region_name=region)
+                    SsmConfigCache._clients[cache_key] = client
+        return client
+
+    @staticmethod
+    def get_parameters(
+        *,
+        path: str,
+        region: str,
+        with_decryption: bool = True,
+        ttl_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Returns the parameters under the path from the cache, reading them from SSM if they are
+        not cached or have expired.  The returned dict is shared so callers must not change it.
+
+        :param path: SSM path
+        :param region: AWS region
+        :param with_decryption: whether to decrypt SecureString parameters
+        :param ttl_seconds: maximum age of the cached parameters.  Default is SSM_CONFIG_CACHE_TTL_SECONDS
+        """
+        cache_key: Tuple[str, str, bool] = (region, path, with_decryption)
+        requested_at: float = time.monotonic()
+        cached_parameters: Optional[Dict[str, Any]] = (
+            SsmConfigCache.get_cached_parameters(
+                path=path,
+                region=region,
+                with_decryption=with_decryption,
+                ttl_seconds=ttl_seconds,
+            )
+        )
+        if cached_parameters is not None:
+            return cached_parameters
+
+        with SsmConfigCache._lock:
+            key_lock: threading.Lock = SsmConfigCache._key_locks.setdefault(
+                cache_key, threading.Lock()
+            )
+        with key_lock:
+            # another thread may have read SSM while we were waiting
+            entry: Optional[SsmConfigCacheEntry] = SsmConfigCache._entries.get(
+                cache_key
+            )
+            if entry is not None and entry.loaded_at >= requested_at:
+                return entry.parameters
+            parameters: Dict[str, Any] = read_ssm_parameters(
+                path=path, region=region, with_decryption=with_decryption
+            )
+            SsmConfigCache._entries[cache_key] = SsmConfigCacheEntry(
+                parameters=parameters, loaded_at=time.monotonic()
+            )
+            return parameters
+
+    @staticmethod
+    def get_cached_parameters(
+        *,
+        path: str,
+        region: str,
+        with_decryption: bool = True,
+        ttl_seconds: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached parameters for the path or None if they are not cached or are older
+        than ttl_seconds
+        """
+        entry: Optional[SsmConfigCacheEntry] = SsmConfigCache._entries.get(
+            (region, path, with_decryption)
+        )
+        if entry is not None and time.monotonic() - entry.loaded_at < (
+            SSM_CONFIG_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        ):
+            return entry.parameters
+        return None
+
+    @staticmethod
+    def invalidate_parameter(name: str) -> None:
+        """
+        Removes the cached paths that contain the parameter e.g., after the parameter was changed
+
+        :param name: full name of the parameter
+        """
+        with SsmConfigCache._lock:
+            for cache_key in list(SsmConfigCache._entries.keys()):
+                if name.startswith(cache_key[1]):
+                    del SsmConfigCache._entries[cache_key]
+
+    @staticmethod
+    def invalidate(path: Optional[str] = None) -> None:
+        """
+        Removes the cached parameters for the path (or all paths) so the next call reads SSM
+
+        :param path: optional SSM path.  If not passed then the whole cache is cleared
+        """
+        with SsmConfigCache._lock:
+            for cache_key in list(SsmConfigCache._entries.keys()):
+                if path is None or cache_key[1] == path:
+                    del SsmConfigCache._entries[cache_key]
+
+    @staticmethod
+    def clear() -> None:
+        """
+        Clears the cached parameters and clients e.g., after credentials have changed
+        """
+        with SsmConfigCache._lock:
+            SsmConfigCache._entries.clear()
+            SsmConfigCache._clients.clear()
+
+
+def read_ssm_parameters(
+    *, path: str, region: str, with_decryption: bool = True
+) -> Dict[str, Any]:
+    """
+    Reads all the parameters under the path from SSM (no caching)
+
+    :return: parameter name to value
+    """
+    ssm = SsmConfigCache.get_client(region)
+    params: Dict[str, Any] = {}
+    args: Dict[str, Any] = {
+        "Path": path,
+        "Recursive": True,
+        "WithDecryption": with_decryption,
+    }
+    for page in ssm.get_paginator("get_parameters_by_path").paginate(**args):
+        for param in page.get("Parameters", []):
+            params[param["Name"]] = param["Value"]
+    return params
 
 
 def get_ssm_config(
     path: str = "/prod/databelt/",
     region: str = "us-east-1",
     truncate_keys: bool = False,
+    use_cache: bool = True,
+    ttl_seconds: Optional[float] = None,
 ) -> Dict[str, Any]:
-    ssm = boto3.client("ssm", region_name=region)
-    param_list = []
-    next_token = None
-    done = False
-    path_len = len(path)
-    while not done:
-        args = {
-            "Path": path,
-            "Recursive": True,
-            "WithDecryption": True,
-        }
-        if next_token:
-            args["NextToken"] = next_token
-        param_response = ssm.get_parameters_by_path(**args)
-        param_list.extend(param_response.get("Parameters", []))
-        next_token = param_response.get("NextToken", None)
-        if not next_token:
-            done = True
-
-    params = {}
-    for param in param_list:
-        if truncate_keys:
-            key = param["Name"][path_len:]
-        else:
-            key = param["Name"]
-        params[key] = param["Value"]
+    """
+    Returns the parameters under the path in SSM.  The parameters are cached (see SsmConfigCache).
 
-    return params
+    :param path: SSM path
+    :param region: AWS region
+    :param truncate_keys: whether to remove the path from the parameter names
+    :param use_cache: set to False to always read from SSM
+    :param ttl_seconds: maximum age of the cached parameters.  Default is SSM_CONFIG_CACHE_TTL_SECONDS
+    :return: parameter name to value.  This is a new dict that the caller can change.
+    """
+    parameters: Dict[str, Any] = (
+        SsmConfigCache.get_parameters(path=path, region=region, ttl_seconds=ttl_seconds)
+        if use_cache
+        else read_ssm_parameters(path=path, region=region)
+    )
+    if truncate_keys:
+        path_len = len(path)
+        return {key[path_len:]: value for key, value in parameters.items()}
+    return dict(parameters)
+
+
+async def get_ssm_config_async(
+    path: str = "/prod/databelt/",
+    region: str = "us-east-1",
+    truncate_keys: bool = False,
+    use_cache: bool = True,
+    ttl_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Async version of get_ssm_config().  SSM is only called (in a thread) if the parameters are not
+    cached so cached lookups don't leave the event loop.
+    """
+    if (
+        use_cache
+        and SsmConfigCache.get_cached_parameters(
+            path=path, region=region, ttl_seconds=ttl_seconds
+        )
+        is not None
+    ):
+        return get_ssm_config(
+            path=path,
+            region=region,
+            truncate_keys=truncate_keys,
+            ttl_seconds=ttl_seconds,
+        )
+    return await asyncio.to_thread(
+        get_ssm_config,
+        path=path,
+        region=region,
+        truncate_keys=truncate_keys,
+        use_cache=use_cache,
+        ttl_seconds=ttl_seconds,
+    )
 
 
 def put_ssm_config(
@@ -49,6 +251,7 @@ def put_ssm_config(
     :return refer https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/ssm.html#SSM.Client.put_parameter
     doc for return type
     """
-    ssm = boto3.client("ssm", region_name=region)
+    ssm = SsmConfigCache.get_client(region)
     response: Dict[str, Any] = ssm.put_parameter(**config_arguments)
+    SsmConfigCache.invalidate_parameter(config_arguments["Name"])
     return response
@@ -1,39 +1,82 @@
+from dataclasses import dataclass
 from typing import Optional, Dict
 
-import boto3
+
+@dataclass(frozen=True)
+class InstanceInfo:
+    """
+    The resources of an EC2 instance type
+    """
+
+    instance_type: str
+    memory_in_mib: int
+    vcpus: int
+
+    @property
+    def memory_in_gib(self) -> float:
+        return self.memory_in_mib / 1024
 
 
 class InstanceHelper:
-    # Cache dictionary to store instance type and memory size
+    # Cache dictionary to store instance type and its resources
+    instance_info_cache: Dict[str, Optional[InstanceInfo]] = {}
+    # Cache dictionary to store instance type and memory size e.g., "16.0g".  Kept for callers that clear
+    # or prime it; get_instance_memory() checks it before instance_info_cache
     instance_memory_cache: Dict[str, Optional[str]] = {}
 
     @staticmethod
-    def get_instance_memory(*, instance_type: str) -> Optional[str]:
+    def get_instance_info(*, instance_type: str) -> Optional[InstanceInfo]:
         """
-        Given an instance type, return the memory in bytes for that instance type.
+        Given an instance type, return the memory and vCPUs for that instance type.
 
 
-        :param instance_type: The instance type for which to get the memory information.
+        :param instance_type: The instance type for which to get the information.
         :type instance_type: str
         """
 
-        # Check if the memory for the instance type is already in the cache
-        if instance_type in InstanceHelper.instance_memory_cache:
-            return InstanceHelper.instance_memory_cache[instance_type]
+        # Check if the instance type is already in the cache
+        if instance_type in InstanceHelper.instance_info_cache:
+            return InstanceHelper.instance_info_cache[instance_type]
+
+        # boto3 is slow to import so only import it when needed
+        import boto3
 
         ec2 = boto3.client("ec2")
 
         # Call the describe_instance_types API
         response = ec2.describe_instance_types(InstanceTypes=[instance_type])
 
-        if not response["InstanceTypes"]:
-            return None
+        instance_info: Optional[InstanceInfo] = None
+        if response["InstanceTypes"]:
+            instance_type_info = response["InstanceTypes"][0]
+            instance_info = InstanceInfo(
+                instance_type=instance_type,
+                memory_in_mib=instance_type_info["MemoryInfo"]["SizeInMiB"],
+                vcpus=instance_type_info["VCpuInfo"]["DefaultVCpus"],
+            )
+
+        # Store the resources in the cache
+        InstanceHelper.instance_info_cache[instance_type] = instance_info
+        InstanceHelper.instance_memory_cache[instance_type] = (
+            f"{instance_info.memory_in_gib}g" if instance_info else None
+        )
 
-        # Extract memory information from the response
-        memory_info = response["InstanceTypes"][0]["MemoryInfo"]
-        memory_in_gib = memory_info["SizeInMiB"] / 1024  # Convert MiB to GiB
+        return instance_info
 
-        # Store the memory size in the cache
-        InstanceHelper.instance_memory_cache[instance_type] = memory_in_gib
+    @staticmethod
+    def get_instance_memory(*, instance_type: str) -> Optional[str]:
+        """
+        Given an instance type, return the memory in GiB for that instance type e.g., "16.0g".
 
-        return f"{memory_in_gib}g"
+
+        :param instance_type: The instance type for which to get the memory information.
+        :type instance_type: str
+        """
+        if instance_type in InstanceHelper.instance_memory_cache:
+            return InstanceHelper.instance_memory_cache[instance_type]
+        instance_info: Optional[InstanceInfo] = InstanceHelper.get_instance_info(
+            instance_type=instance_type
+        )
+        if instance_info is None:
+            return None
+        return f"{instance_info.memory_in_gib}g"
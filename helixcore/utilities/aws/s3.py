@@ -1,6 +1,22 @@
-import boto3
+import asyncio
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+
 import re
-from typing import Any, Dict, List, Optional, Tuple, Match, Pattern
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Match,
+    Pattern,
+)
 
 # https://docs.aws.amazon.com/AmazonS3/latest/dev/BucketRestrictions.html gives a full list of restrictions for buckets
 # https://docs.aws.amazon.com/AmazonS3/latest/dev/UsingMetadata.html for keys
@@ -8,6 +24,14 @@ S3_URI_REGEX: Pattern[str] = re.compile(
     r"^s3a?://(?P<bucket>[a-z0-9][a-z0-9.\-]{1,61}[a-z0-9])/(?P<key>[a-zA-Z0-9!\-_.*,'()/&$@=;:+ ,?]+)$"
 )
 
+# size of each ranged GET when downloading an object
+S3_DOWNLOAD_PART_SIZE: int = 8 * 1024 * 1024
+# maximum number of ranged GETs (or sub-prefix listings) running at the same time
+S3_MAX_CONCURRENCY: int = 8
+
+_s3_clients: Dict[Tuple[int, Optional[str]], Any] = {}
+_s3_clients_lock: threading.Lock = threading.Lock()
+
 
 def parse_s3_uri(s3_uri: str) -> Tuple[Optional[str], Optional[str]]:
     m: Optional[Match[str]] = S3_URI_REGEX.match(s3_uri)
@@ -17,25 +41,281 @@ def parse_s3_uri(s3_uri: str) -> Tuple[Optional[str], Optional[str]]:
         return None, None
 
 
+def get_s3_client(region_name: Optional[str] = None) -> Any:
+    """
+    Returns a cached S3 client.  boto3 clients are thread safe but not safe to share across
+    processes so the cache is per process.
+
+    :param region_name: optional region
+    """
+    cache_key: Tuple[int, Optional[str]] = (os.getpid(), region_name)
+    client = _s3_clients.get(cache_key)
+    if client is None:
+        with _s3_clients_lock:
+            client = _s3_clients.get(cache_key)
+            if client is None:
+                import boto3
+
+                client = boto3.client("s3", region_name=region_name)
+                _s3_clients[cache_key] = client
+    return client
+
+
+def clear_s3_client_cache() -> None:
+    """
+    Clears the cached S3 clients e.g., after credentials have changed
+    """
+    with _s3_clients_lock:
+        _s3_clients.clear()
+
+
+def iterate_s3_directory_contents(
+    bucket: str,
+    prefix: str,
+    page_size: Optional[int] = None,
+    client: Optional[Any] = None,
+) -> Iterator[str]:
+    """
+    Yields the keys of the S3 objects in the given bucket with the given prefix, one page at a time
+    so the caller can start working before the whole listing is done.
+
+    :param bucket: S3 bucket
+    :param prefix: prefix of the objects
+    :param page_size: optional number of keys to request per page (max 1000)
+    :param client: optional S3 client.  Default is the cached client
+    """
+    client = client or get_s3_client()
+    kwargs: Dict[str, Any] = {"Bucket": bucket, "Prefix": prefix}
+    if page_size:
+        kwargs["PaginationConfig"] = {"PageSize": page_size}
+    for page in client.get_paginator("list_objects_v2").paginate(**kwargs):
+        # empty prefixes have no Contents
+        for item in page.get("Contents", []):
+            yield item["Key"]
+
+
 def get_s3_directory_contents(bucket: str, prefix: str) -> List[str]:
     """
     Returns all the S3 objects in the given bucket with the given prefix.
 
     Internally, just a light wrapper around list_objects_v2 that knows how to handle truncated responses.
     """
-    client = boto3.client("s3")
-    is_truncated: bool = True
-    keys: List[str] = []
-    kwargs: Dict[str, Optional[str]] = {
-        "Bucket": bucket,
-        "Prefix": prefix,
-    }
-    while is_truncated:
+    return list(iterate_s3_directory_contents(bucket=bucket, prefix=prefix))
+
+
+def iterate_s3_directory_contents_parallel(
+    bucket: str,
+    prefix: str,
+    delimiter: str = "/",
+    max_concurrency: int = S3_MAX_CONCURRENCY,
+    page_size: Optional[int] = None,
+    client: Optional[Any] = None,
+) -> Iterator[str]:
+    """
+    Yields the keys of the S3 objects under the prefix by listing the sub-prefixes (the "folders"
+    one level below the prefix) in parallel.  This is faster than iterate_s3_directory_contents()
+    for large exports that are spread across folders.
+    Keys directly under the prefix come first, then the keys of the sub-prefixes one page at a time in the
+    order the pages arrive.  The keys of each sub-prefix stay in order.
+    At most max_concurrency pages are requested or waiting to be yielded at the same time so memory is
+    bounded, and closing the generator early does not wait for the rest of the listing.
+
+    :param bucket: S3 bucket
+    :param prefix: prefix of the objects
+    :param delimiter: delimiter used to split the sub-prefixes
+    :param max_concurrency: maximum number of sub-prefixes listed at the same time
+    :param page_size: optional number of keys to request per page (max 1000)
+    :param client: optional S3 client.  Default is the cached client
+    """
+    assert (
+        max_concurrency > 0
+    ), f"max_concurrency should be > 0 but is {max_concurrency}"
+    client = client or get_s3_client()
+    sub_prefixes: List[str] = []
+    for page in client.get_paginator("list_objects_v2").paginate(
+        Bucket=bucket, Prefix=prefix, Delimiter=delimiter
+    ):
+        for item in page.get("Contents", []):
+            yield item["Key"]
+        sub_prefixes.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+
+    if not sub_prefixes:
+        return
+
+    def list_page(
+        sub_prefix: str, continuation_token: Optional[str]
+    ) -> Tuple[List[str], Optional[str]]:
+        kwargs: Dict[str, Any] = {"Bucket": bucket, "Prefix": sub_prefix}
+        if page_size:
+            kwargs["MaxKeys"] = page_size
+        if continuation_token:
+            kwargs["ContinuationToken"] = continuation_token
         response: Dict[str, Any] = client.list_objects_v2(**kwargs)
-        keys.extend([k["Key"] for k in response["Contents"]])
+        return (
+            [item["Key"] for item in response.get("Contents", [])],
+            (
+                response.get("NextContinuationToken")
+                if response.get("IsTruncated")
+                else None
+            ),
+        )
+
+    remaining_sub_prefixes: Iterator[str] = iter(sub_prefixes)
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_concurrency)
+    # sliding window: each sub-prefix has at most one page request at a time and the next page (or the
+    # next sub-prefix) is only requested once a page has been yielded
+    running: Dict["Future[Tuple[List[str], Optional[str]]]", str] = {}
+    try:
+        for sub_prefix in islice(remaining_sub_prefixes, max_concurrency):
+            running[executor.submit(list_page, sub_prefix, None)] = sub_prefix
+        while running:
+            done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                sub_prefix = running.pop(future)
+                keys, continuation_token = future.result()
+                yield from keys
+                if continuation_token:
+                    running[
+                        executor.submit(list_page, sub_prefix, continuation_token)
+                    ] = sub_prefix
+                else:
+                    next_sub_prefix: Optional[str] = next(remaining_sub_prefixes, None)
+                    if next_sub_prefix is not None:
+                        running[executor.submit(list_page, next_sub_prefix, None)] = (
+                            next_sub_prefix
+                        )
+    finally:
+        # don't wait for pages that are no longer needed
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def iterate_s3_directory_contents_async(
+    bucket: str,
+    prefix: str,
+    page_size: Optional[int] = None,
+    client: Optional[Any] = None,
+) -> AsyncIterator[str]:
+    """
+    Async version of iterate_s3_directory_contents().  Each page is fetched in a thread so the
+    event loop is not blocked.
+
+    :param bucket: S3 bucket
+    :param prefix: prefix of the objects
+    :param page_size: optional number of keys to request per page (max 1000)
+    :param client: optional S3 client.  Default is the cached client
+    """
+    client = client or get_s3_client()
+    kwargs: Dict[str, Any] = {"Bucket": bucket, "Prefix": prefix}
+    if page_size:
+        kwargs["MaxKeys"] = page_size
+    while True:
+        response: Dict[str, Any] = await asyncio.to_thread(
+            client.list_objects_v2, **kwargs
+        )
+        for item in response.get("Contents", []):
+            yield item["Key"]
+        if not response.get("IsTruncated"):
+            break
+        kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+
+def download_s3_object(
+    bucket: str,
+    key: str,
+    destination: Optional[str] = None,
+    part_size: int = S3_DOWNLOAD_PART_SIZE,
+    max_concurrency: int = S3_MAX_CONCURRENCY,
+    client: Optional[Any] = None,
+) -> Optional[bytearray]:
+    """
+    Downloads an S3 object using parallel ranged GETs.  If destination is passed then each part is
+    written to the file as it arrives, otherwise the contents are returned.  Every part is requested
+    with the ETag read at the start so an object overwritten during the download fails the download
+    instead of mixing versions.
+
+    :param bucket: S3 bucket
+    :param key: key of the object
+    :param destination: optional local file path to write to
+    :param part_size: size of each ranged GET
+    :param max_concurrency: maximum number of ranged GETs running at the same time
+    :param client: optional S3 client.  Default is the cached client
+    :return: contents if destination is not passed.  Returned as the buffer the parts were written to
+                so the object is not copied again
+    """
+    assert part_size > 0, f"part_size should be > 0 but is {part_size}"
+    client = client or get_s3_client()
+    head: Dict[str, Any] = client.head_object(Bucket=bucket, Key=key)
+    size: int = head["ContentLength"]
+    etag: str = head["ETag"]
+    ranges: List[Tuple[int, int]] = [
+        (start, min(start + part_size, size) - 1) for start in range(0, size, part_size)
+    ]
+
+    def get_part(byte_range: Tuple[int, int]) -> bytes:
+        response: Dict[str, Any] = client.get_object(
+            Bucket=bucket,
+            Key=key,
+            Range=f"bytes={byte_range[0]}-{byte_range[1]}",
+            IfMatch=etag,
+        )
+        part: bytes = response["Body"].read()
+        return part
+
+    if destination is None:
+        contents: bytearray = bytearray(size)
+
+        def read_part(byte_range: Tuple[int, int]) -> None:
+            contents[byte_range[0] : byte_range[1] + 1] = get_part(byte_range)
+
+        _run_parts(read_part, ranges, max_concurrency)
+        return contents
+
+    with open(destination, "wb") as file:
+        file.truncate(size)
+        file_lock: threading.Lock = threading.Lock()
+
+        def write_part(byte_range: Tuple[int, int]) -> None:
+            part: bytes = get_part(byte_range)
+            with file_lock:
+                file.seek(byte_range[0])
+                file.write(part)
+
+        _run_parts(write_part, ranges, max_concurrency)
+    return None
+
+
+async def download_s3_object_async(
+    bucket: str,
+    key: str,
+    destination: Optional[str] = None,
+    part_size: int = S3_DOWNLOAD_PART_SIZE,
+    max_concurrency: int = S3_MAX_CONCURRENCY,
+    client: Optional[Any] = None,
+) -> Optional[bytearray]:
+    """
+    Async version of download_s3_object().  The download runs in a thread so the event loop is
+    not blocked.
+    """
+    return await asyncio.to_thread(
+        download_s3_object,
+        bucket=bucket,
+        key=key,
+        destination=destination,
+        part_size=part_size,
+        max_concurrency=max_concurrency,
+        client=client,
+    )
 
-        is_truncated = response["IsTruncated"]
-        continuation_token: Optional[str] = response.get("NextContinuationToken")
-        kwargs["ContinuationToken"] = continuation_token
 
-    return keys
+def _run_parts(
+    fn: Callable[[Tuple[int, int]], None],
+    ranges: List[Tuple[int, int]],
+    max_concurrency: int,
+) -> None:
+    if len(ranges) <= 1 or max_concurrency <= 1:
+        for byte_range in ranges:
+            fn(byte_range)
+        return
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(ranges))) as executor:
+        # list() so the first error is raised
+        list(executor.map(fn, ranges))
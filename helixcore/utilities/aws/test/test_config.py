@@ -0,0 +1,108 @@
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from helixcore.utilities.aws import config
+from helixcore.utilities.aws.config import (
+    SsmConfigCache,
+    get_ssm_config,
+    get_ssm_config_async,
+    put_ssm_config,
+)
+
+
+def test_get_ssm_config_is_cached(ssm_mock: Any) -> None:
+    ssm_mock.put_parameter(Name="/dev/app/password", Value="one", Type="SecureString")
+    ssm_mock.put_parameter(Name="/dev/app/user", Value="me", Type="String")
+
+    assert get_ssm_config(path="/dev/app/") == {
+        "/dev/app/password": "one",
+        "/dev/app/user": "me",
+    }
+    # changed outside this process so the cached value is still returned
+    ssm_mock.put_parameter(
+        Name="/dev/app/password", Value="two", Type="SecureString", Overwrite=True
+    )
+    config_with_truncated_keys: Dict[str, Any] = get_ssm_config(
+        path="/dev/app/", truncate_keys=True
+    )
+    assert config_with_truncated_keys == {"password": "one", "user": "me"}
+    # callers can change the returned dict without changing the cache
+    config_with_truncated_keys.clear()
+    assert get_ssm_config(path="/dev/app/")["/dev/app/password"] == "one"
+
+    assert (
+        get_ssm_config(path="/dev/app/", use_cache=False)["/dev/app/password"] == "two"
+    )
+    SsmConfigCache.invalidate(path="/dev/app/")
+    assert get_ssm_config(path="/dev/app/")["/dev/app/password"] == "two"
+
+    # changes made through put_ssm_config() invalidate the cached path
+    put_ssm_config(
+        {
+            "Name": "/dev/app/password",
+            "Value": "three",
+            "Type": "SecureString",
+            "Overwrite": True,
+        }
+    )
+    assert get_ssm_config(path="/dev/app/")["/dev/app/password"] == "three"
+
+    # expired entries are read again
+    ssm_mock.put_parameter(
+        Name="/dev/app/user", Value="you", Type="String", Overwrite=True
+    )
+    assert get_ssm_config(path="/dev/app/", ttl_seconds=0)["/dev/app/user"] == "you"
+
+    assert get_ssm_config(path="/dev/missing/") == {}
+
+
+def test_get_ssm_config_single_flight(ssm_mock: Any, monkeypatch: MonkeyPatch) -> None:
+    calls: List[str] = []
+
+    def read_ssm_parameters(
+        *, path: str, region: str, with_decryption: bool = True
+    ) -> Dict[str, Any]:
+        calls.append(path)
+        time.sleep(0.1)
+        return {f"{path}key": "value"}
+
+    monkeypatch.setattr(config, "read_ssm_parameters", read_ssm_parameters)
+
+    results: List[Dict[str, Any]] = []
+    threads: List[threading.Thread] = [
+        threading.Thread(
+            target=lambda: results.append(get_ssm_config(path="/prod/app/"))
+        )
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["/prod/app/"]
+    assert results == [{"/prod/app/key": "value"}] * 10
+
+
+async def test_get_ssm_config_async(ssm_mock: Any) -> None:
+    ssm_mock.put_parameter(Name="/dev/async/password", Value="one", Type="String")
+    assert await get_ssm_config_async(path="/dev/async/", truncate_keys=True) == {
+        "password": "one"
+    }
+    ssm_mock.put_parameter(
+        Name="/dev/async/password", Value="two", Type="String", Overwrite=True
+    )
+    assert await get_ssm_config_async(path="/dev/async/") == {
+        "/dev/async/password": "one"
+    }
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_get_ssm_config_pages(ssm_mock: Any, use_cache: bool) -> None:
+    for i in range(25):
+        ssm_mock.put_parameter(Name=f"/dev/many/key{i}", Value=str(i), Type="String")
+    assert len(get_ssm_config(path="/dev/many/", use_cache=use_cache)) == 25
@@ -0,0 +1,161 @@
+from pathlib import Path
+from typing import Any, Iterator, List
+
+import pytest
+from botocore.exceptions import ClientError
+
+from helixcore.utilities.aws.s3 import (
+    clear_s3_client_cache,
+    download_s3_object,
+    download_s3_object_async,
+    get_s3_directory_contents,
+    iterate_s3_directory_contents,
+    iterate_s3_directory_contents_async,
+    iterate_s3_directory_contents_parallel,
+)
+
+
+def create_objects(s3_client: Any) -> List[str]:
+    clear_s3_client_cache()
+    s3_client.create_bucket(Bucket="bucket")
+    keys: List[str] = ["export/manifest.json"] + [
+        f"export/{folder}/{i:03}.ndjson" for folder in ["a", "b", "c"] for i in range(5)
+    ]
+    for key in keys:
+        s3_client.put_object(Bucket="bucket", Key=key, Body=key.encode("utf-8"))
+    return keys
+
+
+def test_iterate_s3_directory_contents(s3_mock: Any) -> None:
+    keys: List[str] = create_objects(s3_mock)
+    assert list(
+        iterate_s3_directory_contents(bucket="bucket", prefix="export/", page_size=4)
+    ) == sorted(keys)
+    assert get_s3_directory_contents(bucket="bucket", prefix="export/b/") == [
+        f"export/b/{i:03}.ndjson" for i in range(5)
+    ]
+    # empty prefix
+    assert get_s3_directory_contents(bucket="bucket", prefix="missing/") == []
+
+
+class CountingS3Client:
+    def __init__(self, client: Any) -> None:
+        self.client: Any = client
+        self.list_calls: int = 0
+
+    def list_objects_v2(self, **kwargs: Any) -> Any:
+        self.list_calls += 1
+        return self.client.list_objects_v2(**kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+def test_iterate_s3_directory_contents_parallel(s3_mock: Any) -> None:
+    keys: List[str] = create_objects(s3_mock)
+    result: List[str] = list(
+        iterate_s3_directory_contents_parallel(
+            bucket="bucket", prefix="export/", max_concurrency=2, page_size=2
+        )
+    )
+    assert sorted(result) == sorted(keys)
+    assert result[0] == "export/manifest.json"
+    for folder in ["a", "b", "c"]:
+        # the keys of each sub-prefix stay in order
+        assert [key for key in result if key.startswith(f"export/{folder}/")] == [
+            f"export/{folder}/{i:03}.ndjson" for i in range(5)
+        ]
+    assert (
+        list(iterate_s3_directory_contents_parallel(bucket="bucket", prefix="none/"))
+        == []
+    )
+
+
+def test_iterate_s3_directory_contents_parallel_close_early(s3_mock: Any) -> None:
+    create_objects(s3_mock)
+    client: CountingS3Client = CountingS3Client(s3_mock)
+    keys: Iterator[str] = iterate_s3_directory_contents_parallel(
+        bucket="bucket", prefix="export/", max_concurrency=1, page_size=1, client=client
+    )
+    assert [next(keys), next(keys)] == ["export/manifest.json", "export/a/000.ndjson"]
+    keys.close()  # type: ignore[attr-defined]
+    # pages are only requested as they are consumed: 15 pages would be needed for the whole listing
+    assert client.list_calls <= 2
+
+
+async def test_iterate_s3_directory_contents_async(s3_mock: Any) -> None:
+    keys: List[str] = create_objects(s3_mock)
+    result: List[str] = [
+        key
+        async for key in iterate_s3_directory_contents_async(
+            bucket="bucket", prefix="export/", page_size=3
+        )
+    ]
+    assert result == sorted(keys)
+
+
+async def test_download_s3_object(s3_mock: Any, tmp_path: Path) -> None:
+    clear_s3_client_cache()
+    s3_mock.create_bucket(Bucket="bucket")
+    contents: bytes = bytes(range(256)) * 41  # not a multiple of the part size
+    s3_mock.put_object(Bucket="bucket", Key="file.bin", Body=contents)
+    s3_mock.put_object(Bucket="bucket", Key="empty.bin", Body=b"")
+
+    downloaded = download_s3_object(
+        bucket="bucket", key="file.bin", part_size=1000, max_concurrency=3
+    )
+    # the buffer the parts were written to is returned without copying it
+    assert isinstance(downloaded, bytearray)
+    assert downloaded == bytearray(contents)
+    destination: Path = tmp_path / "file.bin"
+    assert (
+        download_s3_object(
+            bucket="bucket",
+            key="file.bin",
+            destination=str(destination),
+            part_size=999,
+        )
+        is None
+    )
+    assert destination.read_bytes() == contents
+    assert await download_s3_object_async(
+        bucket="bucket", key="file.bin", part_size=4096
+    ) == bytearray(contents)
+    assert download_s3_object(bucket="bucket", key="empty.bin") == bytearray()
+
+
+class OverwritingS3Client:
+    """
+    Overwrites the object after the first part is downloaded
+    """
+
+    def __init__(self, client: Any) -> None:
+        self.client: Any = client
+        self.parts: int = 0
+
+    def head_object(self, **kwargs: Any) -> Any:
+        return self.client.head_object(**kwargs)
+
+    def get_object(self, **kwargs: Any) -> Any:
+        self.parts += 1
+        if self.parts == 2:
+            self.client.put_object(
+                Bucket=kwargs["Bucket"], Key=kwargs["Key"], Body=b"x" * 3000
+            )
+        return self.client.get_object(**kwargs)
+
+
+def test_download_s3_object_overwritten(s3_mock: Any) -> None:
+    clear_s3_client_cache()
+    s3_mock.create_bucket(Bucket="bucket")
+    s3_mock.put_object(Bucket="bucket", Key="file.bin", Body=bytes(range(256)) * 10)
+
+    with pytest.raises(ClientError) as e:
+        download_s3_object(
+            bucket="bucket",
+            key="file.bin",
+            part_size=1000,
+            max_concurrency=1,
+            client=OverwritingS3Client(s3_mock),
+        )
+    assert e.value.response["Error"]["Code"] == "PreconditionFailed"
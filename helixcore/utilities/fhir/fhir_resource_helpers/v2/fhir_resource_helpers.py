@@ -2,21 +2,57 @@ import json
 import uuid
 import re
 from collections import OrderedDict
-from typing import Dict, Any, Optional, List, cast
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, cast, Tuple, TYPE_CHECKING
 from urllib.parse import urlparse
 from uuid import UUID
 
-from fhir.resources.R4B.binary import Binary
-from fhir.resources.R4B.domainresource import DomainResource
-from fhir.resources.R4B.fhirtypes import Id
-from fhir.resources.R4B.identifier import Identifier
-from fhir.resources.R4B.resource import Resource
-
+from helixcore.utilities.fhir.fhir_resource_helpers.v2.fhir_resource_types import (
+    FHIR_RESOURCE_TYPES,
+)
 from helixcore.utilities.fhir.fhir_resource_helpers.v2.types import (
     FhirReceivedResourceType,
 )
+from helixcore.utilities.json_helpers import clean_empty_elements
 from helixcore.utilities.json_serializer.json_serializer import EnhancedJSONEncoder
 
+if TYPE_CHECKING:
+    # fhir.resources is slow to import so it is only imported when a model is actually passed
+    from fhir.resources.R4B.resource import Resource
+
+INVALID_TEXT_CHARACTERS_REGEX: re.Pattern[str] = re.compile(r"[^\w\r\n\t _.,!\"'/$-]")
+# noinspection RegExpRedundantEscape
+INVALID_ID_CHARACTERS_REGEX: re.Pattern[str] = re.compile(r"[^A-Za-z0-9\-\.]")
+INVALID_STRING_CHARACTERS_REGEX: re.Pattern[str] = re.compile(r"[^ \r\n\t\S]")
+INVALID_REFERENCE_ID_CHARACTERS_REGEX: re.Pattern[str] = re.compile(r"[^A-Za-z0-9\-.|]")
+PHONE_NUMBER_REGEX: re.Pattern[str] = re.compile(
+    r"^\+?1?[-.\s]?(\(\d{3}\)|\d{3})[-.\s]?\d{3}[-.\s]?\d{4}$"
+)
+NON_DIGIT_REGEX: re.Pattern[str] = re.compile(r"\D")
+
+# patterns for references.  See https://hl7.org/fhir/R4/references.html#literal
+# The resource types are not part of these patterns but looked up in FHIR_RESOURCE_TYPES
+ABSOLUTE_URL_PREFIX_REGEX: re.Pattern[str] = re.compile(
+    r"(http|https):\/\/[A-Za-z0-9\-\_\\\.\:\%\$\/]*"
+)
+RESOURCE_TYPE_AND_ID_START_REGEX: re.Pattern[str] = re.compile(
+    r"([A-Za-z]+)\/[A-Za-z0-9\-\.|]"
+)
+RESOURCE_TYPE_CANDIDATE_REGEX: re.Pattern[str] = re.compile(r"[A-Z][A-Za-z]+(?=\/)")
+RESOURCE_TYPE_CANDIDATE_WITH_ID_REGEX: re.Pattern[str] = re.compile(
+    r"[A-Z][A-Za-z]+(?=\/[A-Za-z0-9\-\.|])"
+)
+RESOURCE_ID_AND_HISTORY_REGEX: re.Pattern[str] = re.compile(
+    r"[A-Za-z0-9\-\.|]+(\/_history\/[A-Za-z0-9\-\.]{1,64})?"
+)
+SANITIZE_REFERENCE_CACHE_SIZE: int = 16 * 1024
+
+# a uuid in its canonical (lowercase, hyphenated) form with RFC 4122 variant and version 1 to 5
+UUID_VERSION_1_TO_5_REGEX: re.Pattern[str] = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}"
+)
+UUID5_CACHE_SIZE: int = 64 * 1024
+
 
 class FhirResourceHelpers:
     @staticmethod
@@ -24,6 +60,8 @@ class FhirResourceHelpers:
         """
         These settings are for fhir.resources package
         """
+        from fhir.resources.R4B.fhirtypes import Id
+
         regex = re.compile(
             r"^[A-Za-z0-9\-_.]+$"
         )  # allow _ since some resources in our fhir server have that
@@ -65,82 +103,98 @@ class FhirResourceHelpers:
         Valid UUID versions include 1, 2, 3, 4, 5
 
         """
-        valid_uuid_versions = [1, 2, 3, 4, 5]
-        for version in valid_uuid_versions:
-            if FhirResourceHelpers.is_valid_uuid(id_, version=version):
-                return id_
+        # same as is_valid_uuid() for versions 1-5 but with one regex instead of parsing five times
+        if UUID_VERSION_1_TO_5_REGEX.fullmatch(id_):
+            return id_
+        return FhirResourceHelpers._generate_uuid5_for_id_and_slug(id_, slug)
+
+    @staticmethod
+    @lru_cache(maxsize=UUID5_CACHE_SIZE)
+    def _generate_uuid5_for_id_and_slug(id_: str, slug: str) -> str:
         return str(uuid.uuid5(uuid.NAMESPACE_OID, f"{id_}|{slug}"))
 
     @staticmethod
-    def get_uuid_from_resource(*, resource: Dict[str, Any] | Resource) -> Optional[str]:
+    def get_uuid_from_resource(
+        *, resource: "Dict[str, Any] | Resource"
+    ) -> Optional[str]:
         """
         Reads the uuid field from identifier in the resource
 
         :param resource: the resource to read the uuid from
         :return: the uuid or None if not found
         """
+        if isinstance(resource, dict):
+            identifiers: Optional[List[Dict[str, Any]]] = cast(
+                Optional[List[Dict[str, Any]]], resource.get("identifier")
+            )
+            if not identifiers:
+                return None
+            for identifier in identifiers:
+                if identifier.get("system") == "https://www.icanbwell.com/uuid":
+                    return cast(Optional[str], identifier.get("value"))
+            return None
+
+        from fhir.resources.R4B.binary import Binary
+        from fhir.resources.R4B.domainresource import DomainResource
+        from fhir.resources.R4B.identifier import Identifier
+
         if isinstance(resource, Binary):
             return (
                 resource.id
                 if FhirResourceHelpers.is_valid_uuid(resource.id, 5)
                 else None
             )
-        elif isinstance(resource, Resource):
-            assert isinstance(
-                resource, DomainResource
-            ), f"{resource} is not a DomainResource"
-            resource1: DomainResource = resource
-            assert hasattr(resource1, "identifier")
-            # noinspection PyUnresolvedReferences
-            identifiers1: List[Identifier] = cast(
-                List[Identifier], resource1.identifier
-            )
-            if not identifiers1 or len(identifiers1) == 0:
-                return None
-            uuid_identifiers1: List[Identifier] = [
-                i for i in identifiers1 if i.system == "https://www.icanbwell.com/uuid"
-            ]
-            if not uuid_identifiers1 or len(uuid_identifiers1) == 0:
-                return None
-            return uuid_identifiers1[0].value
-        else:
-            identifiers: Optional[List[Dict[str, Any]]] = cast(
-                Optional[List[Dict[str, Any]]], resource.get("identifier")
-            )
-            if not identifiers or len(identifiers) == 0:
-                return None
-            uuid_identifiers = [
-                i
-                for i in identifiers
-                if i.get("system") == "https://www.icanbwell.com/uuid"
-            ]
-            if not uuid_identifiers or len(uuid_identifiers) == 0:
-                return None
-            return uuid_identifiers[0].get("value")
+        assert isinstance(
+            resource, DomainResource
+        ), f"{resource} is not a DomainResource"
+        assert hasattr(resource, "identifier")
+        # noinspection PyUnresolvedReferences
+        identifiers1: Optional[List[Identifier]] = cast(
+            Optional[List[Identifier]], resource.identifier
+        )
+        if not identifiers1:
+            return None
+        for identifier1 in identifiers1:
+            if identifier1.system == "https://www.icanbwell.com/uuid":
+                return cast(Optional[str], identifier1.value)
+        return None
 
     @staticmethod
     def get_owner_from_resource(
-        *, resource: Dict[str, Any] | Resource
+        *, resource: "Dict[str, Any] | Resource"
     ) -> Optional[str]:
         """
         reads owner tag from meta security
 
         """
-        if isinstance(resource, Resource):
-            assert isinstance(resource, DomainResource) or isinstance(
-                resource, Binary
-            ), f"{resource} is not Binary or a DomainResource"
-            resource = resource.dict()
-
-        assert isinstance(resource, dict)
-        security_tags = resource.get("meta", {}).get("security", [])
-        owner_tags = [
-            i
-            for i in security_tags
-            if i.get("system") == "https://www.icanbwell.com/owner"
-        ]
+        if isinstance(resource, dict):
+            meta_dict: Optional[Dict[str, Any]] = resource.get("meta")
+            security_tags: Optional[List[Dict[str, Any]]] = (
+                meta_dict.get("security") if meta_dict else None
+            )
+            if not security_tags:
+                return None
+            for security_tag_dict in security_tags:
+                if security_tag_dict.get("system") == "https://www.icanbwell.com/owner":
+                    return cast(Optional[str], security_tag_dict.get("code"))
+            return None
 
-        return owner_tags[0].get("code") if owner_tags else None
+        from fhir.resources.R4B.binary import Binary
+        from fhir.resources.R4B.coding import Coding
+        from fhir.resources.R4B.domainresource import DomainResource
+        from fhir.resources.R4B.meta import Meta
+
+        assert isinstance(resource, DomainResource) or isinstance(
+            resource, Binary
+        ), f"{resource} is not Binary or a DomainResource"
+        # read the model directly instead of converting the whole resource with dict()
+        meta: Optional[Meta] = cast(Optional[Meta], resource.meta)
+        if meta is None or not meta.security:
+            return None
+        for security_tag in cast(List[Coding], meta.security):
+            if security_tag.system == "https://www.icanbwell.com/owner":
+                return cast(Optional[str], security_tag.code)
+        return None
 
     @staticmethod
     def get_uuid_or_id_from_resource(*, resource: Dict[str, Any]) -> Optional[str]:
@@ -190,13 +244,32 @@ class FhirResourceHelpers:
         return resource
 
     @staticmethod
-    def fhir_add_uuid_if_missing(*, resource: Resource) -> Resource:
+    def add_uuid_if_missing_batch(
+        *, resources: List[FhirReceivedResourceType]
+    ) -> List[FhirReceivedResourceType]:
+        """
+        Adds identifier for uuid to each resource in the list that is missing one.
+        See add_uuid_if_missing()
+
+        :param resources: the resources to update
+        :return: the same resources with the uuid identifiers added
+        """
+        add_uuid_if_missing = FhirResourceHelpers.add_uuid_if_missing
+        return [add_uuid_if_missing(resource=resource) for resource in resources]
+
+    @staticmethod
+    def fhir_add_uuid_if_missing(*, resource: "Resource") -> "Resource":
         """
         Adds identifier for uuid if missing.  Calculates it using
         generate_uuid_for_id_and_slug()
 
 
         """
+        from fhir.resources.R4B.binary import Binary
+        from fhir.resources.R4B.domainresource import DomainResource
+        from fhir.resources.R4B.fhirtypes import Id
+        from fhir.resources.R4B.identifier import Identifier
+
         if not FhirResourceHelpers.get_uuid_from_resource(resource=resource):
             slug = FhirResourceHelpers.get_owner_from_resource(resource=resource)
             assert slug, "Owner is required to add missing UUID"
@@ -296,6 +369,25 @@ class FhirResourceHelpers:
                 cleaned_od[key] = value
         return cleaned_od
 
+    @staticmethod
+    def remove_empty_values_from_resource(
+        resource: FhirReceivedResourceType, in_place: bool = False
+    ) -> FhirReceivedResourceType:
+        """
+        Removes null, empty lists, empty objects and empty strings to comply with FHIR specifications
+        in one pass over the resource.  Unlike the recursive remove_none_values_* methods this does not
+        rebuild unchanged parts of the resource and works on arbitrarily large or nested resources.
+
+        :param resource: the resource to clean
+        :param in_place: modify the resource instead of returning a cleaned copy.  Only use this if
+                            you own the resource
+        :return: the cleaned resource
+        """
+        return cast(
+            FhirReceivedResourceType,
+            clean_empty_elements(resource, in_place=in_place),
+        )
+
     @staticmethod
     def sanitize_text(value: str) -> str:
         """
@@ -304,7 +396,7 @@ class FhirResourceHelpers:
         :param value: the value to sanitize
         :return: the sanitized value
         """
-        return re.sub(r"[^\w\r\n\t _.,!\"'/$-]", "-", value)
+        return INVALID_TEXT_CHARACTERS_REGEX.sub("-", value)
 
     @staticmethod
     def sanitize_id(value: str | Any | None) -> Optional[str]:
@@ -316,8 +408,7 @@ class FhirResourceHelpers:
         """
         if value is None:
             return None
-        # noinspection RegExpRedundantEscape
-        return re.sub(r"[^A-Za-z0-9\-\.]", "-", value)
+        return INVALID_ID_CHARACTERS_REGEX.sub("-", value)
 
     @staticmethod
     def sanitize_string(value: str) -> str:
@@ -328,7 +419,7 @@ class FhirResourceHelpers:
         :param value: string value to sanitize
         :return: string value with invalid characters removed
         """
-        return re.sub(r"[^ \r\n\t\S]", "", value)
+        return INVALID_STRING_CHARACTERS_REGEX.sub("", value)
 
     @staticmethod
     def sanitize_reference(
@@ -342,89 +433,136 @@ class FhirResourceHelpers:
 
         Docs (including regex): https://hl7.org/fhir/R4B/references.html#Reference
 
+        The same references show up over and over (e.g., every Observation of a patient refers to the
+        same Patient) so the results are cached.
+
         :param value: the `reference` value to sanitize
         :param remove_history: A flag to indicate that "_history" should be removed from the reference
         :param extract_relative_url: True to return only the relative URL portion of an absolute URL, False to return the entire absolute URL
         :return: the sanitized value, or `None` for invalid values
         """
-        # Relative and absolute URL handling (regex matches on both)
-        # Source for this beast of a regex: https://hl7.org/fhir/R4/references.html#literal
-        absolute_url_regex = r"((http|https):\/\/([A-Za-z0-9\-\_\\\.\:\%\$]*\/)+)?"
-        resource_types_regex = (
-            "(Account|ActivityDefinition|AdverseEvent|AllergyIntolerance|Appointment|Appointm"
-            "entResponse|AuditEvent|Basic|Binary|BiologicallyDerivedProduct|BodyStructure|Bu"
-            "ndle|CapabilityStatement|CarePlan|CareTeam|CatalogEntry|ChargeItem|ChargeItemDe"
-            "finition|Claim|ClaimResponse|ClinicalImpression|CodeSystem|Communication|Commun"
-            "icationRequest|CompartmentDefinition|Composition|ConceptMap|Condition|Consent|C"
-            "ontract|Coverage|CoverageEligibilityRequest|CoverageEligibilityResponse|Detecte"
-            "dIssue|Device|DeviceDefinition|DeviceMetric|DeviceRequest|DeviceUseStatement|Di"
-            "agnosticReport|DocumentManifest|DocumentReference|EffectEvidenceSynthesis|Encou"
-            "nter|Endpoint|EnrollmentRequest|EnrollmentResponse|EpisodeOfCare|EventDefinitio"
-            "n|Evidence|EvidenceVariable|ExampleScenario|ExplanationOfBenefit|FamilyMemberHi"
-            "story|Flag|Goal|GraphDefinition|Group|GuidanceResponse|HealthcareService|Imagin"
-            "gStudy|Immunization|ImmunizationEvaluation|ImmunizationRecommendation|Implement"
-            "ationGuide|InsurancePlan|Invoice|Library|Linkage|List|Location|Measure|MeasureR"
-            "eport|Media|Medication|MedicationAdministration|MedicationDispense|MedicationKn"
-            "owledge|MedicationRequest|MedicationStatement|MedicinalProduct|MedicinalProduct"
-            "Authorization|MedicinalProductContraindication|MedicinalProductIndication|Medic"
-            "inalProductIngredient|MedicinalProductInteraction|MedicinalProductManufactured|"
-            "MedicinalProductPackaged|MedicinalProductPharmaceutical|MedicinalProductUndesir"
-            "ableEffect|MessageDefinition|MessageHeader|MolecularSequence|NamingSystem|Nutri"
-            "tionOrder|Observation|ObservationDefinition|OperationDefinition|OperationOutcom"
-            "e|Organization|OrganizationAffiliation|Patient|PaymentNotice|PaymentReconciliat"
-            "ion|Person|PlanDefinition|Practitioner|PractitionerRole|Procedure|Provenance|Qu"
-            "estionnaire|QuestionnaireResponse|RelatedPerson|RequestGroup|ResearchDefinition"
-            "|ResearchElementDefinition|ResearchStudy|ResearchSubject|RiskAssessment|RiskEvi"
-            "denceSynthesis|Schedule|SearchParameter|ServiceRequest|Slot|Specimen|SpecimenDe"
-            "finition|StructureDefinition|StructureMap|Subscription|Substance|SubstanceNucle"
-            "icAcid|SubstancePolymer|SubstanceProtein|SubstanceReferenceInformation|Substanc"
-            "eSourceMaterial|SubstanceSpecification|SupplyDelivery|SupplyRequest|Task|Termin"
-            "ologyCapabilities|TestReport|TestScript|ValueSet|VerificationResult|VisionPresc"
-            "ription)"
-        )
-        resource_id_regex = r"\/[A-Za-z0-9\-\.|]+(\/_history\/[A-Za-z0-9\-\.]{1,64})?"
-        consolidated_url_regex = (
-            f"{absolute_url_regex}{resource_types_regex}{resource_id_regex}"
-        )
         # Internal references
         if value.startswith("#"):
             return value
-        # URL references
-        elif re.match(consolidated_url_regex, value):
-            # Replace invalid characters within relative URL with "-"
-            resource_type_match = re.search(f"{resource_types_regex}/", value)
-            if not isinstance(resource_type_match, re.Match):
-                return None
-            resource_id_components = value[resource_type_match.span()[1] :].split("/")
-            cleaned_resource_id_components = "/".join(
-                [
-                    re.sub(r"[^A-Za-z0-9\-.|]", "-", l) if l != "_history" else l
-                    for l in resource_id_components
-                ]
-            )
-            # Remove the history part from the reference if it exists
-            if remove_history:
-                history_index = cleaned_resource_id_components.find("/_history/")
-                if history_index != -1:
-                    cleaned_resource_id_components = cleaned_resource_id_components[
-                        :history_index
-                    ]
-                cleaned_value = (
-                    value[: resource_type_match.span()[1]]
-                    + cleaned_resource_id_components
-                )
-            # Extract relative URL from cleaned value, if appropriate
-            if extract_relative_url:
-                relative_match = re.search(
-                    f"{resource_types_regex}{resource_id_regex}", cleaned_value
+        return FhirResourceHelpers._sanitize_url_reference(
+            value, extract_relative_url, remove_history
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=SANITIZE_REFERENCE_CACHE_SIZE)
+    def _sanitize_url_reference(
+        value: str, extract_relative_url: bool, remove_history: bool
+    ) -> Optional[str]:
+        """
+        Sanitizes a relative or absolute URL reference.  This is equivalent to matching the regex in
+        https://hl7.org/fhir/R4/references.html#literal but looks up resource types in
+        FHIR_RESOURCE_TYPES instead of running the regex alternation of ~150 resource types.
+        """
+        # Return `None` for values that are not valid relative or absolute references
+        if not FhirResourceHelpers._is_url_reference(value):
+            return None
+
+        # Replace invalid characters within relative URL with "-"
+        resource_type_span = FhirResourceHelpers._find_resource_type(value)
+        if resource_type_span is None:
+            return None
+        resource_id_start: int = resource_type_span[1] + 1
+        resource_id_components = value[resource_id_start:].split("/")
+        cleaned_resource_id_components = "/".join(
+            [
+                (
+                    INVALID_REFERENCE_ID_CHARACTERS_REGEX.sub("-", l)
+                    if l != "_history"
+                    else l
                 )
-                if isinstance(relative_match, re.Match):
-                    cleaned_value = relative_match.group()
-            return cleaned_value
+                for l in resource_id_components
+            ]
+        )
+        # Remove the history part from the reference if it exists
+        if remove_history:
+            history_index = cleaned_resource_id_components.find("/_history/")
+            if history_index != -1:
+                cleaned_resource_id_components = cleaned_resource_id_components[
+                    :history_index
+                ]
+        cleaned_value = value[:resource_id_start] + cleaned_resource_id_components
+        # Extract relative URL from cleaned value, if appropriate
+        if extract_relative_url:
+            relative_url_span = FhirResourceHelpers._find_relative_url(cleaned_value)
+            if relative_url_span is not None:
+                cleaned_value = cleaned_value[
+                    relative_url_span[0] : relative_url_span[1]
+                ]
+        return cleaned_value
 
-        # Return `None` for values that are not valid relative, absolute, or internal references
-        else:
+    @staticmethod
+    def _is_url_reference(value: str) -> bool:
+        """
+        Checks that value starts with `{resource type}/{resource id}`, optionally preceded by an
+        absolute url: http(s):// followed by path segments
+        """
+        # the resource type can start at the beginning or after any "/" in the absolute url
+        if FhirResourceHelpers._is_resource_type_at(value, 0):
+            return True
+        absolute_url_match = ABSOLUTE_URL_PREFIX_REGEX.match(value)
+        if absolute_url_match is None:
+            return False
+        absolute_url_end: int = absolute_url_match.end()
+        slash_index: int = value.find("/", value.index("//") + 2, absolute_url_end)
+        while slash_index != -1:
+            if FhirResourceHelpers._is_resource_type_at(value, slash_index + 1):
+                return True
+            slash_index = value.find("/", slash_index + 1, absolute_url_end)
+        return False
+
+    @staticmethod
+    def _is_resource_type_at(value: str, position: int) -> bool:
+        match = RESOURCE_TYPE_AND_ID_START_REGEX.match(value, position)
+        return match is not None and match.group(1) in FHIR_RESOURCE_TYPES
+
+    @staticmethod
+    def _find_resource_type(
+        value: str, require_resource_id: bool = False
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Finds the left-most resource type in value that is followed by "/" (and the start of a
+        resource id if require_resource_id is set)
+
+        :return: start and end of the resource type or None if not found
+        """
+        regex = (
+            RESOURCE_TYPE_CANDIDATE_WITH_ID_REGEX
+            if require_resource_id
+            else RESOURCE_TYPE_CANDIDATE_REGEX
+        )
+        position: int = 0
+        while True:
+            match = regex.search(value, position)
+            if match is None:
+                return None
+            if match.group() in FHIR_RESOURCE_TYPES:
+                return match.start(), match.end()
+            # a shorter resource type may be a suffix of this word e.g., MyPatient/
+            position = match.start() + 1
+
+    @staticmethod
+    def _find_relative_url(value: str) -> Optional[Tuple[int, int]]:
+        """
+        Finds the left-most relative url in value: `{resource type}/{resource id}` optionally
+        followed by `/_history/{version id}` (up to 64 characters)
+
+        :return: start and end of the relative url or None if not found
+        """
+        resource_type_span = FhirResourceHelpers._find_resource_type(
+            value, require_resource_id=True
+        )
+        if resource_type_span is None:
             return None
+        resource_id_match = RESOURCE_ID_AND_HISTORY_REGEX.match(
+            value, resource_type_span[1] + 1
+        )
+        assert resource_id_match is not None
+        return resource_type_span[0], resource_id_match.end()
 
     @staticmethod
     def does_url_have_valid_scheme(url: str) -> bool:
@@ -462,8 +600,7 @@ class FhirResourceHelpers:
         :param text: the text to check
         :return: True if the text is a phone number, False otherwise
         """
-        pattern = re.compile(r"^\+?1?[-.\s]?(\(\d{3}\)|\d{3})[-.\s]?\d{3}[-.\s]?\d{4}$")
-        return bool(pattern.match(text))
+        return bool(PHONE_NUMBER_REGEX.match(text))
 
     @staticmethod
     def fix_url_scheme(url: str) -> str:
@@ -495,7 +632,7 @@ class FhirResourceHelpers:
         if not phone_number:
             return phone_number
         # Remove non-numeric characters
-        numeric_phone_number = re.sub(r"\D", "", phone_number)
+        numeric_phone_number = NON_DIGIT_REGEX.sub("", phone_number)
 
         # Check if the phone number is of valid length (10 or 11 digits)
         if len(numeric_phone_number) == 10:
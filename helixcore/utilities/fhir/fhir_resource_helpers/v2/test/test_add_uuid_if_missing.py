@@ -0,0 +1,93 @@
+import uuid
+from collections import OrderedDict
+from typing import Any, List
+
+from fhir.resources.R4B.patient import Patient
+
+from helixcore.utilities.fhir.fhir_resource_helpers.v2.fhir_resource_helpers import (
+    FhirResourceHelpers,
+)
+
+
+def create_resource(id_: str, slug: str = "bwell") -> OrderedDict[str, Any]:
+    return OrderedDict(
+        {
+            "resourceType": "Patient",
+            "id": id_,
+            "meta": {
+                "security": [
+                    {"system": "https://www.icanbwell.com/access", "code": "other"},
+                    {"system": "https://www.icanbwell.com/owner", "code": slug},
+                ]
+            },
+        }
+    )
+
+
+def test_generate_uuid_for_id_and_slug() -> None:
+    for existing_uuid in [
+        uuid.uuid1(),
+        uuid.uuid3(uuid.NAMESPACE_OID, "a"),
+        uuid.uuid4(),
+        uuid.uuid5(uuid.NAMESPACE_OID, "a"),
+    ]:
+        assert FhirResourceHelpers.generate_uuid_for_id_and_slug(
+            id_=str(existing_uuid), slug="bwell"
+        ) == str(existing_uuid)
+
+    uuid4 = str(uuid.uuid4())
+    for id_ in ["123", uuid4.upper(), uuid4.replace("-", ""), "{" + uuid4 + "}"]:
+        expected = str(uuid.uuid5(uuid.NAMESPACE_OID, f"{id_}|bwell"))
+        assert (
+            FhirResourceHelpers.generate_uuid_for_id_and_slug(id_=id_, slug="bwell")
+            == expected
+        )
+        # cached
+        assert (
+            FhirResourceHelpers.generate_uuid_for_id_and_slug(id_=id_, slug="bwell")
+            == expected
+        )
+
+
+def test_add_uuid_if_missing_batch() -> None:
+    resources: List[OrderedDict[str, Any]] = [
+        create_resource(id_=str(i)) for i in range(3)
+    ]
+    existing_uuid = str(uuid.uuid4())
+    resources[1]["identifier"] = [
+        {"system": "https://www.icanbwell.com/uuid", "value": existing_uuid}
+    ]
+
+    result = FhirResourceHelpers.add_uuid_if_missing_batch(resources=resources)
+
+    assert result == resources
+    assert [
+        FhirResourceHelpers.get_uuid_from_resource(resource=resource)
+        for resource in result
+    ] == [
+        str(uuid.uuid5(uuid.NAMESPACE_OID, "0|bwell")),
+        existing_uuid,
+        str(uuid.uuid5(uuid.NAMESPACE_OID, "2|bwell")),
+    ]
+    assert len(result[1]["identifier"]) == 1
+
+
+def test_get_owner_and_uuid_from_model_resource() -> None:
+    resource: OrderedDict[str, Any] = create_resource(id_="123", slug="medstar")
+    patient: Patient = Patient.parse_obj(resource)
+    assert FhirResourceHelpers.get_owner_from_resource(resource=patient) == "medstar"
+    assert FhirResourceHelpers.get_owner_from_resource(resource=resource) == "medstar"
+    assert FhirResourceHelpers.get_uuid_from_resource(resource=patient) is None
+
+    FhirResourceHelpers.fhir_add_uuid_if_missing(resource=patient)
+    assert FhirResourceHelpers.get_uuid_from_resource(resource=patient) == str(
+        uuid.uuid5(uuid.NAMESPACE_OID, "123|medstar")
+    )
+
+    assert (
+        FhirResourceHelpers.get_owner_from_resource(
+            resource=Patient.parse_obj({"resourceType": "Patient", "id": "1"})
+        )
+        is None
+    )
+    assert FhirResourceHelpers.get_owner_from_resource(resource={"id": "1"}) is None
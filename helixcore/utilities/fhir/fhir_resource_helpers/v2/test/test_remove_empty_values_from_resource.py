@@ -0,0 +1,116 @@
+import json
+import random
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from helixcore.utilities.fhir.fhir_resource_helpers.v2.fhir_resource_helpers import (
+    FhirResourceHelpers,
+)
+from helixcore.utilities.json_helpers import (
+    remove_empty_elements,
+    clean_empty_elements,
+    convert_fhir_json_to_ordered_dict,
+)
+
+
+def create_random_element(random_: random.Random, depth: int) -> Any:
+    choice = random_.randint(0, 9 if depth < 4 else 5)
+    if choice == 0:
+        return None
+    if choice == 1:
+        return ""
+    if choice == 2:
+        return random_.choice(["a", "b", 0, 1.5, False, True])
+    if choice == 3:
+        return []
+    if choice == 4:
+        return {}
+    if choice == 5:
+        return OrderedDict()
+    if choice in [6, 7]:
+        return [
+            create_random_element(random_, depth + 1)
+            for _ in range(random_.randint(0, 4))
+        ]
+    return OrderedDict(
+        (f"key{i}", create_random_element(random_, depth + 1))
+        for i in range(random_.randint(0, 4))
+    )
+
+
+def test_clean_empty_elements_same_as_remove_empty_elements() -> None:
+    random_ = random.Random(42)
+    for _ in range(2000):
+        element = create_random_element(random_, 0)
+        expected = remove_empty_elements(element)
+        original_json = json.dumps(element)
+
+        cleaned = clean_empty_elements(element)
+        assert cleaned == expected
+        assert json.dumps(cleaned) == json.dumps(expected)
+        # the input is not modified
+        assert json.dumps(element) == original_json
+
+        cleaned_in_place = clean_empty_elements(element, in_place=True)
+        assert cleaned_in_place == expected
+        if isinstance(element, (dict, list)):
+            assert cleaned_in_place is element
+
+
+def test_remove_empty_values_from_resource() -> None:
+    resource: OrderedDict[str, Any] = convert_fhir_json_to_ordered_dict(
+        json.dumps(
+            {
+                "resourceType": "Patient",
+                "id": "123",
+                "meta": {"security": [{"system": "owner", "code": "bwell"}]},
+                "name": [{"given": ["James", ""], "family": None}, {"text": ""}],
+                "telecom": [],
+                "address": [{"line": [None, ""], "city": ""}],
+                "extension": [{"url": "a", "valueString": ""}],
+            }
+        )
+    )
+    cleaned = FhirResourceHelpers.remove_empty_values_from_resource(resource)
+    assert isinstance(cleaned, OrderedDict)
+    assert cleaned == {
+        "resourceType": "Patient",
+        "id": "123",
+        "meta": {"security": [{"system": "owner", "code": "bwell"}]},
+        "name": [{"given": ["James"]}],
+        "extension": [{"url": "a"}],
+    }
+    # unchanged parts of the resource are reused instead of copied
+    assert cleaned["meta"] is resource["meta"]
+    assert cleaned is not resource
+    assert "telecom" in resource
+
+    cleaned_in_place = FhirResourceHelpers.remove_empty_values_from_resource(
+        resource, in_place=True
+    )
+    assert cleaned_in_place is resource
+    assert resource == cleaned
+
+
+def test_clean_empty_elements_large_and_deep() -> None:
+    # a deeply nested element would exceed the recursion limit with a recursive implementation
+    deep: Dict[str, Any] = {"value": "a", "empty": ""}
+    for _ in range(5000):
+        deep = {"child": deep, "empty": None}
+    cleaned: Any = clean_empty_elements(deep)
+    for _ in range(5000):
+        assert list(cleaned.keys()) == ["child"]
+        cleaned = cleaned["child"]
+    assert cleaned == {"value": "a"}
+
+    bundle: Dict[str, Any] = {
+        "resourceType": "Bundle",
+        "entry": [
+            {"resource": {"resourceType": "Observation", "id": str(i), "note": []}}
+            for i in range(10_000)
+        ],
+    }
+    cleaned_bundle: Any = clean_empty_elements(bundle)
+    entries: List[Dict[str, Any]] = cleaned_bundle["entry"]
+    assert len(entries) == 10_000
+    assert entries[0] == {"resource": {"resourceType": "Observation", "id": "0"}}
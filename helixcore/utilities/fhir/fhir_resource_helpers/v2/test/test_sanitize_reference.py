@@ -0,0 +1,132 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from helixcore.utilities.fhir.fhir_resource_helpers.v2.fhir_resource_helpers import (
+    FhirResourceHelpers,
+)
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# references as received from EHRs: (reference, relative url, absolute url)
+REFERENCES: List[Tuple[str, Optional[str], Optional[str]]] = [
+    ("Patient/123", "Patient/123", "Patient/123"),
+    ("Practitioner/abc-def", "Practitioner/abc-def", "Practitioner/abc-def"),
+    (
+        "https://fhir.epic.com/interconnect-fhir-oauth/api/FHIR/R4/Patient/eq081-VQEgP8drUUqCWzHfw3",
+        "Patient/eq081-VQEgP8drUUqCWzHfw3",
+        "https://fhir.epic.com/interconnect-fhir-oauth/api/FHIR/R4/Patient/eq081-VQEgP8drUUqCWzHfw3",
+    ),
+    (
+        "https://fhir-myrecord.cerner.com/r4/ec2458f2-1e24-41c8-b71b-0e701af7583d/Encounter/97953477",
+        "Encounter/97953477",
+        "https://fhir-myrecord.cerner.com/r4/ec2458f2-1e24-41c8-b71b-0e701af7583d/Encounter/97953477",
+    ),
+    (
+        "https://api.platform.athenahealth.com/fhir/r4/Location/a-1.Department-21",
+        "Location/a-1.Department-21",
+        "https://api.platform.athenahealth.com/fhir/r4/Location/a-1.Department-21",
+    ),
+    ("Organization/1|abc", "Organization/1|abc", "Organization/1|abc"),
+    ("#contained1", "#contained1", "#contained1"),
+    ("urn:uuid:1234", None, None),
+    ("Foo/123", None, None),
+    ("Observation/obs-1/_history/2", "Observation/obs-1", "Observation/obs-1"),
+    (
+        "Medication/med id with spaces",
+        "Medication/med-id-with-spaces",
+        "Medication/med-id-with-spaces",
+    ),
+    (
+        "PractitionerRole/xyz_123",
+        "PractitionerRole/xyz-123",
+        "PractitionerRole/xyz-123",
+    ),
+    (
+        "AppointmentResponse/a1",
+        "AppointmentResponse/a1",
+        "AppointmentResponse/a1",
+    ),
+    (
+        "https://example.com/fhir/MyPatient/x/Patient/1",
+        "Patient/x",
+        "https://example.com/fhir/MyPatient/x/Patient/1",
+    ),
+]
+
+
+def test_sanitize_reference() -> None:
+    for reference, relative_url, absolute_url in REFERENCES:
+        assert (
+            FhirResourceHelpers.sanitize_reference(reference) == relative_url
+        ), reference
+        assert (
+            FhirResourceHelpers.sanitize_reference(
+                reference, extract_relative_url=False
+            )
+            == absolute_url
+        ), reference
+
+
+def test_sanitize_reference_keep_history() -> None:
+    assert (
+        FhirResourceHelpers.sanitize_reference(
+            "https://example.com/fhir/Observation/obs-1/_history/2",
+            remove_history=False,
+        )
+        == "Observation/obs-1/_history/2"
+    )
+    assert (
+        FhirResourceHelpers.sanitize_reference(
+            "https://example.com/fhir/Observation/obs 1/_history/2",
+            extract_relative_url=False,
+            remove_history=False,
+        )
+        == "https://example.com/fhir/Observation/obs-1/_history/2"
+    )
+
+
+def test_sanitize_reference_benchmark() -> None:
+    # every resource of a patient refers to the same handful of references
+    references: List[str] = [
+        reference.replace("123", str(i % 500))
+        for i in range(10_000)
+        for reference, _, _ in REFERENCES[i % len(REFERENCES) : i % len(REFERENCES) + 1]
+    ]
+    # noinspection PyProtectedMember
+    sanitize_url_reference = FhirResourceHelpers._sanitize_url_reference
+    sanitize_url_reference.cache_clear()
+
+    start = time.perf_counter()
+    cold_results = [FhirResourceHelpers.sanitize_reference(r) for r in references]
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    warm_results = [FhirResourceHelpers.sanitize_reference(r) for r in references]
+    warm = time.perf_counter() - start
+
+    start = time.perf_counter()
+    uncached_results = [
+        (
+            sanitize_url_reference.__wrapped__(r, True, True)
+            if not r.startswith("#")
+            else r
+        )
+        for r in references
+    ]
+    uncached = time.perf_counter() - start
+
+    logger.info(
+        f"sanitize_reference for {len(references)} references: "
+        f"uncached={uncached * 1000:.1f}ms cold={cold * 1000:.1f}ms warm={warm * 1000:.1f}ms"
+    )
+    assert cold_results == warm_results == uncached_results
+    assert sanitize_url_reference.cache_info().hits > len(references)
+
+
+def test_phone_number() -> None:
+    assert FhirResourceHelpers.is_phone_number("(555) 123-4567")
+    assert not FhirResourceHelpers.is_phone_number("555-1234")
+    assert FhirResourceHelpers.fix_url_scheme("1-555-123-4567") == "tel:+15551234567"
+    assert FhirResourceHelpers.sanitize_id("a_b c") == "a-b-c"
+    assert FhirResourceHelpers.sanitize_text("a<b>") == "a-b-"
@@ -1,8 +1,15 @@
-from typing import Any, Dict, List, Union, Optional, Iterable
+from typing import Any, Dict, List, Union, Optional, Iterable, IO, Iterator, cast
+import gzip
+import io
 import json
 
 from helixcore.logger.yarn_logger import get_logger
 
+GZIP_MAGIC_NUMBER: bytes = b"\x1f\x8b"
+STREAM_READ_CHUNK_SIZE: int = 1024 * 1024
+# characters that can follow a complete top level or array element json value
+JSON_VALUE_TERMINATORS: str = " \t\r\n,]"
+
 
 def combine_bundles(contents: str) -> Dict[str, Any]:
     resources_or_bundles: List[Dict[str, Any]] = json.loads(contents)
@@ -94,3 +101,255 @@ def extract_resource_from_json(
                 },
             )
         ]
+
+
+def open_text_stream(stream: IO[bytes] | IO[str]) -> IO[str]:
+    """
+    Returns a text stream for the given stream.  Binary streams are decoded as utf-8 and
+    gzip streams (detected by their magic number) are decompressed on the fly.
+
+
+    :param stream: binary or text stream
+    :return: text stream
+    """
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    binary_stream: IO[bytes] = cast(IO[bytes], stream)
+    if not isinstance(binary_stream, io.BufferedIOBase) or not hasattr(
+        binary_stream, "peek"
+    ):
+        # e.g. botocore StreamingBody: buffer it so we can peek at the magic number
+        binary_stream = io.BufferedReader(_RawStreamWrapper(binary_stream))
+    if binary_stream.peek(2)[:2] == GZIP_MAGIC_NUMBER:
+        binary_stream = cast(IO[bytes], gzip.GzipFile(fileobj=binary_stream))
+    return io.TextIOWrapper(binary_stream, encoding="utf-8")
+
+
+class _RawStreamWrapper(io.RawIOBase):
+    """
+    Adapts any object with a read(size) method to RawIOBase so it can be buffered
+    """
+
+    def __init__(self, stream: Any) -> None:
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data: bytes = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def iterate_json_values(
+    stream: IO[str], chunk_size: int = STREAM_READ_CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    Incrementally parses the stream and yields one json value at a time without reading the whole
+    stream into memory.  Supports:
+    1. a json array: yields each element of the array
+    2. one or more json values separated by whitespace (e.g., a single resource/bundle or
+       NDJSON as used by FHIR bulk export): yields each value
+
+
+    :param stream: text stream
+    :param chunk_size: number of characters to read at a time
+    :return: json values
+    """
+    decoder = json.JSONDecoder()
+    buffer: str = ""
+    position: int = 0
+    end_of_stream: bool = False
+    in_array: Optional[bool] = None
+    expect_separator: bool = False
+
+    def read_more(minimum_size: int) -> bool:
+        nonlocal buffer, position, end_of_stream
+        if end_of_stream:
+            return False
+        chunk: str = stream.read(max(chunk_size, minimum_size))
+        if not chunk:
+            end_of_stream = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    while True:
+        # skip whitespace (and the separators between array elements)
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position == len(buffer):
+                if read_more(0):
+                    continue
+                if in_array:
+                    raise ValueError("Unexpected end of stream in json array")
+                return
+            character = buffer[position]
+            if in_array is None:
+                in_array = character == "["
+                if in_array:
+                    position += 1
+                    continue
+            if in_array and character == "]":
+                return
+            if in_array and expect_separator:
+                if character != ",":
+                    raise ValueError(
+                        f"Expected ',' or ']' in json array but found {character!r}"
+                    )
+                position += 1
+                expect_separator = False
+                continue
+            break
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # the value is not complete yet: read more, doubling the buffer so large values are
+            # not re-parsed too many times
+            if read_more(len(buffer) - position):
+                continue
+            raise
+        if (
+            not isinstance(value, (dict, list, str))
+            and (end == len(buffer) or buffer[end] not in JSON_VALUE_TERMINATORS)
+            and read_more(0)
+        ):
+            # a number or literal cut off at the end of the buffer continues in the next chunk
+            continue
+        position = end
+        expect_separator = True
+        if position > chunk_size:
+            buffer = buffer[position:]
+            position = 0
+        yield value
+
+
+def iterate_resources(
+    stream: IO[bytes] | IO[str],
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the resources in the stream, one at a time.  The stream can contain a json array of
+    resources or bundles (like combine_bundles() expects), a single resource or bundle, or NDJSON.
+    Entries of bundles are yielded as separate resources.  Gzip streams are decompressed.
+    A bundle without entries raises KeyError like combine_bundles().
+
+
+    :param stream: binary or text stream
+    :return: resources
+    """
+    for resource_or_bundle in iterate_json_values(open_text_stream(stream)):
+        if (
+            not isinstance(resource_or_bundle, dict)
+            or "resourceType" not in resource_or_bundle
+        ):  # bad/corrupt entry
+            continue
+        if resource_or_bundle["resourceType"] != "Bundle":  # normal resource
+            yield resource_or_bundle
+        else:
+            entry: Dict[str, Any]
+            for entry in resource_or_bundle["entry"]:
+                if (
+                    isinstance(entry, dict)
+                    and isinstance(entry.get("resource"), dict)
+                    and "resourceType" in entry["resource"]
+                ):  # it is a valid entry
+                    yield entry["resource"]
+
+
+def extract_resource_from_stream(
+    file_path: str,
+    stream: IO[bytes] | IO[str],
+    resources_to_extract: Optional[List[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming version of extract_resource_from_json(): parses the resources one at a time instead of
+    loading the whole file and building a combined bundle.  Each row contains file name, resourceType and resource.
+    The rows are yielded once the whole file has been parsed so, like extract_resource_from_json(),
+    a file that cannot be parsed only returns the OperationOutcome error row
+
+    :param file_path: location of file
+    :param stream: file object or stream with the contents (json, NDJSON, optionally gzipped)
+    :param resources_to_extract: optional list of resources to extract
+    """
+    logger = get_logger(__name__)
+    file_name: str = file_path.split("/")[-1].replace(".gz", "")
+
+    rows: List[Dict[str, Any]] = []
+    try:
+        logger.info(
+            f"Extracting resources from {file_path} and using file name {file_name}"
+        )
+        for resource in iterate_resources(stream):
+            resource_type: str = str(resource["resourceType"])
+            if resource_type == "OperationOutcome":  # these are just fluff
+                continue
+            if resources_to_extract and resource_type not in resources_to_extract:
+                continue
+            rows.append(
+                dict(
+                    file_name=str(file_name),
+                    resourceType=resource_type,
+                    resource=json.dumps(resource),
+                )
+            )
+        logger.info(f"Finished extracting resources from {file_path}")
+    except Exception as e:
+        logger.exception(f"Error extracting resources from {file_path}: {str(e)}")
+        # don't return the resources parsed before the error
+        yield get_extraction_error_row(file_path=file_path, error=e)
+        return
+    yield from rows
+
+
+def get_extraction_error_row(file_path: str, error: Exception) -> Dict[str, Any]:
+    """
+    Returns the OperationOutcome row that is returned for a file that could not be parsed
+
+    :param file_path: location of file
+    :param error: the error
+    """
+    file_name: str = file_path.split("/")[-1].replace(".gz", "")
+    return dict(
+        file_name=str(file_name),
+        resourceType="OperationOutcome",
+        resource={
+            "issue": [
+                {
+                    "severity": "error",
+                    "code": "invalid",
+                    "details": {"text": f"{str(error)}"},
+                    "diagnostics": f"{file_path}",
+                }
+            ]
+        },
+    )
+
+
+def is_extraction_error_row(row: Dict[str, Any]) -> bool:
+    """
+    Returns whether the row is the OperationOutcome row returned for a file that could not be parsed.
+    OperationOutcome resources in the files are not extracted so any OperationOutcome row is an error row
+
+    :param row: row
+    """
+    return bool(row.get("resourceType") == "OperationOutcome")
+
+
+def extract_resource_from_file(
+    file_path: str, resources_to_extract: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Opens the local file and yields a row for each resource in it.
+    See extract_resource_from_stream()
+
+    :param file_path: location of file
+    :param resources_to_extract: optional list of resources to extract
+    """
+    with open(file_path, "rb") as file:
+        yield from extract_resource_from_stream(
+            file_path=file_path, stream=file, resources_to_extract=resources_to_extract
+        )
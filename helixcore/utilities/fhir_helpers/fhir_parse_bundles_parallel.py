@@ -0,0 +1,163 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from multiprocessing.context import BaseContext
+from typing import Any, Dict, List, Optional, Iterable, Iterator, IO, Deque, Generator
+
+from helixcore.logger.yarn_logger import get_logger
+from helixcore.utilities.aws.s3 import (
+    parse_s3_uri,
+    get_s3_client,
+    iterate_s3_directory_contents,
+)
+from helixcore.utilities.fhir_helpers.fhir_parse_bundles import (
+    extract_resource_from_stream,
+    get_extraction_error_row,
+    is_extraction_error_row,
+)
+
+
+def open_file(file_path: str) -> IO[bytes]:
+    """
+    Opens a local file or an S3 object (s3://bucket/key) as a binary stream
+
+    :param file_path: local path or S3 uri
+    :return: binary stream
+    """
+    if file_path.startswith("s3://") or file_path.startswith("s3a://"):
+        bucket, key = parse_s3_uri(file_path)
+        assert bucket and key, f"Invalid S3 uri: {file_path}"
+        body: IO[bytes] = get_s3_client().get_object(Bucket=bucket, Key=key)["Body"]
+        return body
+    return open(file_path, "rb")
+
+
+def extract_resources_from_files_task(
+    file_paths: List[str], resources_to_extract: Optional[List[str]]
+) -> List[Dict[str, Any]]:
+    """
+    Extracts the rows from the given files.  This runs in a worker process so it has to be a
+    top level function.
+
+    :param file_paths: local paths or S3 uris
+    :param resources_to_extract: optional list of resources to extract
+    :return: rows for all the files.  A file that fails only returns its error row
+    """
+    rows: List[Dict[str, Any]] = []
+    for file_path in file_paths:
+        file_rows: List[Dict[str, Any]]
+        try:
+            with open_file(file_path) as stream:
+                file_rows = list(
+                    extract_resource_from_stream(
+                        file_path=file_path,
+                        stream=stream,
+                        resources_to_extract=resources_to_extract,
+                    )
+                )
+        except Exception as e:
+            get_logger(__name__).exception(f"Error opening {file_path}: {str(e)}")
+            file_rows = [get_extraction_error_row(file_path=file_path, error=e)]
+        if file_rows and is_extraction_error_row(file_rows[-1]):
+            # don't return the rows parsed before the error
+            file_rows = file_rows[-1:]
+        rows.extend(file_rows)
+    return rows
+
+
+def extract_resources_from_files(
+    file_paths: Iterable[str],
+    resources_to_extract: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    files_per_task: int = 1,
+    max_pending_tasks: Optional[int] = None,
+    mp_context: Optional[BaseContext] = None,
+) -> Generator[Dict[str, Any], None, None]:
+    """
+    Extracts the rows (file name, resourceType and resource) from many files, parsing the files in
+    parallel in a process pool.  Rows are yielded in the order of the files.  A file that cannot be
+    opened or parsed returns an OperationOutcome row like extract_resource_from_json().
+
+    :param file_paths: local paths or S3 uris (s3://bucket/key)
+    :param resources_to_extract: optional list of resources to extract
+    :param max_workers: number of worker processes (default is number of cores).  0 runs in the calling process
+    :param files_per_task: number of files sent to a worker at a time
+    :param max_pending_tasks: maximum number of tasks submitted but not yet consumed so results do not pile up
+                                in memory when the caller consumes slower than the workers parse.
+                                Default is 2 * max_workers
+    :param mp_context: optional multiprocessing context e.g., spawn
+    :return: rows
+    """
+    assert files_per_task > 0, f"files_per_task should be > 0 but is {files_per_task}"
+    file_path_chunks: Iterator[List[str]] = _chunk(file_paths, files_per_task)
+    if max_workers == 0:
+        for file_path_chunk in file_path_chunks:
+            yield from extract_resources_from_files_task(
+                file_path_chunk, resources_to_extract
+            )
+        return
+
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending: int = max_pending_tasks or 2 * max_workers
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=mp_context
+    ) as executor:
+        pending: Deque[Future[List[Dict[str, Any]]]] = deque()
+        try:
+            for file_path_chunk in file_path_chunks:
+                pending.append(
+                    executor.submit(
+                        extract_resources_from_files_task,
+                        file_path_chunk,
+                        resources_to_extract,
+                    )
+                )
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # caller stopped early or there was an error: don't parse the remaining files
+            for future in pending:
+                future.cancel()
+
+
+def extract_resources_from_s3_prefix(
+    bucket: str,
+    prefix: str,
+    resources_to_extract: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    files_per_task: int = 1,
+    max_pending_tasks: Optional[int] = None,
+    mp_context: Optional[BaseContext] = None,
+) -> Generator[Dict[str, Any], None, None]:
+    """
+    Extracts the rows from all the S3 objects under the prefix in parallel.
+    See extract_resources_from_files()
+
+    :param bucket: S3 bucket
+    :param prefix: prefix of the objects to extract
+    :return: rows
+    """
+    yield from extract_resources_from_files(
+        file_paths=(
+            f"s3://{bucket}/{key}"
+            for key in iterate_s3_directory_contents(bucket=bucket, prefix=prefix)
+        ),
+        resources_to_extract=resources_to_extract,
+        max_workers=max_workers,
+        files_per_task=files_per_task,
+        max_pending_tasks=max_pending_tasks,
+        mp_context=mp_context,
+    )
+
+
+def _chunk(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
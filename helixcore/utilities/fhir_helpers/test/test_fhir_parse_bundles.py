@@ -0,0 +1,122 @@
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Any, List, IO
+
+from helixcore.utilities.fhir_helpers.fhir_parse_bundles import (
+    extract_resource_from_json,
+    extract_resource_from_stream,
+    extract_resource_from_file,
+    iterate_json_values,
+)
+
+
+def create_contents() -> List[Any]:
+    return [
+        {"resourceType": "Patient", "id": "1", "name": [{"text": "Jamés ü"}]},
+        {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "entry": [
+                {"resource": {"resourceType": "Observation", "id": str(i)}}
+                for i in range(50)
+            ]
+            + [
+                {"resource": {"resourceType": "OperationOutcome", "id": "oo"}},
+                {"search": {"mode": "match"}},
+            ],
+        },
+        {"id": "no-resource-type"},
+        "corrupt",
+        {"resourceType": "Condition", "id": "c1", "onsetAge": {"value": 12.5}},
+    ]
+
+
+def test_extract_resource_from_stream_same_as_extract_resource_from_json() -> None:
+    contents: str = json.dumps(create_contents())
+    expected = list(
+        extract_resource_from_json(file_path="/data/file1.json.gz", contents=contents)
+    )
+    assert len(expected) == 52
+
+    streams: List[IO[bytes] | IO[str]] = [
+        io.StringIO(contents),
+        io.BytesIO(contents.encode("utf-8")),
+        io.BytesIO(gzip.compress(contents.encode("utf-8"))),
+    ]
+    for stream in streams:
+        rows = list(
+            extract_resource_from_stream(file_path="/data/file1.json.gz", stream=stream)
+        )
+        assert rows == expected
+
+    rows = list(
+        extract_resource_from_stream(
+            file_path="/data/file1.json",
+            stream=io.StringIO(contents),
+            resources_to_extract=["Patient", "Condition"],
+        )
+    )
+    assert [row["resourceType"] for row in rows] == ["Patient", "Condition"]
+
+
+def test_extract_resource_from_ndjson(tmp_path: Path) -> None:
+    resources = [
+        resource for resource in create_contents() if isinstance(resource, dict)
+    ]
+    ndjson: str = "\n".join(json.dumps(resource) for resource in resources) + "\n"
+    path = tmp_path / "Observation.ndjson.gz"
+    path.write_bytes(gzip.compress(ndjson.encode("utf-8")))
+
+    rows = list(extract_resource_from_file(file_path=str(path)))
+    assert len(rows) == 52
+    assert rows[0]["file_name"] == "Observation.ndjson"
+    assert json.loads(rows[0]["resource"])["name"][0]["text"] == "Jamés ü"
+
+
+def test_iterate_json_values_small_chunks() -> None:
+    values: List[Any] = [{"a": [1, 2, {"b": "c d"}]}, 12345, "text", None, [], 1.5]
+    contents: str = json.dumps(values)
+    for chunk_size in [1, 2, 3, 7, 100]:
+        assert (
+            list(iterate_json_values(io.StringIO(contents), chunk_size=chunk_size))
+            == values
+        )
+        assert (
+            list(
+                iterate_json_values(
+                    io.StringIO(" \n".join(json.dumps(v) for v in values)),
+                    chunk_size=chunk_size,
+                )
+            )
+            == values
+        )
+    assert list(iterate_json_values(io.StringIO("  "))) == []
+    assert list(iterate_json_values(io.StringIO("[]"))) == []
+
+
+def test_extract_resource_from_stream_invalid_json() -> None:
+    rows = list(
+        extract_resource_from_stream(
+            file_path="/data/bad.json",
+            stream=io.StringIO('[{"resourceType": "Patient", "id": "1"}, {"resou'),
+        )
+    )
+    # only the error row like extract_resource_from_json()
+    assert [row["resourceType"] for row in rows] == ["OperationOutcome"]
+    assert rows[0]["resource"]["issue"][0]["diagnostics"] == "/data/bad.json"
+
+
+def test_extract_resource_from_stream_bundle_without_entry() -> None:
+    contents: str = json.dumps([{"resourceType": "Bundle", "type": "searchset"}])
+    expected = list(
+        extract_resource_from_json(file_path="/data/empty.json", contents=contents)
+    )
+    rows = list(
+        extract_resource_from_stream(
+            file_path="/data/empty.json", stream=io.StringIO(contents)
+        )
+    )
+    assert [row["resourceType"] for row in rows] == ["OperationOutcome"]
+    assert [row["resourceType"] for row in expected] == ["OperationOutcome"]
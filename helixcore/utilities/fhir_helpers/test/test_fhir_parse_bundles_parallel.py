@@ -0,0 +1,126 @@
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import boto3
+
+from helixcore.utilities.fhir_helpers.fhir_parse_bundles import (
+    extract_resource_from_file,
+)
+from helixcore.utilities.fhir_helpers.fhir_parse_bundles_parallel import (
+    extract_resources_from_files,
+    extract_resources_from_s3_prefix,
+)
+
+
+def create_files(tmp_path: Path, count: int) -> List[str]:
+    file_paths: List[str] = []
+    for i in range(count):
+        contents: str = json.dumps(
+            {
+                "resourceType": "Bundle",
+                "entry": [
+                    {"resource": {"resourceType": "Patient", "id": f"{i}-{j}"}}
+                    for j in range(5)
+                ]
+                + [{"resource": {"resourceType": "Observation", "id": f"{i}"}}],
+            }
+        )
+        file_path: Path = tmp_path / f"file{i}.json.gz"
+        file_path.write_bytes(gzip.compress(contents.encode("utf-8")))
+        file_paths.append(str(file_path))
+    return file_paths
+
+
+def test_extract_resources_from_files(tmp_path: Path) -> None:
+    file_paths: List[str] = create_files(tmp_path, 7)
+    missing_file: str = str(tmp_path / "missing.json")
+    file_paths.insert(3, missing_file)
+
+    expected: List[Dict[str, Any]] = []
+    for file_path in file_paths:
+        if file_path == missing_file:
+            continue
+        expected.extend(
+            extract_resource_from_file(
+                file_path=file_path, resources_to_extract=["Patient"]
+            )
+        )
+
+    rows: List[Dict[str, Any]] = list(
+        extract_resources_from_files(
+            file_paths=file_paths,
+            resources_to_extract=["Patient"],
+            max_workers=2,
+            files_per_task=2,
+        )
+    )
+
+    error_rows = [r for r in rows if r["resourceType"] == "OperationOutcome"]
+    assert len(error_rows) == 1
+    assert error_rows[0]["file_name"] == "missing.json"
+    assert error_rows[0]["resource"]["issue"][0]["diagnostics"] == missing_file
+    # rows come back in the order of the files
+    assert [r for r in rows if r["resourceType"] != "OperationOutcome"] == expected
+    assert len(expected) == 35
+
+
+def test_extract_resources_from_files_truncated_file(tmp_path: Path) -> None:
+    file_paths: List[str] = create_files(tmp_path, 2)
+    contents: bytes = gzip.decompress(Path(file_paths[0]).read_bytes())
+    truncated_file: Path = tmp_path / "truncated.json"
+    # cut off in the middle of the last entry so the first entries parse
+    truncated_file.write_bytes(contents[: len(contents) - 20])
+    file_paths.insert(1, str(truncated_file))
+
+    rows: List[Dict[str, Any]] = list(
+        extract_resources_from_files(file_paths=file_paths, max_workers=0)
+    )
+    truncated_rows = [r for r in rows if r["file_name"] == "truncated.json"]
+    assert [r["resourceType"] for r in truncated_rows] == ["OperationOutcome"]
+    assert len(rows) == 13
+
+
+def test_extract_resources_from_files_stop_early(tmp_path: Path) -> None:
+    file_paths: List[str] = create_files(tmp_path, 20)
+    rows = extract_resources_from_files(
+        file_paths=file_paths, max_workers=2, max_pending_tasks=2
+    )
+    first_rows = [next(rows) for _ in range(3)]
+    rows.close()
+    assert [json.loads(r["resource"])["id"] for r in first_rows] == [
+        "0-0",
+        "0-1",
+        "0-2",
+    ]
+
+
+def test_extract_resources_from_s3_prefix(s3_mock: Any) -> None:
+    s3_client = boto3.client("s3", region_name="us-east-1")
+    s3_client.create_bucket(Bucket="bulk-export")
+    for i in range(3):
+        s3_client.put_object(
+            Bucket="bulk-export",
+            Key=f"export/Patient{i}.ndjson",
+            Body="\n".join(
+                json.dumps({"resourceType": "Patient", "id": f"{i}-{j}"})
+                for j in range(2)
+            ).encode("utf-8"),
+        )
+
+    # the moto mock only exists in this process so parse in the calling process
+    rows: List[Dict[str, Any]] = list(
+        extract_resources_from_s3_prefix(
+            bucket="bulk-export", prefix="export/", max_workers=0
+        )
+    )
+    assert [json.loads(r["resource"])["id"] for r in rows] == [
+        "0-0",
+        "0-1",
+        "1-0",
+        "1-1",
+        "2-0",
+        "2-1",
+    ]
+    assert rows[0]["file_name"] == "Patient0.ndjson"
@@ -2,7 +2,7 @@ import json
 from datetime import datetime
 from json import JSONDecodeError
 from logging import Logger
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, Dict, List, Optional, Union, cast, TYPE_CHECKING
 from typing import (
     Iterable,
     AsyncGenerator,
@@ -26,9 +26,15 @@ from helixcore.structures.fhir_receiver.v2.structures.get_batch_error import (
 from helixcore.structures.fhir_receiver.v2.structures.get_batch_result import (
     GetBatchResult,
 )
+from helixcore.utilities.arrow_batch_builder.v1.arrow_batch_builder import (
+    ArrowBatchBuilder,
+)
 from helixcore.utilities.fhir_helpers.fhir_get_response_item import (
     FhirGetResponseItem,
 )
+from helixcore.utilities.fhir_helpers.fhir_get_response_schema import (
+    FhirGetResponseSchema,
+)
 from helixcore.utilities.fhir_helpers.fhir_parser_exception import (
     FhirParserException,
 )
@@ -39,6 +45,9 @@ from helixcore.utilities.fhir_helpers.get_fhir_client import (
     get_fhir_client,
 )
 
+if TYPE_CHECKING:
+    import pyarrow
+
 
 class FhirReceiverProcessor:
     """
@@ -112,6 +121,36 @@ class FhirReceiverProcessor:
         ):
             yield result
 
+    @staticmethod
+    async def send_partition_request_to_server_as_record_batches_async(
+        *,
+        partition_index: int,
+        rows: Iterable[Dict[str, Any]],
+        parameters: FhirReceiverParameters,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator["pyarrow.RecordBatch", None]:
+        """
+        Same as send_partition_request_to_server_async() but returns the responses as pyarrow
+        RecordBatches (with FhirGetResponseSchema) of batch_size rows instead of one dict per row.
+        Needs pyarrow to be installed.
+
+
+        :param partition_index: partition index
+        :param rows: rows to process
+        :param parameters: FhirReceiverParameters
+        :param batch_size: number of rows in each RecordBatch
+        :return: RecordBatches
+        """
+        builder: ArrowBatchBuilder = ArrowBatchBuilder(
+            schema=FhirGetResponseSchema.get_schema(), batch_size=batch_size
+        )
+        async for batch in builder.build_batches_async(
+            FhirReceiverProcessor.send_partition_request_to_server_async(
+                partition_index=partition_index, rows=rows, parameters=parameters
+            )
+        ):
+            yield batch
+
     @staticmethod
     async def process_with_token_async(
         *,
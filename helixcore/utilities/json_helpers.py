@@ -1,6 +1,7 @@
 import collections
 import json
-from typing import Any, Dict, List, Union, cast, OrderedDict
+from itertools import islice
+from typing import Any, Dict, List, Union, cast, OrderedDict, Optional, Tuple, Iterator
 from datetime import datetime, date
 
 
@@ -37,6 +38,109 @@ def remove_empty_elements(
         }
 
 
+def _get_children(
+    node: Union[List[Any], Dict[str, Any]],
+) -> Iterator[Tuple[Any, Any]]:
+    return iter(node.items()) if isinstance(node, dict) else enumerate(node)
+
+
+def clean_empty_elements(
+    d: Union[List[Any], Dict[str, Any]], in_place: bool = False
+) -> Union[List[Any], Dict[str, Any]]:
+    """
+    Removes empty lists, empty dicts, empty strings and None elements (the FHIR rules for empty
+    values) in a single pass.  Same result as remove_empty_elements() but walks the tree with a
+    stack instead of recursion so very large or deeply nested resources (e.g., Bundles) work.
+
+    Dicts and lists that have nothing to remove are returned as is instead of being copied, and
+    dict types (e.g. OrderedDict) are kept.  With in_place=True the dicts and lists are modified
+    instead of copied so only use that on data you own.
+
+
+    :param d: dict or list to clean
+    :param in_place: whether to modify d instead of returning changed copies
+    :return: the cleaned dict or list
+    """
+    if not isinstance(d, (dict, list)):
+        return d
+    # the parents of node: [parent, children, index, kept, removed, key of node]
+    stack: List[List[Any]] = []
+    node: Union[List[Any], Dict[str, Any]] = d
+    children: Iterator[Tuple[Any, Any]] = _get_children(d)
+    # number of children of node handled so far
+    index: int = 0
+    # (key, value) of the children to keep.  This is only created when a child is removed or
+    # changed so unchanged nodes are not copied.  All children before that were unchanged.
+    kept: Optional[List[Tuple[Any, Any]]] = None
+    # keys (or indexes) of the children to remove when cleaning in place
+    removed: Optional[List[Any]] = None
+    while True:
+        descended: bool = False
+        for key, value in children:
+            if isinstance(value, (dict, list)):
+                if value:
+                    # clean the child first
+                    stack.append([node, children, index, kept, removed, key])
+                    node, children = value, _get_children(value)
+                    index, kept, removed = 0, None, None
+                    descended = True
+                    break
+                remove = True
+            else:
+                remove = value is None or value == ""
+            if remove:
+                if in_place:
+                    removed = removed or []
+                    removed.append(key)
+                elif kept is None:
+                    kept = list(islice(_get_children(node), index))
+            elif kept is not None:
+                kept.append((key, value))
+            index += 1
+        if descended:
+            continue
+
+        # all the children of node are done
+        result: Union[List[Any], Dict[str, Any]]
+        if in_place:
+            if removed is not None:
+                if isinstance(node, dict):
+                    for removed_key in removed:
+                        del node[removed_key]
+                else:
+                    removed_indexes = set(removed)
+                    node[:] = [
+                        v for i, v in enumerate(node) if i not in removed_indexes
+                    ]
+            result = node
+        elif kept is None:
+            result = node
+        elif isinstance(node, collections.OrderedDict):
+            result = collections.OrderedDict(kept)
+        elif isinstance(node, dict):
+            result = dict(kept)
+        else:
+            result = [v for _, v in kept]
+        if not stack:
+            return result
+
+        # go back to the parent and add the cleaned child
+        original = node
+        node, children, index, kept, removed, key = stack.pop()
+        if not result:
+            if in_place:
+                removed = removed or []
+                removed.append(key)
+            elif kept is None:
+                kept = list(islice(_get_children(node), index))
+        elif kept is not None:
+            kept.append((key, result))
+        elif result is not original:
+            kept = list(islice(_get_children(node), index))
+            kept.append((key, result))
+        index += 1
+
+
 def convert_dict_to_fhir_json(dict_: Dict[str, Any]) -> str:
     """
     Returns dictionary as json string
@@ -45,7 +149,7 @@ def convert_dict_to_fhir_json(dict_: Dict[str, Any]) -> str:
     :return:
     """
     instance_variables: Dict[str, Any] = cast(
-        Dict[str, Any], remove_empty_elements(dict_)
+        Dict[str, Any], clean_empty_elements(dict_)
     )
 
     instance_variables_text: str = json.dumps(instance_variables, default=json_serial)
@@ -0,0 +1,71 @@
+import dataclasses
+from operator import attrgetter
+from typing import Any, Callable, Dict, Tuple, Type
+
+
+class DataclassSerializerRegistry:
+    """
+    Caches a serializer per dataclass type.
+
+    dataclasses.asdict() walks every nested value and deep copies it on every call.  The
+    serializers here are built once per class from the dataclass fields and only read the
+    field values: nested dataclasses, enums and datetimes are left for the json encoder to
+    handle so the resulting json is the same as with asdict().
+    """
+
+    _serializers: Dict[Type[Any], Callable[[Any], Dict[str, Any]]] = {}
+
+    @classmethod
+    def register(
+        cls, type_: Type[Any], serializer: Callable[[Any], Dict[str, Any]]
+    ) -> None:
+        """
+        Registers a custom serializer for the given type
+
+
+        :param type_: type to register the serializer for
+        :param serializer: function that returns a dict for an instance of type_
+        """
+        cls._serializers[type_] = serializer
+
+    @classmethod
+    def get_serializer(cls, type_: Type[Any]) -> Callable[[Any], Dict[str, Any]]:
+        """
+        Returns the serializer for the given dataclass type, building it on first use
+
+
+        :param type_: dataclass type
+        :return: function that returns a (shallow) dict of the field values of an instance
+        """
+        serializer = cls._serializers.get(type_)
+        if serializer is None:
+            serializer = cls._build_serializer(type_)
+            cls._serializers[type_] = serializer
+        return serializer
+
+    @classmethod
+    def to_dict(cls, obj: Any) -> Dict[str, Any]:
+        """
+        Returns a dict of the field values of the given dataclass instance without copying
+        the values
+
+
+        :param obj: dataclass instance
+        :return: dict of field name to field value
+        """
+        return cls.get_serializer(type(obj))(obj)
+
+    @staticmethod
+    def _build_serializer(type_: Type[Any]) -> Callable[[Any], Dict[str, Any]]:
+        assert dataclasses.is_dataclass(type_), f"{type_} is not a dataclass"
+        names: Tuple[str, ...] = tuple(
+            field.name for field in dataclasses.fields(type_)
+        )
+        if len(names) == 0:
+            return lambda obj: {}
+        if len(names) == 1:
+            name: str = names[0]
+            return lambda obj: {name: getattr(obj, name)}
+        # attrgetter with multiple names reads all the fields in one C call
+        getter: Callable[[Any], Tuple[Any, ...]] = attrgetter(*names)
+        return lambda obj: dict(zip(names, getter(obj)))
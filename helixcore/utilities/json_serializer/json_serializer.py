@@ -4,6 +4,15 @@ from datetime import datetime, date
 from enum import Enum
 from typing import Any
 
+from helixcore.utilities.json_serializer.dataclass_serializer_registry import (
+    DataclassSerializerRegistry,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
 
 def json_serializer(obj: Any) -> str:
     """JSON serializer for objects not serializable by default json code"""
@@ -20,8 +29,10 @@ def json_serializer(obj: Any) -> str:
 
 class EnhancedJSONEncoder(json.JSONEncoder):
     def default(self, o: Any) -> Any:
-        if dataclasses.is_dataclass(o):
-            return dataclasses.asdict(o)  # type: ignore[arg-type]
+        if dataclasses.is_dataclass(o) and not isinstance(o, type):
+            # shallow dict: nested dataclasses come back through default() so the output
+            # is the same as dataclasses.asdict() without its recursive deep copy
+            return DataclassSerializerRegistry.to_dict(o)
         if isinstance(o, Enum):
             return o.value
         if isinstance(o, (datetime, date)):
@@ -29,3 +40,39 @@ class EnhancedJSONEncoder(json.JSONEncoder):
         if hasattr(o, "to_dict"):
             return o.to_dict()
         return super().default(o)
+
+
+def _orjson_default(o: Any) -> Any:
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return DataclassSerializerRegistry.to_dict(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat().replace("+00:00", ".000Z")
+    if hasattr(o, "to_dict"):
+        return o.to_dict()
+    raise TypeError(f"Type is not JSON serializable: {type(o).__name__}")
+
+
+def dumps_compact(obj: Any) -> str:
+    """
+    Serializes obj to compact json (no whitespace, non-ascii characters are not escaped)
+    using orjson if it is installed and the standard library otherwise.
+
+    Values are converted the same way as EnhancedJSONEncoder.  The output is NOT byte
+    identical to json.dumps(obj, cls=EnhancedJSONEncoder) since that uses ", " and ": "
+    as separators; use that when the exact text matters.
+
+
+    :param obj: object to serialize
+    :return: json text
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_orjson_default,
+            option=orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_NON_STR_KEYS,
+        ).decode("utf-8")
+    return json.dumps(
+        obj, cls=EnhancedJSONEncoder, separators=(",", ":"), ensure_ascii=False
+    )
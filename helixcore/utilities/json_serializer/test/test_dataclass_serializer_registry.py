@@ -0,0 +1,91 @@
+import dataclasses
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+from helixcore.structures.helix_personmatching.logics.test.match_score_factory import (
+    create_match_score,
+)
+from helixcore.structures.token_service_receiver.v3.connection_entry import (
+    ConnectionEntry,
+)
+from helixcore.utilities.json_serializer.dataclass_serializer_registry import (
+    DataclassSerializerRegistry,
+)
+from helixcore.utilities.json_serializer.json_serializer import (
+    EnhancedJSONEncoder,
+    dumps_compact,
+)
+
+
+class AsDictJSONEncoder(EnhancedJSONEncoder):
+    """
+    The encoder as it was before the serializer registry: uses dataclasses.asdict()
+    """
+
+    def default(self, o: Any) -> Any:
+        if dataclasses.is_dataclass(o) and not isinstance(o, type):
+            return dataclasses.asdict(o)
+        return super().default(o)
+
+
+def test_serializer_output_is_same_as_asdict() -> None:
+    match_score = create_match_score("source-1", "target-1")
+    connection_entry = ConnectionEntry(
+        id="1",
+        expiry=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        created_date="2023-01-02T03:04:05",
+        token_payload={"epic.eci": "abc"},
+    )
+
+    for obj in [
+        match_score,
+        match_score.rule_scores[0],
+        match_score.source,
+        {"match": match_score, "entries": [connection_entry]},
+        connection_entry,
+    ]:
+        assert json.dumps(obj, cls=EnhancedJSONEncoder) == json.dumps(
+            obj, cls=AsDictJSONEncoder
+        )
+
+    assert json.loads(
+        match_score.to_json(include_diagnostics=True, include_rule_scores=True)
+    ) == json.loads(json.dumps(match_score.__dict__, cls=AsDictJSONEncoder))
+    assert connection_entry.to_json() == json.dumps(
+        connection_entry.to_dict(), cls=AsDictJSONEncoder
+    )
+
+
+def test_serializer_is_cached_per_class() -> None:
+    match_score = create_match_score("source-1", "target-1")
+    serializer = DataclassSerializerRegistry.get_serializer(type(match_score))
+    assert DataclassSerializerRegistry.get_serializer(type(match_score)) is serializer
+    result = DataclassSerializerRegistry.to_dict(match_score)
+    # values are not copied
+    assert result["source"] is match_score.source
+    assert list(result.keys()) == [
+        field.name for field in dataclasses.fields(match_score)
+    ]
+
+
+def test_dumps_compact() -> None:
+    match_score = create_match_score("source-1", "target-1")
+    connection_entry = ConnectionEntry(
+        id="1", expiry=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    )
+    obj = {"match": match_score, "entry": connection_entry, 1: "one"}
+
+    compact = dumps_compact(obj)
+    assert json.loads(compact) == json.loads(json.dumps(obj, cls=EnhancedJSONEncoder))
+    assert json.loads(compact)["entry"]["expiry"] == "2024-01-02T03:04:05.000Z"
+
+
+def test_dumps_compact_without_orjson(monkeypatch: Any) -> None:
+    from helixcore.utilities.json_serializer import json_serializer
+
+    match_score = create_match_score("source-1", "target-1")
+    with_orjson = dumps_compact(match_score)
+    monkeypatch.setattr(json_serializer, "orjson", None)
+    without_orjson = dumps_compact(match_score)
+    assert json.loads(without_orjson) == json.loads(with_orjson)
@@ -1,20 +1,21 @@
 from abc import ABC, abstractmethod
 from logging import Logger
 from types import TracebackType
-from typing import Any, Dict, List, Type, Sequence, Optional
-
-from helixtelemetry.telemetry.structures.telemetry_parent import (
-    TelemetryParent,
-)
-from helixtelemetry.telemetry.spans.telemetry_span_creator import (
-    TelemetrySpanCreator,
-)
+from typing import Any, Dict, List, Type, Sequence, Optional, TYPE_CHECKING
 
 from helixcore.utilities.metrics.base_metrics import BaseMetric
 from helixcore.utilities.metrics.writer.base_metrics_writer_parameters import (
     BaseMetricsWriterParameters,
 )
 
+if TYPE_CHECKING:
+    from helixtelemetry.telemetry.structures.telemetry_parent import (
+        TelemetryParent,
+    )
+    from helixtelemetry.telemetry.spans.telemetry_span_creator import (
+        TelemetrySpanCreator,
+    )
+
 
 class BaseMetricsWriterAsync(ABC):
     def __init__(
@@ -22,7 +23,7 @@ class BaseMetricsWriterAsync(ABC):
         *,
         parameters: BaseMetricsWriterParameters,
         logger: Optional[Logger],
-        telemetry_span_creator: TelemetrySpanCreator,
+        telemetry_span_creator: "TelemetrySpanCreator",
     ) -> None:
         assert parameters is not None, "parameters should not be None"
         assert isinstance(
@@ -61,13 +62,13 @@ class BaseMetricsWriterAsync(ABC):
         self,
         *,
         metric_type: Type[BaseMetric],
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> None:
         pass
 
     @abstractmethod
     async def write_single_metric_to_table_async(
-        self, *, metric: BaseMetric, telemetry_parent: Optional[TelemetryParent]
+        self, *, metric: BaseMetric, telemetry_parent: Optional["TelemetryParent"]
     ) -> Optional[int]:
         pass
 
@@ -76,7 +77,7 @@ class BaseMetricsWriterAsync(ABC):
         self,
         *,
         metrics: Sequence[BaseMetric],
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> Optional[int]:
         pass
 
@@ -85,6 +86,6 @@ class BaseMetricsWriterAsync(ABC):
         self,
         *,
         metric: BaseMetric,
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> List[Dict[str, Any]]:
         pass
@@ -1,16 +1,6 @@
 from logging import Logger
 from types import TracebackType
-from typing import Any, Dict, List, Type, Sequence, Optional, override
-
-from helixtelemetry.telemetry.metrics.telemetry_counter import (
-    TelemetryCounter,
-)
-from helixtelemetry.telemetry.structures.telemetry_parent import (
-    TelemetryParent,
-)
-from helixtelemetry.telemetry.spans.telemetry_span_creator import (
-    TelemetrySpanCreator,
-)
+from typing import Any, Dict, List, Type, Sequence, Optional, override, TYPE_CHECKING
 
 from helixcore.utilities.metrics.base_metrics import BaseMetric
 from helixcore.utilities.metrics.writer.base_metrics_writer_async import (
@@ -23,6 +13,17 @@ from helixcore.utilities.mysql.my_sql_writer.v2.my_sql_writer import MySqlWriter
 from helixcore.utilities.telemetry.telemetry_attributes import TelemetryAttributes
 from helixcore.utilities.telemetry.telemetry_metric_names import TelemetryMetricNames
 
+if TYPE_CHECKING:
+    from helixtelemetry.telemetry.metrics.telemetry_counter import (
+        TelemetryCounter,
+    )
+    from helixtelemetry.telemetry.structures.telemetry_parent import (
+        TelemetryParent,
+    )
+    from helixtelemetry.telemetry.spans.telemetry_span_creator import (
+        TelemetrySpanCreator,
+    )
+
 
 class MetricsWriter(BaseMetricsWriterAsync):
     def __init__(
@@ -30,7 +31,7 @@ class MetricsWriter(BaseMetricsWriterAsync):
         *,
         parameters: BaseMetricsWriterParameters,
         logger: Optional[Logger],
-        telemetry_span_creator: TelemetrySpanCreator,
+        telemetry_span_creator: "TelemetrySpanCreator",
     ) -> None:
         """
         This class writes metrics to the database
@@ -88,7 +89,7 @@ class MetricsWriter(BaseMetricsWriterAsync):
         self,
         *,
         metric_type: Type[BaseMetric],
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> None:
         """
         Creates the table if it does not exist
@@ -133,7 +134,7 @@ class MetricsWriter(BaseMetricsWriterAsync):
 
     @override
     async def write_single_metric_to_table_async(
-        self, *, metric: BaseMetric, telemetry_parent: Optional[TelemetryParent]
+        self, *, metric: BaseMetric, telemetry_parent: Optional["TelemetryParent"]
     ) -> Optional[int]:
         """
         Writes a single metric to the database
@@ -151,7 +152,7 @@ class MetricsWriter(BaseMetricsWriterAsync):
         self,
         *,
         metrics: Sequence[BaseMetric],
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> Optional[int]:
         """
         Writes the data to the table
@@ -239,7 +240,7 @@ class MetricsWriter(BaseMetricsWriterAsync):
         self,
         *,
         metric: BaseMetric,
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> List[Dict[str, Any]]:
         """
         Reads the data from the table
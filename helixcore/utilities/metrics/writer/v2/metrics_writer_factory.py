@@ -1,10 +1,6 @@
 from contextlib import nullcontext
 from logging import Logger
-from typing import Optional, cast
-
-from helixtelemetry.telemetry.spans.telemetry_span_creator import (
-    TelemetrySpanCreator,
-)
+from typing import Optional, cast, TYPE_CHECKING
 
 from helixcore.utilities.metrics.writer.base_metrics_writer_async import (
     BaseMetricsWriterAsync,
@@ -17,6 +13,11 @@ from helixcore.utilities.metrics.writer.v2.metrics_writer_parallel import (
     MetricsWriterParallel,
 )
 
+if TYPE_CHECKING:
+    from helixtelemetry.telemetry.spans.telemetry_span_creator import (
+        TelemetrySpanCreator,
+    )
+
 
 class MetricsWriterFactory:
     def __init__(
@@ -42,7 +43,7 @@ class MetricsWriterFactory:
         self.parameters: Optional[BaseMetricsWriterParameters] = parameters
 
     def create_metrics_writer(
-        self, *, telemetry_span_creator: TelemetrySpanCreator
+        self, *, telemetry_span_creator: "TelemetrySpanCreator"
     ) -> BaseMetricsWriterAsync:
         """
         Creates a metrics writer
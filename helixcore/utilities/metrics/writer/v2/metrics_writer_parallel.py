@@ -1,16 +1,16 @@
 import logging
 from logging import Logger
 from types import TracebackType
-from typing import Any, Dict, List, Type, Sequence, Optional, Tuple, override
-
-from helixtelemetry.telemetry.metrics.telemetry_counter import (
-    TelemetryCounter,
-)
-from helixtelemetry.telemetry.structures.telemetry_parent import (
-    TelemetryParent,
-)
-from helixtelemetry.telemetry.spans.telemetry_span_creator import (
-    TelemetrySpanCreator,
+from typing import (
+    Any,
+    Dict,
+    List,
+    Type,
+    Sequence,
+    Optional,
+    Tuple,
+    override,
+    TYPE_CHECKING,
 )
 
 from helixcore.utilities.async_safe_buffer.v1.async_safe_buffer import AsyncSafeBuffer
@@ -25,6 +25,17 @@ from helixcore.utilities.mysql.my_sql_writer.v2.my_sql_writer import MySqlWriter
 from helixcore.utilities.telemetry.telemetry_attributes import TelemetryAttributes
 from helixcore.utilities.telemetry.telemetry_metric_names import TelemetryMetricNames
 
+if TYPE_CHECKING:
+    from helixtelemetry.telemetry.metrics.telemetry_counter import (
+        TelemetryCounter,
+    )
+    from helixtelemetry.telemetry.structures.telemetry_parent import (
+        TelemetryParent,
+    )
+    from helixtelemetry.telemetry.spans.telemetry_span_creator import (
+        TelemetrySpanCreator,
+    )
+
 
 class MetricsWriterParallel(BaseMetricsWriterAsync):
     def __init__(
@@ -32,7 +43,7 @@ class MetricsWriterParallel(BaseMetricsWriterAsync):
         *,
         parameters: BaseMetricsWriterParameters,
         logger: Optional[Logger],
-        telemetry_span_creator: TelemetrySpanCreator,
+        telemetry_span_creator: "TelemetrySpanCreator",
     ) -> None:
         """
         This class writes metrics to the database
@@ -89,7 +100,7 @@ class MetricsWriterParallel(BaseMetricsWriterAsync):
         self,
         *,
         metric_type: Type[BaseMetric],
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> None:
         """
         Creates the table if it does not exist
@@ -131,7 +142,7 @@ class MetricsWriterParallel(BaseMetricsWriterAsync):
             self.tables_created_for_metric[metric_name] = True
 
     async def write_single_metric_to_table_async(
-        self, *, metric: BaseMetric, telemetry_parent: Optional[TelemetryParent]
+        self, *, metric: BaseMetric, telemetry_parent: Optional["TelemetryParent"]
     ) -> Optional[int]:
         """
         Writes a single metric to the database
@@ -170,7 +181,7 @@ class MetricsWriterParallel(BaseMetricsWriterAsync):
         self,
         *,
         metrics: Sequence[BaseMetric],
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> Optional[int]:
         """
         writes metrics to table if the buffer length is exceeded.  Otherwise, just adds to buffer and returns
@@ -210,7 +221,7 @@ class MetricsWriterParallel(BaseMetricsWriterAsync):
     async def flush_async(
         self,
         *,
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> None:
         count_of_metrics_in_buffer = await self.get_count_of_metrics_in_buffer_async()
         if count_of_metrics_in_buffer > 0:
@@ -246,7 +257,7 @@ class MetricsWriterParallel(BaseMetricsWriterAsync):
         self,
         *,
         count: Optional[int],
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> Optional[int]:
         """
         Writes the data to the table
@@ -347,7 +358,7 @@ class MetricsWriterParallel(BaseMetricsWriterAsync):
         self,
         *,
         metric: BaseMetric,
-        telemetry_parent: Optional[TelemetryParent],
+        telemetry_parent: Optional["TelemetryParent"],
     ) -> List[Dict[str, Any]]:
         """
         Reads the data from the table
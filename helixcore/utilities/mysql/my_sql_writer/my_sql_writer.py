@@ -1,4 +1,5 @@
 import os
+from functools import cached_property
 from logging import Logger
 from typing import Dict, Any, Optional, List, cast
 
@@ -30,17 +31,23 @@ class MySqlWriter:
         self.db_config: Dict[str, Any] = get_mysql_config(
             "warehouse", env=env, default_schema=schema_name
         )
-        self.jdbc_url: str = construct_mysql_connection_string(
-            params={"rewriteBatchedStatements": "true"},
-            protocol="jdbc:mysql",
-            **self.db_config,
-        )
         self.username = self.db_config["username"]
         self.password = self.db_config["password"]
         self.host = self.db_config["host"]
         self.port = int(self.db_config["port"])
         self.schema_name: str = schema_name
 
+    @cached_property
+    def jdbc_url(self) -> str:
+        """
+        JDBC url of the database.  Only built when it is used.
+        """
+        return construct_mysql_connection_string(
+            params={"rewriteBatchedStatements": "true"},
+            protocol="jdbc:mysql",
+            **self.db_config,
+        )
+
     def drop_database(self, *, logger: Optional[Logger] = None) -> None:
         """
         Deletes the database
@@ -1,5 +1,6 @@
 import logging
 import os
+from functools import cached_property
 from asyncio import Lock
 from contextlib import nullcontext
 from logging import Logger
@@ -32,11 +33,6 @@ class MySqlWriter:
         self.db_config: Dict[str, Any] = get_mysql_config(
             "warehouse", env=env, default_schema=schema_name
         )
-        self.jdbc_url: str = construct_mysql_connection_string(
-            params={"rewriteBatchedStatements": "true"},
-            protocol="jdbc:mysql",
-            **self.db_config,
-        )
         self.username = self.db_config["username"]
         self.password = self.db_config["password"]
         self.host = self.db_config["host"]
@@ -46,6 +42,17 @@ class MySqlWriter:
         self.max_batch_size: Optional[int] = max_batch_size
         self._connection_pool_lock: Lock = Lock()
 
+    @cached_property
+    def jdbc_url(self) -> str:
+        """
+        JDBC url of the database.  Only built when it is used.
+        """
+        return construct_mysql_connection_string(
+            params={"rewriteBatchedStatements": "true"},
+            protocol="jdbc:mysql",
+            **self.db_config,
+        )
+
     async def get_connection_pool_async(self) -> Pool:
         async with self._connection_pool_lock:
             if self._connection_pool is None:
@@ -1,7 +1,11 @@
 import os
+import threading
+import time
+
 import structlog
-from typing import Dict, Any, Optional, List, Set
+from typing import Dict, Any, Optional, List, Set, Tuple
 
+from helixcore.utilities.aws.config import SSM_CONFIG_CACHE_TTL_SECONDS
 from helixcore.utilities.aws_helpers.ssm_helper import (
     get_ssm_config_with_env_var,
 )
@@ -16,6 +20,15 @@ CONNECTION_CONFIG_KEYS: Set[str] = {
     "port",
 }
 
+# how long a resolved config is reused.  Same as the SSM cache so rotated credentials are picked up.
+MYSQL_CONFIG_CACHE_TTL_SECONDS: float = SSM_CONFIG_CACHE_TTL_SECONDS
+
+# (db_name, env, default_schema, read from environment variables only) -> (time.monotonic() when resolved, config)
+_mysql_config_cache: Dict[
+    Tuple[str, str, Optional[str], bool], Tuple[float, Dict[str, Any]]
+] = {}
+_mysql_config_cache_lock: threading.Lock = threading.Lock()
+
 
 def _remove_excess_config_keys(config: Dict[str, Any]) -> None:
     for key in list(config.keys()):
@@ -95,7 +108,10 @@ def _get_or_override_mysql_config_from_environment_variables(
 
 
 def get_mysql_config(
-    db_name: str, env: Optional[str] = None, default_schema: Optional[str] = None
+    db_name: str,
+    env: Optional[str] = None,
+    default_schema: Optional[str] = None,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
     """
     Returns a dict containing connection information for the given database and environment.
@@ -104,6 +120,12 @@ def get_mysql_config(
     no such environment variable exists.
 
     Allows overriding of SSM values using environment variables
+
+    The resolved config is cached per (db_name, env, default_schema) for MYSQL_CONFIG_CACHE_TTL_SECONDS so
+    creating many writers does not read the environment and SSM again.  Use invalidate_mysql_config_cache()
+    after changing the environment variables.
+
+    :param use_cache: set to False to always resolve the config
     """
     env_str: str
     if env is None:
@@ -111,8 +133,25 @@ def get_mysql_config(
     else:
         env_str = str(env)
 
+    from_environment_variables: bool = env == "local"
+    cache_key: Tuple[str, str, Optional[str], bool] = (
+        db_name,
+        env_str,
+        default_schema,
+        from_environment_variables,
+    )
+    if use_cache:
+        cached: Optional[Tuple[float, Dict[str, Any]]] = _mysql_config_cache.get(
+            cache_key
+        )
+        if (
+            cached is not None
+            and time.monotonic() - cached[0] < MYSQL_CONFIG_CACHE_TTL_SECONDS
+        ):
+            return dict(cached[1])
+
     mysql_config: Dict[str, Any]
-    if env == "local":
+    if from_environment_variables:
         mysql_config = _get_mysql_config_from_environment_variables(
             db_name, default_schema=default_schema
         )
@@ -125,9 +164,24 @@ def get_mysql_config(
             config=mysql_config, default_schema=default_schema, db_name=db_name
         )
 
+    with _mysql_config_cache_lock:
+        _mysql_config_cache[cache_key] = (time.monotonic(), dict(mysql_config))
     return mysql_config
 
 
+def invalidate_mysql_config_cache(db_name: Optional[str] = None) -> None:
+    """
+    Removes the cached configs for the database (or all databases) so the next call to
+    get_mysql_config() resolves them again
+
+    :param db_name: optional database name
+    """
+    with _mysql_config_cache_lock:
+        for cache_key in list(_mysql_config_cache.keys()):
+            if db_name is None or cache_key[0] == db_name:
+                del _mysql_config_cache[cache_key]
+
+
 def construct_mysql_connection_string(
     host: Optional[str] = None,
     port: Optional[str] = None,
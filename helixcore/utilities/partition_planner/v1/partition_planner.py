@@ -0,0 +1,226 @@
+import heapq
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from helixcore.utilities.async_pandas_udf.v1.async_pandas_udf_parameters import (
+    AsyncPandasUdfParameters,
+)
+from helixcore.utilities.aws.instance_helper.v1.instance_helper import (
+    InstanceHelper,
+    InstanceInfo,
+)
+
+T = TypeVar("T")
+
+# partitions per executor core so a slow partition at the end does not leave cores idle
+PARTITIONS_PER_CORE: int = 2
+# estimated memory used while processing one token (the patient's resources, requests and metrics)
+MEMORY_PER_TOKEN_MIB: float = 8.0
+# fraction of the executor memory available to the partitions
+EXECUTOR_MEMORY_FRACTION: float = 0.6
+# maximum concurrent requests to one source system (slug) across the whole cluster
+MAX_CONCURRENT_REQUESTS_PER_SLUG: int = 200
+
+
+@dataclass
+class PartitionPlan:
+    """
+    The partitioning and concurrency to use for a run
+    """
+
+    partition_count: int
+    """ number of partitions to split the tokens into """
+
+    chunk_size: int
+    """ number of tokens in each chunk of a partition.  Use as AsyncPandasUdfParameters.max_chunk_size """
+
+    max_concurrent_requests: int
+    """ maximum concurrent requests from each partition.  Use as PatientAccessRunContext.max_concurrent_requests """
+
+    tokens_per_partition: int
+    """ expected (maximum) number of tokens in each partition """
+
+    concurrent_partitions: int
+    """ number of partitions running at the same time on the cluster """
+
+    slug_shares: Dict[str, float] = field(default_factory=dict)
+    """ fraction of the tokens for each slug """
+
+    def get_pandas_udf_parameters(
+        self, pandas_udf_parameters: AsyncPandasUdfParameters
+    ) -> AsyncPandasUdfParameters:
+        """
+        Returns a copy of the parameters with the planned chunk size and concurrency
+
+        :param pandas_udf_parameters: parameters to copy
+        """
+        return AsyncPandasUdfParameters(
+            max_chunk_size=self.chunk_size,
+            process_chunks_in_parallel=pandas_udf_parameters.process_chunks_in_parallel,
+            log_level=pandas_udf_parameters.log_level,
+            maximum_concurrent_tasks=min(
+                pandas_udf_parameters.maximum_concurrent_tasks,
+                self.max_concurrent_requests,
+            ),
+        )
+
+
+class PartitionPlanner:
+    @staticmethod
+    def plan(
+        *,
+        token_count: int,
+        tokens_per_slug: Optional[Dict[str, int]],
+        number_of_executors: int,
+        pandas_udf_parameters: AsyncPandasUdfParameters,
+        instance_type: Optional[str] = None,
+        instance_info: Optional[InstanceInfo] = None,
+        cores_per_executor: Optional[int] = None,
+        partitions_per_core: int = PARTITIONS_PER_CORE,
+        memory_per_token_mib: float = MEMORY_PER_TOKEN_MIB,
+        executor_memory_fraction: float = EXECUTOR_MEMORY_FRACTION,
+        max_concurrent_requests_per_slug: int = MAX_CONCURRENT_REQUESTS_PER_SLUG,
+    ) -> PartitionPlan:
+        """
+        Plans the partitions and concurrency for a run (used when TokenStreamingConfig.enable_automatic_partitions
+        is set).
+
+        - Enough partitions to keep every core busy (partitions_per_core per core) and few enough tokens in each
+          that the partitions running at the same time on an executor fit in its memory.
+        - Chunks no larger than max_chunk_size.
+        - Concurrent requests per partition limited so that, even for the hottest slug, the cluster does not send
+          more than max_concurrent_requests_per_slug requests at the same time to one source system.
+
+        Use distribute_by_slug() to spread the tokens of each slug evenly across the partitions.
+
+        :param token_count: number of tokens in the run
+        :param tokens_per_slug: number of tokens for each slug
+        :param number_of_executors: number of Spark executors
+        :param pandas_udf_parameters: limits on chunk size and concurrent tasks
+        :param instance_type: EC2 instance type of the executors.  Looked up with InstanceHelper
+        :param instance_info: memory and cores of the executors.  Takes precedence over instance_type
+        :param cores_per_executor: cores used per executor.  Defaults to the vCPUs of the instance
+        :param partitions_per_core: partitions per core
+        :param memory_per_token_mib: estimated memory used to process one token
+        :param executor_memory_fraction: fraction of the executor memory available to the partitions
+        :param max_concurrent_requests_per_slug: maximum concurrent requests to one slug across the cluster
+        """
+        assert (
+            number_of_executors > 0
+        ), f"number_of_executors should be > 0 but is {number_of_executors}"
+        if instance_info is None and instance_type is not None:
+            instance_info = InstanceHelper.get_instance_info(
+                instance_type=instance_type
+            )
+        cores: int = max(
+            cores_per_executor or (instance_info.vcpus if instance_info else 1), 1
+        )
+        total_cores: int = number_of_executors * cores
+
+        partition_count: int = max(total_cores * partitions_per_core, 1)
+        if instance_info is not None:
+            # every core of the executor runs a partition at the same time
+            max_tokens_per_partition: int = max(
+                int(
+                    instance_info.memory_in_mib
+                    * executor_memory_fraction
+                    / cores
+                    / memory_per_token_mib
+                ),
+                1,
+            )
+            partition_count = max(
+                partition_count, math.ceil(token_count / max_tokens_per_partition)
+            )
+        # no empty partitions
+        partition_count = max(min(partition_count, token_count), 1)
+        tokens_per_partition: int = math.ceil(token_count / partition_count)
+
+        chunk_size: int = max(
+            min(pandas_udf_parameters.max_chunk_size, tokens_per_partition), 1
+        )
+
+        slug_shares: Dict[str, float] = (
+            {
+                slug: count / token_count
+                for slug, count in tokens_per_slug.items()
+                if count > 0
+            }
+            if tokens_per_slug and token_count > 0
+            else {}
+        )
+        concurrent_partitions: int = min(partition_count, total_cores)
+        max_concurrent_requests: int = pandas_udf_parameters.maximum_concurrent_tasks
+        if slug_shares:
+            # tokens of each slug are spread evenly across the partitions so the hottest slug gets its share of
+            # the requests of every running partition
+            hottest_share: float = max(slug_shares.values())
+            max_concurrent_requests = min(
+                max_concurrent_requests,
+                int(
+                    max_concurrent_requests_per_slug
+                    / (concurrent_partitions * hottest_share)
+                ),
+            )
+        max_concurrent_requests = max(
+            min(max_concurrent_requests, tokens_per_partition), 1
+        )
+
+        return PartitionPlan(
+            partition_count=partition_count,
+            chunk_size=chunk_size,
+            max_concurrent_requests=max_concurrent_requests,
+            tokens_per_partition=tokens_per_partition,
+            concurrent_partitions=concurrent_partitions,
+            slug_shares=slug_shares,
+        )
+
+    @staticmethod
+    def distribute_by_slug(
+        *,
+        items: List[T],
+        get_slug: Callable[[T], Optional[str]],
+        partition_count: int,
+    ) -> List[List[T]]:
+        """
+        Splits the items into partitions so each slug is spread evenly across the partitions instead of
+        one source system filling a partition.  Slugs are interleaved in proportion to their size and the
+        interleaved items are split into partitions whose sizes differ by at most one.
+
+        :param items: items to split e.g., ConnectionEntry
+        :param get_slug: returns the slug of an item
+        :param partition_count: number of partitions
+        """
+        assert (
+            partition_count > 0
+        ), f"partition_count should be > 0 but is {partition_count}"
+        items_by_slug: Dict[Optional[str], Deque[T]] = {}
+        for item in items:
+            items_by_slug.setdefault(get_slug(item), deque()).append(item)
+        # take from each slug in proportion to its size so hot slugs are spread over the whole sequence:
+        # always take the next item from the slug that is furthest behind its even spread
+        queues: List[Deque[T]] = list(items_by_slug.values())
+        sizes: List[int] = [len(queue) for queue in queues]
+        heap: List[Tuple[float, int]] = [
+            (1 / size, index) for index, size in enumerate(sizes)
+        ]
+        heapq.heapify(heap)
+        interleaved: List[T] = []
+        while heap:
+            _, index = heapq.heappop(heap)
+            queue: Deque[T] = queues[index]
+            interleaved.append(queue.popleft())
+            if queue:
+                taken: int = sizes[index] - len(queue)
+                heapq.heappush(heap, ((taken + 1) / sizes[index], index))
+        # contiguous slices of the interleaved items keep each slug's share in every partition
+        size, remainder = divmod(len(interleaved), partition_count)
+        partitions: List[List[T]] = []
+        start: int = 0
+        for partition_index in range(partition_count):
+            stop: int = start + size + (1 if partition_index < remainder else 0)
+            partitions.append(interleaved[start:stop])
+            start = stop
+        return partitions
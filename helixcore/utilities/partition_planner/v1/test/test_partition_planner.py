@@ -0,0 +1,103 @@
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import pytest
+from moto import mock_aws
+
+from helixcore.utilities.async_pandas_udf.v1.async_pandas_udf_parameters import (
+    AsyncPandasUdfParameters,
+)
+from helixcore.utilities.aws.instance_helper.v1.instance_helper import (
+    InstanceHelper,
+    InstanceInfo,
+)
+from helixcore.utilities.partition_planner.v1.partition_planner import (
+    PartitionPlanner,
+)
+
+
+def test_plan() -> None:
+    # 4 executors with 8 cores and 32 GiB
+    instance_info = InstanceInfo(
+        instance_type="m5.2xlarge", memory_in_mib=32 * 1024, vcpus=8
+    )
+    tokens_per_slug: Dict[str, int] = {
+        "epic": 60_000,
+        "cerner": 30_000,
+        "athena": 10_000,
+    }
+    plan = PartitionPlanner.plan(
+        token_count=100_000,
+        tokens_per_slug=tokens_per_slug,
+        number_of_executors=4,
+        pandas_udf_parameters=AsyncPandasUdfParameters(
+            max_chunk_size=100, maximum_concurrent_tasks=100
+        ),
+        instance_info=instance_info,
+    )
+    # memory allows 32 * 1024 * 0.6 / 8 / 8 = 307 tokens per partition
+    assert plan.partition_count == 326
+    assert plan.tokens_per_partition == 307
+    assert plan.chunk_size == 100
+    assert plan.concurrent_partitions == 32
+    # 32 partitions * 0.6 of the requests to epic must stay under 200
+    assert plan.max_concurrent_requests == 10
+    assert plan.max_concurrent_requests * 32 * 0.6 <= 200
+    assert (
+        plan.get_pandas_udf_parameters(AsyncPandasUdfParameters()).max_chunk_size == 100
+    )
+
+    small_plan = PartitionPlanner.plan(
+        token_count=10,
+        tokens_per_slug=None,
+        number_of_executors=2,
+        pandas_udf_parameters=AsyncPandasUdfParameters(),
+        cores_per_executor=4,
+    )
+    assert small_plan.partition_count == 10
+    assert small_plan.chunk_size == 1
+    assert small_plan.max_concurrent_requests == 1
+
+
+def test_plan_looks_up_instance_type(monkeypatch: pytest.MonkeyPatch) -> None:
+    InstanceHelper.instance_info_cache.clear()
+    InstanceHelper.instance_memory_cache.clear()
+    # the region only applies to this test
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        plan = PartitionPlanner.plan(
+            token_count=1000,
+            tokens_per_slug=None,
+            number_of_executors=1,
+            pandas_udf_parameters=AsyncPandasUdfParameters(),
+            instance_type="m5.large",
+        )
+        assert InstanceHelper.get_instance_memory(instance_type="m5.large") == "8.0g"
+        # callers can still prime the memory cache
+        InstanceHelper.instance_memory_cache["m5.custom"] = "3.0g"
+        assert InstanceHelper.get_instance_memory(instance_type="m5.custom") == "3.0g"
+    InstanceHelper.instance_info_cache.clear()
+    InstanceHelper.instance_memory_cache.clear()
+    # 2 vcpus
+    assert plan.concurrent_partitions == 2
+    assert plan.partition_count == 4
+
+
+def test_distribute_by_slug() -> None:
+    items: List[Tuple[str, int]] = (
+        [("epic", i) for i in range(60)]
+        + [("cerner", i) for i in range(30)]
+        + [("athena", i) for i in range(10)]
+    )
+    partitions = PartitionPlanner.distribute_by_slug(
+        items=items, get_slug=lambda item: item[0], partition_count=10
+    )
+    assert sorted(item for partition in partitions for item in partition) == sorted(
+        items
+    )
+    for partition in partitions:
+        assert len(partition) == 10
+        counts = Counter(slug for slug, _ in partition)
+        assert 5 <= counts["epic"] <= 7
+        assert 2 <= counts["cerner"] <= 4
+        assert counts["athena"] <= 2
@@ -1,13 +1,16 @@
 from collections import OrderedDict
-from typing import List, Any, Dict, Optional
+from typing import List, Any, Dict, Optional, Sequence
 
+from helixcore.structures.helix_personmatching.logics.compact_rule_score import (
+    CompactRuleScore,
+)
 from helixcore.structures.helix_personmatching.logics.rule_score import RuleScore
 
 
 class ScoreDiagnosticsGenerator:
     @staticmethod
     def generate_diagnostics(
-        rule_scores: List[RuleScore],
+        rule_scores: Sequence[RuleScore | CompactRuleScore],
     ) -> List[OrderedDict[str, Any]]:
         """
         Generates diagnostics for the given rule scores.
@@ -0,0 +1,282 @@
+import random
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import (
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    override,
+)
+
+from helixtelemetry.telemetry.providers.telemetry import Telemetry
+from helixtelemetry.telemetry.spans.null_telemetry_span_wrapper import (
+    NullTelemetrySpanWrapper,
+)
+from helixtelemetry.telemetry.spans.telemetry_span_creator import (
+    TelemetrySpanCreator,
+)
+from helixtelemetry.telemetry.spans.telemetry_span_wrapper import (
+    TelemetrySpanWrapper,
+)
+from helixtelemetry.telemetry.structures.telemetry_attribute_value import (
+    TelemetryAttributeValue,
+)
+from helixtelemetry.telemetry.structures.telemetry_parent import (
+    TelemetryParent,
+)
+
+from helixcore.utilities.telemetry.telemetry_attributes import TelemetryAttributes
+from helixcore.utilities.telemetry.telemetry_sampling_config import (
+    TelemetrySamplingConfig,
+)
+from helixcore.utilities.telemetry.telemetry_span_rollup import TelemetrySpanRollup
+
+# set on the telemetry parents created from a span that was not sampled so its children are not sampled
+# either.  Stored in the instance __dict__ (not a dataclass field) so it is not serialized or exported
+SAMPLED_OUT_KEY: str = "_telemetry_sampled_out"
+
+RollupKey = Tuple[str, Optional[str], Optional[str]]
+
+# number of rollups (one per span name and parent) kept before the least recently used one is emitted
+MAX_ROLLUPS: int = 1000
+
+
+class SampledOutTelemetrySpanWrapper(NullTelemetrySpanWrapper):
+    """
+    Null span returned for spans that are not sampled (or are rolled up).  Keeps the parent's trace and
+    span ids and marks the child telemetry parents so the children of the span are not sampled either.
+    """
+
+    @override
+    def create_child_telemetry_parent(
+        self,
+        *,
+        attributes: Mapping[str, TelemetryAttributeValue] | None = None,
+        include_parent_attributes: bool = True,
+    ) -> TelemetryParent | None:
+        child_telemetry_parent: Optional[
+            TelemetryParent
+        ] = super().create_child_telemetry_parent(
+            attributes=attributes,
+            include_parent_attributes=include_parent_attributes,
+        )
+        if child_telemetry_parent is not None:
+            child_telemetry_parent.__dict__[SAMPLED_OUT_KEY] = True
+        return child_telemetry_parent
+
+
+class SampledTelemetrySpanCreator(TelemetrySpanCreator):
+    def __init__(
+        self,
+        *,
+        telemetry: Optional[Telemetry],
+        sampling_config: TelemetrySamplingConfig,
+        run_id: str,
+        log_level: str = "DEBUG",
+        random_function: Callable[[], float] = random.random,
+        max_rollups: int = MAX_ROLLUPS,
+    ) -> None:
+        """
+        Span creator that applies head sampling.  Spans that are not sampled skip the telemetry provider
+        completely and get a SampledOutTelemetrySpanWrapper that keeps the parent's trace and span ids.
+        Sampled spans get the sample rate as an attribute so the backend can scale counts.
+
+        The decision is made per span with random_function so a span name with a rate of 0.5 keeps about
+        half of its spans.  The children of a dropped span are always dropped.
+
+        Spans named in sampling_config.rollup_span_names are not created.  They are tracked in a
+        TelemetrySpanRollup per parent and emitted as one span by emit_rollups_async() (called by flush_async()).
+        When more than max_rollups parents are tracked, the least recently used rollup is emitted early.
+
+        :param telemetry: telemetry to create the sampled spans with
+        :param sampling_config: sampling configuration
+        :param run_id: id of the run.  Used for the per run sampling decision
+        :param random_function: returns a float in [0, 1).  Can be replaced in tests
+        :param max_rollups: maximum number of rollups kept until the next flush
+        """
+        super().__init__(telemetry=telemetry, log_level=log_level)
+        self.sampling_config: TelemetrySamplingConfig = sampling_config
+        self.is_run_sampled: bool = sampling_config.is_run_sampled(run_id=run_id)
+        self._random_function: Callable[[], float] = random_function
+        self._sample_rates: Dict[str, float] = {}
+        self._rollup_span_names: Set[str] = set(sampling_config.rollup_span_names or [])
+        self.max_rollups: int = max_rollups
+        self.rollups: OrderedDict[
+            RollupKey, Tuple[TelemetrySpanRollup, Optional[TelemetryParent]]
+        ] = OrderedDict()
+        # emits the rollup spans without applying sampling or rollups to them again
+        self._rollup_span_creator: TelemetrySpanCreator = TelemetrySpanCreator(
+            telemetry=telemetry, log_level=log_level
+        )
+
+    @staticmethod
+    def is_sampled_out(telemetry_parent: Optional[TelemetryParent]) -> bool:
+        """
+        Returns whether the telemetry parent was created from a span that was not sampled
+
+        :param telemetry_parent: telemetry parent
+        """
+        return telemetry_parent is not None and bool(
+            telemetry_parent.__dict__.get(SAMPLED_OUT_KEY)
+        )
+
+    def get_sample_rate(
+        self, *, name: str, telemetry_parent: Optional[TelemetryParent] = None
+    ) -> Optional[float]:
+        """
+        Decides whether to create the span
+
+        :param name: name of the span
+        :param telemetry_parent: parent of the span
+        :return: None if the span should not be created else the sample rate of the span
+        """
+        if not self.is_run_sampled or self.is_sampled_out(telemetry_parent):
+            return None
+        rate: Optional[float] = self._sample_rates.get(name)
+        if rate is None:
+            rate = self.sampling_config.get_span_sample_rate(name=name)
+            self._sample_rates[name] = rate
+        if rate >= 1:
+            return rate
+        if rate <= 0:
+            return None
+        return rate if self._random_function() < rate else None
+
+    def get_rollup(
+        self, *, name: str, telemetry_parent: Optional[TelemetryParent]
+    ) -> Optional[TelemetrySpanRollup]:
+        """
+        Returns the rollup to track the span in or None if the span is not rolled up
+
+        :param name: name of the span
+        :param telemetry_parent: parent of the span.  One rollup span is emitted per parent
+        """
+        if name not in self._rollup_span_names:
+            return None
+        if not self.is_run_sampled or self.is_sampled_out(telemetry_parent):
+            return None
+        key: RollupKey = (
+            name,
+            telemetry_parent.trace_id if telemetry_parent else None,
+            telemetry_parent.span_id if telemetry_parent else None,
+        )
+        entry: Optional[Tuple[TelemetrySpanRollup, Optional[TelemetryParent]]] = (
+            self.rollups.get(key)
+        )
+        if entry is not None:
+            self.rollups.move_to_end(key)
+            return entry[0]
+        entry = (TelemetrySpanRollup(name=name), telemetry_parent)
+        self.rollups[key] = entry
+        while len(self.rollups) > self.max_rollups:
+            oldest_rollup, oldest_parent = self.rollups.popitem(last=False)[1]
+            oldest_rollup.emit(
+                telemetry_span_creator=self._rollup_span_creator,
+                telemetry_parent=oldest_parent,
+            )
+        return entry[0]
+
+    async def emit_rollups_async(self) -> None:
+        """
+        Emits one span for each rollup tracked since the last call
+        """
+        rollups: List[Tuple[TelemetrySpanRollup, Optional[TelemetryParent]]] = list(
+            self.rollups.values()
+        )
+        self.rollups.clear()
+        for rollup, telemetry_parent in rollups:
+            await rollup.emit_async(
+                telemetry_span_creator=self._rollup_span_creator,
+                telemetry_parent=telemetry_parent,
+            )
+
+    @staticmethod
+    def _add_sample_rate(
+        attributes: Optional[Mapping[str, TelemetryAttributeValue]], rate: float
+    ) -> Optional[Mapping[str, TelemetryAttributeValue]]:
+        if rate >= 1:
+            return attributes
+        return {**(attributes or {}), TelemetryAttributes.SAMPLE_RATE: rate}
+
+    @override
+    @asynccontextmanager
+    async def create_telemetry_span_async(
+        self,
+        *,
+        name: str,
+        attributes: Optional[Mapping[str, TelemetryAttributeValue]],
+        telemetry_parent: Optional[TelemetryParent],
+        start_time: int | None = None,
+        add_attribute: Optional[List[str]] = None,
+    ) -> AsyncGenerator[TelemetrySpanWrapper, None]:
+        rollup: Optional[TelemetrySpanRollup] = self.get_rollup(
+            name=name, telemetry_parent=telemetry_parent
+        )
+        if rollup is not None:
+            with rollup.track():
+                yield SampledOutTelemetrySpanWrapper(
+                    name=name, attributes=attributes, telemetry_parent=telemetry_parent
+                )
+            return
+        rate: Optional[float] = self.get_sample_rate(
+            name=name, telemetry_parent=telemetry_parent
+        )
+        if rate is None:
+            yield SampledOutTelemetrySpanWrapper(
+                name=name, attributes=attributes, telemetry_parent=telemetry_parent
+            )
+            return
+        async with super().create_telemetry_span_async(
+            name=name,
+            attributes=self._add_sample_rate(attributes, rate),
+            telemetry_parent=telemetry_parent,
+            start_time=start_time,
+            add_attribute=add_attribute,
+        ) as span:
+            yield span
+
+    @override
+    @contextmanager
+    def create_telemetry_span(
+        self,
+        *,
+        name: str,
+        attributes: Optional[Mapping[str, TelemetryAttributeValue]],
+        telemetry_parent: Optional[TelemetryParent],
+        start_time: int | None = None,
+    ) -> Generator[TelemetrySpanWrapper, None, None]:
+        rollup: Optional[TelemetrySpanRollup] = self.get_rollup(
+            name=name, telemetry_parent=telemetry_parent
+        )
+        if rollup is not None:
+            with rollup.track():
+                yield SampledOutTelemetrySpanWrapper(
+                    name=name, attributes=attributes, telemetry_parent=telemetry_parent
+                )
+            return
+        rate: Optional[float] = self.get_sample_rate(
+            name=name, telemetry_parent=telemetry_parent
+        )
+        if rate is None:
+            yield SampledOutTelemetrySpanWrapper(
+                name=name, attributes=attributes, telemetry_parent=telemetry_parent
+            )
+            return
+        with super().create_telemetry_span(
+            name=name,
+            attributes=self._add_sample_rate(attributes, rate),
+            telemetry_parent=telemetry_parent,
+            start_time=start_time,
+        ) as span:
+            yield span
+
+    @override
+    async def flush_async(self) -> None:
+        await self.emit_rollups_async()
+        await super().flush_async()
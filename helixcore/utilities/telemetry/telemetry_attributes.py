@@ -41,7 +41,12 @@ class TelemetryAttributes:
     RANGE: str = "range"
     REQUEST_SIZE: str = "request_size"
     RESOURCE_TYPE: str = "resource_type"
+    ROLLUP_COUNT: str = "rollup_count"
+    ROLLUP_ERROR_COUNT: str = "rollup_error_count"
+    ROLLUP_MAX_DURATION_MS: str = "rollup_max_duration_ms"
+    ROLLUP_TOTAL_DURATION_MS: str = "rollup_total_duration_ms"
     RUN_INTELLIGENCE_LAYER: str = "run_intelligence_layer"
+    SAMPLE_RATE: str = "sample_rate"
     SKIP: str = "skip"
     SLUG: str = "slug"
     SLUG_DISPLAY_NAME: str = "slug_display_name"
@@ -0,0 +1,60 @@
+import dataclasses
+import zlib
+from typing import Dict, List, Optional
+
+from dataclasses_json import DataClassJsonMixin
+
+
+@dataclasses.dataclass
+class TelemetrySamplingConfig(DataClassJsonMixin):
+    """
+    Head sampling of telemetry spans.  Sampling only applies to spans; counters and histograms
+    are always recorded.
+    """
+
+    run_sample_rate: float = 1.0
+    """ fraction of runs that create spans.  Decided from the run id so every executor makes the same decision """
+
+    default_span_sample_rate: float = 1.0
+    """ fraction of spans created for span names not in span_sample_rates """
+
+    span_sample_rates: Optional[Dict[str, float]] = None
+    """ fraction of spans created by span name """
+
+    rollup_span_names: Optional[List[str]] = None
+    """ span names that are rolled up into one span per parent (with count and durations) instead of one span
+        per operation e.g., per row spans """
+
+    @staticmethod
+    def get_fraction(value: str) -> float:
+        """
+        Returns a fraction in [0, 1] derived from the value.  The same value always gives the same fraction
+        in every process.
+
+        :param value: value to hash e.g., run id
+        """
+        return zlib.crc32(value.encode("utf-8")) / 0xFFFFFFFF
+
+    def is_run_sampled(self, *, run_id: str) -> bool:
+        """
+        Returns whether the run creates spans.  The same run id always gives the same answer.
+
+        :param run_id: id of the run
+        """
+        if self.run_sample_rate >= 1:
+            return True
+        if self.run_sample_rate <= 0:
+            return False
+        return self.get_fraction(run_id) < self.run_sample_rate
+
+    def get_span_sample_rate(self, *, name: str) -> float:
+        """
+        Returns the fraction of spans with this name that are created
+
+        :param name: name of the span
+        """
+        if self.span_sample_rates:
+            rate: Optional[float] = self.span_sample_rates.get(name)
+            if rate is not None:
+                return rate
+        return self.default_span_sample_rate
@@ -0,0 +1,118 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Generator, Mapping, Optional
+
+from helixtelemetry.telemetry.spans.telemetry_span_creator import (
+    TelemetrySpanCreator,
+)
+from helixtelemetry.telemetry.structures.telemetry_attribute_value import (
+    TelemetryAttributeValue,
+)
+from helixtelemetry.telemetry.structures.telemetry_parent import (
+    TelemetryParent,
+)
+
+from helixcore.utilities.telemetry.telemetry_attributes import TelemetryAttributes
+
+
+class TelemetrySpanRollup:
+    def __init__(
+        self,
+        *,
+        name: str,
+        attributes: Optional[Mapping[str, TelemetryAttributeValue]] = None,
+    ) -> None:
+        """
+        Records repeated child operations (e.g. one per row) and emits a single span for all of them
+        with the count, total and max duration and error count as attributes instead of one span per operation.
+
+        :param name: name of the span to emit
+        :param attributes: attributes to add to the emitted span
+        """
+        self.name: str = name
+        self.attributes: Optional[Mapping[str, TelemetryAttributeValue]] = attributes
+        self.count: int = 0
+        self.error_count: int = 0
+        self.total_duration_ns: int = 0
+        self.max_duration_ns: int = 0
+        self.start_time: Optional[int] = None
+
+    @contextmanager
+    def track(self) -> Generator[None, None, None]:
+        """
+        Records the duration of the enclosed operation.  Works in both sync and async code.
+        """
+        start: int = time.time_ns()
+        if self.start_time is None:
+            self.start_time = start
+        try:
+            yield
+        # CancelledError is a BaseException so a cancelled operation is not counted as an error
+        except Exception:
+            self.error_count += 1
+            raise
+        finally:
+            duration: int = time.time_ns() - start
+            self.count += 1
+            self.total_duration_ns += duration
+            if duration > self.max_duration_ns:
+                self.max_duration_ns = duration
+
+    def get_attributes(self) -> Dict[str, TelemetryAttributeValue]:
+        """
+        Returns the attributes of the rollup span
+        """
+        return {
+            **(self.attributes or {}),
+            TelemetryAttributes.ROLLUP_COUNT: self.count,
+            TelemetryAttributes.ROLLUP_ERROR_COUNT: self.error_count,
+            TelemetryAttributes.ROLLUP_TOTAL_DURATION_MS: self.total_duration_ns
+            / 1_000_000,
+            TelemetryAttributes.ROLLUP_MAX_DURATION_MS: self.max_duration_ns
+            / 1_000_000,
+        }
+
+    async def emit_async(
+        self,
+        *,
+        telemetry_span_creator: TelemetrySpanCreator,
+        telemetry_parent: Optional[TelemetryParent],
+    ) -> None:
+        """
+        Emits the rollup span starting at the start of the first tracked operation.  Nothing is emitted
+        if no operation was tracked.
+
+        :param telemetry_span_creator: span creator to create the span with
+        :param telemetry_parent: parent of the span
+        """
+        if self.count == 0:
+            return
+        async with telemetry_span_creator.create_telemetry_span_async(
+            name=self.name,
+            attributes=self.get_attributes(),
+            telemetry_parent=telemetry_parent,
+            start_time=self.start_time,
+        ):
+            pass
+
+    def emit(
+        self,
+        *,
+        telemetry_span_creator: TelemetrySpanCreator,
+        telemetry_parent: Optional[TelemetryParent],
+    ) -> None:
+        """
+        Emits the rollup span from sync code.  Same as emit_async()
+
+        :param telemetry_span_creator: span creator to create the span with
+        :param telemetry_parent: parent of the span
+        """
+        if self.count == 0:
+            return
+        with telemetry_span_creator.create_telemetry_span(
+            name=self.name,
+            attributes=self.get_attributes(),
+            telemetry_parent=telemetry_parent,
+            start_time=self.start_time,
+        ):
+            pass
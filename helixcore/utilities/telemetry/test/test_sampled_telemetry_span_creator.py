@@ -0,0 +1,271 @@
+import asyncio
+import random
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, Generator, List, Mapping, Optional, Tuple
+
+import pytest
+from helixtelemetry.telemetry.context.telemetry_context import TelemetryContext
+from helixtelemetry.telemetry.providers.console_telemetry import ConsoleTelemetry
+from helixtelemetry.telemetry.spans.console_telemetry_span_wrapper import (
+    ConsoleTelemetrySpanWrapper,
+)
+from helixtelemetry.telemetry.spans.null_telemetry_span_wrapper import (
+    NullTelemetrySpanWrapper,
+)
+from helixtelemetry.telemetry.spans.telemetry_span_creator import (
+    TelemetrySpanCreator,
+)
+from helixtelemetry.telemetry.spans.telemetry_span_wrapper import (
+    TelemetrySpanWrapper,
+)
+from helixtelemetry.telemetry.structures.telemetry_attribute_value import (
+    TelemetryAttributeValue,
+)
+from helixtelemetry.telemetry.structures.telemetry_parent import TelemetryParent
+
+from helixcore.utilities.telemetry.sampled_telemetry_span_creator import (
+    SampledOutTelemetrySpanWrapper,
+    SampledTelemetrySpanCreator,
+)
+from helixcore.utilities.telemetry.telemetry_attributes import TelemetryAttributes
+from helixcore.utilities.telemetry.telemetry_sampling_config import (
+    TelemetrySamplingConfig,
+)
+from helixcore.utilities.telemetry.telemetry_span_rollup import TelemetrySpanRollup
+
+
+def create_span_creator(
+    sampling_config: TelemetrySamplingConfig, random_value: float = 0.5
+) -> SampledTelemetrySpanCreator:
+    return SampledTelemetrySpanCreator(
+        telemetry=ConsoleTelemetry(
+            telemetry_context=TelemetryContext.get_null_context(), log_level="INFO"
+        ),
+        sampling_config=sampling_config,
+        run_id="run1",
+        random_function=lambda: random_value,
+    )
+
+
+def test_run_sampling_is_deterministic() -> None:
+    config = TelemetrySamplingConfig(run_sample_rate=0.5)
+    decisions: List[bool] = [
+        config.is_run_sampled(run_id=f"run{i}") for i in range(1000)
+    ]
+    assert decisions == [config.is_run_sampled(run_id=f"run{i}") for i in range(1000)]
+    assert 400 < sum(decisions) < 600
+    assert (
+        TelemetrySamplingConfig(run_sample_rate=0).is_run_sampled(run_id="a") is False
+    )
+    assert TelemetrySamplingConfig().is_run_sampled(run_id="a") is True
+
+
+async def test_span_sampling_by_name() -> None:
+    config = TelemetrySamplingConfig(
+        default_span_sample_rate=0.25, span_sample_rates={"always": 1.0, "never": 0}
+    )
+    telemetry_parent = TelemetryParent.get_null_parent()
+
+    span_creator = create_span_creator(config, random_value=0.5)
+    async with span_creator.create_telemetry_span_async(
+        name="always", attributes=None, telemetry_parent=telemetry_parent
+    ) as span:
+        assert isinstance(span, ConsoleTelemetrySpanWrapper)
+    async with span_creator.create_telemetry_span_async(
+        name="never", attributes=None, telemetry_parent=telemetry_parent
+    ) as span:
+        assert isinstance(span, NullTelemetrySpanWrapper)
+    # 0.5 >= 0.25 so the span is dropped
+    with span_creator.create_telemetry_span(
+        name="row", attributes=None, telemetry_parent=telemetry_parent
+    ) as span:
+        assert isinstance(span, NullTelemetrySpanWrapper)
+
+    span_creator = create_span_creator(config, random_value=0.1)
+    async with span_creator.create_telemetry_span_async(
+        name="row", attributes={"a": 1}, telemetry_parent=telemetry_parent
+    ) as span:
+        assert isinstance(span, ConsoleTelemetrySpanWrapper)
+        assert span.attributes is not None
+        assert span.attributes[TelemetryAttributes.SAMPLE_RATE] == 0.25
+        assert span.attributes["a"] == 1
+
+
+async def test_unsampled_run_drops_all_spans() -> None:
+    span_creator = create_span_creator(TelemetrySamplingConfig(run_sample_rate=0))
+    async with span_creator.create_telemetry_span_async(
+        name="always", attributes=None, telemetry_parent=None
+    ) as span:
+        assert isinstance(span, NullTelemetrySpanWrapper)
+
+
+async def test_span_rollup() -> None:
+    rollup = TelemetrySpanRollup(name="rows", attributes={"a": 1})
+    for _ in range(3):
+        with rollup.track():
+            pass
+    with pytest.raises(ValueError):
+        with rollup.track():
+            raise ValueError("failed")
+
+    attributes = rollup.get_attributes()
+    assert attributes[TelemetryAttributes.ROLLUP_COUNT] == 4
+    assert attributes[TelemetryAttributes.ROLLUP_ERROR_COUNT] == 1
+    assert attributes["a"] == 1
+    assert rollup.start_time is not None
+
+    await rollup.emit_async(
+        telemetry_span_creator=create_span_creator(TelemetrySamplingConfig()),
+        telemetry_parent=None,
+    )
+
+
+def create_telemetry_parent(trace_id: str) -> TelemetryParent:
+    return TelemetryParent(
+        name="parent",
+        trace_id=trace_id,
+        span_id=f"{trace_id}-span",
+        attributes=None,
+        telemetry_context=TelemetryContext.get_null_context(),
+    )
+
+
+async def test_span_sampling_is_per_span() -> None:
+    span_creator = SampledTelemetrySpanCreator(
+        telemetry=ConsoleTelemetry(
+            telemetry_context=TelemetryContext.get_null_context(), log_level="INFO"
+        ),
+        sampling_config=TelemetrySamplingConfig(span_sample_rates={"row": 0.5}),
+        run_id="run1",
+        random_function=random.Random(42).random,
+    )
+    # all the rows of a run share the trace of the run
+    telemetry_parent = create_telemetry_parent("trace1")
+    kept: int = 0
+    for _ in range(1000):
+        async with span_creator.create_telemetry_span_async(
+            name="row", attributes=None, telemetry_parent=telemetry_parent
+        ) as span:
+            kept += isinstance(span, ConsoleTelemetrySpanWrapper)
+    assert 400 < kept < 600
+
+
+async def test_children_of_dropped_span_are_dropped() -> None:
+    config = TelemetrySamplingConfig(span_sample_rates={"parent": 0, "child": 1})
+    span_creator = create_span_creator(config)
+    async with span_creator.create_telemetry_span_async(
+        name="parent",
+        attributes=None,
+        telemetry_parent=create_telemetry_parent("trace1"),
+    ) as parent_span:
+        assert isinstance(parent_span, SampledOutTelemetrySpanWrapper)
+        child_parent = parent_span.create_child_telemetry_parent()
+        assert SampledTelemetrySpanCreator.is_sampled_out(child_parent)
+        async with span_creator.create_telemetry_span_async(
+            name="child", attributes=None, telemetry_parent=child_parent
+        ) as child_span:
+            assert isinstance(child_span, SampledOutTelemetrySpanWrapper)
+
+
+class RecordingTelemetrySpanCreator(TelemetrySpanCreator):
+    def __init__(self) -> None:
+        super().__init__(
+            telemetry=ConsoleTelemetry(
+                telemetry_context=TelemetryContext.get_null_context(),
+                log_level="INFO",
+            )
+        )
+        self.spans: List[Tuple[str, Optional[Mapping[str, Any]]]] = []
+
+    @asynccontextmanager
+    async def create_telemetry_span_async(
+        self,
+        *,
+        name: str,
+        attributes: Optional[Mapping[str, TelemetryAttributeValue]],
+        telemetry_parent: Optional[TelemetryParent],
+        start_time: int | None = None,
+        add_attribute: Optional[List[str]] = None,
+    ) -> AsyncGenerator[TelemetrySpanWrapper, None]:
+        self.spans.append((name, attributes))
+        yield NullTelemetrySpanWrapper(
+            name=name, attributes=attributes, telemetry_parent=telemetry_parent
+        )
+
+    @contextmanager
+    def create_telemetry_span(
+        self,
+        *,
+        name: str,
+        attributes: Optional[Mapping[str, TelemetryAttributeValue]],
+        telemetry_parent: Optional[TelemetryParent],
+        start_time: int | None = None,
+    ) -> Generator[TelemetrySpanWrapper, None, None]:
+        self.spans.append((name, attributes))
+        yield NullTelemetrySpanWrapper(
+            name=name, attributes=attributes, telemetry_parent=telemetry_parent
+        )
+
+
+async def test_rollup_span_names() -> None:
+    span_creator = create_span_creator(
+        TelemetrySamplingConfig(rollup_span_names=["row"])
+    )
+    recorder = RecordingTelemetrySpanCreator()
+    span_creator._rollup_span_creator = recorder
+    for trace_id in ["trace1", "trace2"]:
+        telemetry_parent = create_telemetry_parent(trace_id)
+        for _ in range(3):
+            async with span_creator.create_telemetry_span_async(
+                name="row", attributes=None, telemetry_parent=telemetry_parent
+            ) as span:
+                assert isinstance(span, SampledOutTelemetrySpanWrapper)
+    assert len(span_creator.rollups) == 2
+
+    await span_creator.flush_async()
+    assert not span_creator.rollups
+    assert [name for name, _ in recorder.spans] == ["row", "row"]
+    for _, attributes in recorder.spans:
+        assert attributes is not None
+        assert attributes[TelemetryAttributes.ROLLUP_COUNT] == 3
+
+
+async def test_rollups_are_bounded() -> None:
+    span_creator = SampledTelemetrySpanCreator(
+        telemetry=ConsoleTelemetry(
+            telemetry_context=TelemetryContext.get_null_context(), log_level="INFO"
+        ),
+        sampling_config=TelemetrySamplingConfig(rollup_span_names=["row"]),
+        run_id="run1",
+        max_rollups=2,
+    )
+    recorder = RecordingTelemetrySpanCreator()
+    span_creator._rollup_span_creator = recorder
+    for trace_id in ["trace1", "trace2", "trace1", "trace3"]:
+        async with span_creator.create_telemetry_span_async(
+            name="row",
+            attributes=None,
+            telemetry_parent=create_telemetry_parent(trace_id),
+        ):
+            pass
+    # trace2 was the least recently used when trace3 was added
+    assert len(span_creator.rollups) == 2
+    assert [key[1] for key in span_creator.rollups] == ["trace1", "trace3"]
+    assert len(recorder.spans) == 1
+
+    await span_creator.flush_async()
+    counts: List[Any] = [
+        attributes[TelemetryAttributes.ROLLUP_COUNT]
+        for _, attributes in recorder.spans
+        if attributes is not None
+    ]
+    assert counts == [1, 2, 1]
+
+
+def test_span_rollup_does_not_count_cancellation_as_error() -> None:
+    rollup = TelemetrySpanRollup(name="rows")
+    with pytest.raises(asyncio.CancelledError):
+        with rollup.track():
+            raise asyncio.CancelledError()
+    assert rollup.count == 1
+    assert rollup.error_count == 0
@@ -72,6 +72,12 @@ setup(
         "opentelemetry-exporter-otlp>=1.30.0",
         "opentelemetry-instrumentation-aiohttp-client>=0.51b0",
     ],
+    extras_require={
+        # faster json encoding (dumps_compact) and token page decoding (ConnectionEntryBatch)
+        "orjson": ["orjson>=3.9.0"],
+        # arrow record batch and parquet output (ArrowBatchBuilder, ParquetSink)
+        "pyarrow": ["pyarrow>=15.0.0"],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Programming Language :: Python :: 3",